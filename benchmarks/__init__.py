@@ -0,0 +1,6 @@
+# RT - Benchmarks
+
+"""計測用のスクリプトです。リポジトリのルートで`python -m benchmarks.<名前>`のように実行してください。
+`rtlib`や設定ファイルがなくても動くように、テストと同じ準備(`tests/conftest.py`)をしてから読み込みます。"""
+
+from tests import conftest # noqa: F401
@@ -0,0 +1,68 @@
+# RT - Benchmarks - Cacher
+
+"""`CacherPool.sweep`の計測です。
+`--size`個のキーを`--cachers`個のキャッシュに分けて入れて、そのうち`--expired`の割合だけが期限切れの状態で、
+掃除でイベントループが止まる時間を、全てのキーを調べて掃除する場合(`rtlib`の`CacherPool`と同じ方法)と比べます。
+例：`python -m benchmarks.cacher --size 5000000 --cachers 30`"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+
+from core import cacher
+from core.cacher import CacherPool
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def fill(size: int, cachers: int, expired: float) -> CacherPool:
+    # 最初の`expired`の割合だけ寿命を短くしておく。
+    pool = CacherPool()
+    for index in range(cachers):
+        cache = pool.acquire(3600.0)
+        keys = range(index, size, cachers)
+        border = int(len(keys) * expired)
+        for number, key in enumerate(keys):
+            cache[key] = key
+            if number < border:
+                cache.set_deadline(key, 10.0)
+    return pool
+
+
+def full_sweep(pool: CacherPool, now: float) -> None:
+    for cache in pool.cachers:
+        for key, entry in list(cache.data.items()):
+            if entry.deadline <= now:
+                del cache.data[key]
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--cachers", type=int, default=1)
+    parser.add_argument("--expired", type=float, default=0.01)
+    args = parser.parse_args()
+
+    cacher.time = clock = Clock()
+    for name, sweep in (
+        ("heap", lambda pool: pool.sweep()),
+        ("full scan", lambda pool: full_sweep(pool, clock.now))
+    ):
+        clock.now = 0.0
+        pool = fill(args.size, args.cachers, args.expired)
+        clock.now = 60.0
+        start = perf_counter()
+        sweep(pool)
+        elapsed = perf_counter() - start
+        left = sum(map(len, pool.cachers))
+        print(f"{name:>9}: {elapsed * 1000:8.1f}ms, {args.size - left:,} expired")
+        del pool
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# RT - Benchmarks - Captcha
+
+"""画像認証の`ImagePool.get`を`--requests`件呼んで、画像が返るまでの時間を計ります。
+依頼は`--interval`秒毎に一件ずつ送ります。`0`の場合は全てを同時に送ります。
+プールが空の状態と、満杯の状態から始めた場合をそれぞれ計ります。
+プロセスプールは`RT.executors.process`と同じ作り方で、`--workers`個のプロセスを使います。"""
+
+from argparse import ArgumentParser
+from asyncio import gather, get_running_loop, run, sleep
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+from types import SimpleNamespace
+from time import perf_counter
+from logging import getLogger
+from os import cpu_count
+
+from rtutil.captcha_image import generate_image
+
+from tests.fakes import import_cog
+
+
+async def measure(pool, requests: int, interval: float) -> list[float]:
+    async def request(delay: float) -> float:
+        await sleep(delay)
+        start = perf_counter()
+        await pool.get()
+        return perf_counter() - start
+    return sorted(await gather(*(request(index * interval) for index in range(requests))))
+
+
+def percentile(latencies: list[float], rate: float) -> float:
+    return latencies[min(int(len(latencies) * rate), len(latencies) - 1)] * 1000
+
+
+async def main(requests: int, interval: float, workers: int) -> None:
+    # 子プロセスでは読み込まないように、ここで読み込む。
+    ImagePool = import_cog("server-management.captcha.image").ImagePool
+    process = ProcessPoolExecutor(workers, mp_context=get_context(
+        "forkserver" if "forkserver" in get_all_start_methods() else "spawn"
+    ))
+    bot = SimpleNamespace(
+        loop=get_running_loop(), executors=SimpleNamespace(process=process),
+        logger=getLogger("rt")
+    )
+    # 子プロセスの起動と画像の生成の準備を済ませておく。
+    await gather(*(bot.loop.run_in_executor(process, generate_image) for _ in range(workers)))
+    start = perf_counter()
+    await bot.loop.run_in_executor(process, generate_image)
+    print(f"one image: {(perf_counter() - start) * 1000:.1f}ms")
+
+    for name, warm in (("empty pool", False), ("full pool", True)):
+        pool = ImagePool(bot) # type: ignore
+        if warm:
+            pool.refill()
+            while pool._refilling:
+                await sleep(0.01)
+        start = perf_counter()
+        latencies = await measure(pool, requests, interval)
+        print(
+            f"{name}: {requests} requests in {(perf_counter() - start) * 1000:.0f}ms, "
+            f"first {latencies[0] * 1000:.1f}ms p50 {percentile(latencies, 0.5):.1f}ms "
+            f"p99 {percentile(latencies, 0.99):.1f}ms max {latencies[-1] * 1000:.1f}ms"
+        )
+        while pool._refilling:
+            await sleep(0.01)
+    process.shutdown()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--interval", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=cpu_count() or 1)
+    args = parser.parse_args()
+    run(main(args.requests, args.interval, args.workers))
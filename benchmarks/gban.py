@@ -0,0 +1,93 @@
+# RT - Benchmarks - GBan
+
+"""GBANリストが`--entries`件ある状態で、`--joins`件の参加を調べるのにかかる時間とクエリの数を計ります。
+参加者の`--rate`の割合がGBANされているユーザーです。データベースは`tests.fakes.FakePool`で置き換えます。
+一件ずつデータベースに問い合わせていた頃の方法(`get_reason`を参加毎に実行)と、
+メモリ上のリストで絞り込んでから`JoinPipeline.MAX_BATCH`件ずつまとめて理由を取得する`on_joins`を比べます。
+クエリ一回あたりの往復時間を`--rtt`ミリ秒として、データベースの待ち時間の見積もりも出します。"""
+
+from argparse import ArgumentParser
+from types import SimpleNamespace
+from time import perf_counter
+from random import Random
+from asyncio import run
+import tracemalloc
+
+from core.join_pipeline import JoinPipeline
+
+from rtutil.compact import IdSet
+
+from tests.fakes import FakePool, import_cog
+
+
+def measure_memory(ids: list[int]) -> None:
+    for name, make in (("set", set), ("IdSet", IdSet)):
+        tracemalloc.start()
+        value = make(ids)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del value
+        print(f"{name}: {size / 1024 / 1024:.1f}MiB")
+
+
+async def main(entries: int, joins: int, rate: float, rtt: float) -> None:
+    random = Random(0)
+    banned = random.sample(range(10 ** 17, 10 ** 18), entries)
+    measure_memory(banned)
+    reasons = dict.fromkeys(banned, "spam")
+
+    def handle(sql: str, args: tuple) -> list[tuple]:
+        if sql.startswith("SELECT UserId FROM"):
+            return [(user_id,) for user_id in banned]
+        if "IN (" in sql:
+            return [(user_id, reasons[user_id]) for user_id in args if user_id in reasons]
+        if "WHERE UserId" in sql:
+            return [(reasons[args[0]],)] if args[0] in reasons else []
+        return []
+
+    members = [
+        SimpleNamespace(
+            id=random.choice(banned) if random.random() < rate
+            else random.randrange(10 ** 17, 10 ** 18),
+            guild=SimpleNamespace(id=random.randrange(1000))
+        ) for _ in range(joins)
+    ]
+    banned_count = sum(member.id in reasons for member in members)
+    print(f"{joins} joins, {banned_count} banned")
+
+    bans = []
+    bot = SimpleNamespace(pool=(pool := FakePool(handle)), joins=SimpleNamespace(
+        actions=SimpleNamespace(put=lambda *args, **_: bans.append(args))
+    ))
+    cog = import_cog("rt.gban").GBan(bot)
+    start = perf_counter()
+    await cog.data.load()
+    print(f"load: {(perf_counter() - start) * 1000:.0f}ms")
+
+    for name in ("per join", "on_joins"):
+        pool.queries.clear()
+        bans.clear()
+        start = perf_counter()
+        if name == "per join":
+            for member in members:
+                if (reason := await cog.data.get_reason(member.id)):
+                    bans.append((member.guild.id, reason))
+        else:
+            for index in range(0, joins, JoinPipeline.MAX_BATCH):
+                await cog.on_joins(members[index:index + JoinPipeline.MAX_BATCH])
+        elapsed = (perf_counter() - start) * 1000
+        assert len(bans) == banned_count
+        print(
+            f"{name}: {elapsed:.0f}ms, {len(pool.queries)} queries, "
+            f"estimated database wait {len(pool.queries) * rtt:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--joins", type=int, default=50_000)
+    parser.add_argument("--rate", type=float, default=0.01)
+    parser.add_argument("--rtt", type=float, default=0.5)
+    args = parser.parse_args()
+    run(main(args.entries, args.joins, args.rate, args.rtt))
@@ -0,0 +1,81 @@
+# RT - Benchmarks - Role Index
+
+"""`--roles`個のロールがあるサーバーの`--members`人のメンバーで、`RoleIndex`を使う場合と使わない場合の時間を計ります。
+一つ目はブロッカーの`is_target`のような「設定の`--config`個のロールのどれかを持っているか」の確認で、
+ロール毎に`Member.get_role`と同じ二分探索をする方法と、`RoleIndex.has_any`でキャッシュしたビットマスクを使う方法を比べます。
+二つ目は`on_member_update`のロールの付与と削除の差分で、ロール毎に相手のメンバーを調べる方法と`RoleIndex.diff`を比べます。
+メンバーは`--combinations`通りのロールの組み合わせのどれかを持っています。
+例：`python -m benchmarks.role_index --roles 250 --members 100000`"""
+
+from argparse import ArgumentParser
+from types import SimpleNamespace
+from time import perf_counter
+from random import Random
+
+from discord.utils import SnowflakeList
+
+from core.role_index import RoleIndex
+
+
+def make_member(role_ids: list[int]) -> SimpleNamespace:
+    # discord.pyの`Member`と同じく、ロールのIDを`SnowflakeList`で持たせる。
+    return SimpleNamespace(_roles=SnowflakeList(role_ids))
+
+
+def main(roles: int, members: int, config: int, combinations: int) -> None:
+    random = Random(0)
+    role_ids = random.sample(range(10 ** 17, 10 ** 18), roles)
+    patterns = [
+        random.sample(role_ids, random.randrange(0, min(roles, 20)))
+        for _ in range(combinations)
+    ]
+    befores = [make_member(random.choice(patterns)) for _ in range(members)]
+    # 更新後は、ロールを一つ付けるか外したメンバーにする。
+    afters = []
+    for member in befores:
+        changed = list(member._roles)
+        if changed and random.random() < 0.5:
+            changed.remove(random.choice(changed))
+        else:
+            changed.append(random.choice(role_ids))
+        afters.append(make_member(changed))
+    configured = random.sample(role_ids, config)
+
+    start = perf_counter()
+    expected = [
+        any(member._roles.has(role_id) for role_id in configured)
+        for member in befores
+    ]
+    print(f"has_any, per role: {perf_counter() - start:.2f}s")
+    index = RoleIndex()
+    start = perf_counter()
+    result = [index.has_any(member, configured, "blocker") for member in befores]
+    print(f"has_any, RoleIndex: {perf_counter() - start:.2f}s")
+    assert result == expected
+
+    start = perf_counter()
+    expected = [
+        (
+            {role_id for role_id in after._roles if not before._roles.has(role_id)},
+            {role_id for role_id in before._roles if not after._roles.has(role_id)}
+        ) for before, after in zip(befores, afters)
+    ]
+    print(f"diff, per role: {perf_counter() - start:.2f}s")
+    start = perf_counter()
+    masks = [index.diff(before, after) for before, after in zip(befores, afters)]
+    print(f"diff, RoleIndex: {perf_counter() - start:.2f}s")
+    assert [
+        (set(index.role_ids(added)), set(index.role_ids(removed)))
+        for added, removed in masks
+    ] == expected
+    print(f"cached combinations: {len(index.combinations)}")
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--roles", type=int, default=250)
+    parser.add_argument("--members", type=int, default=100_000)
+    parser.add_argument("--config", type=int, default=15)
+    parser.add_argument("--combinations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.roles, args.members, args.config, args.combinations)
@@ -0,0 +1,81 @@
+# RT - Benchmarks - Translation
+
+"""`Coalescer`に翻訳の依頼を流して、キャッシュのヒット率と翻訳の実行回数がどれだけ減ったかを計ります。
+依頼は`--trace`に渡したファイル(一行に`翻訳先<タブ>文章`)から読み込みます。
+渡さなかった場合は、Zipf分布で選んだ文章の依頼を作ります。
+依頼は`--rate`件毎秒で届くものとし、翻訳には`--latency`秒かかるものとします。"""
+
+from argparse import ArgumentParser
+from asyncio import Task, create_task, gather, run, sleep
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
+import time
+
+from core.cacher import BoundedCacher
+
+from rtutil.translation import Coalescer, EchoBackend
+
+
+class SlowBackend(EchoBackend):
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    def translate(self, target: str, content: str) -> str:
+        time.sleep(self.latency)
+        return super().translate(target, content)
+
+
+def make_trace(size: int, unique: int, seed: int) -> list[tuple[str, str]]:
+    random = Random(seed)
+    contents = [f"message {index}" for index in range(unique)]
+    weights = [1 / rank for rank in range(1, unique + 1)]
+    return [
+        (random.choice(("ja", "en", "ko", "zh")), content)
+        for content in random.choices(contents, weights, k=size)
+    ]
+
+
+def load_trace(path: str) -> list[tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        return [tuple(line.rstrip("\n").split("\t", 1)) for line in f if "\t" in line] # type: ignore
+
+
+async def replay(
+    coalescer: Coalescer, trace: list[tuple[str, str]], rate: float
+) -> None:
+    tasks: list[Task[str]] = []
+    for target, content in trace:
+        tasks.append(create_task(coalescer.translate(target, content)))
+        await sleep(1 / rate)
+    await gather(*tasks)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--trace")
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--unique", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=1000.0)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace) if args.trace \
+        else make_trace(args.size, args.unique, args.seed)
+    caches: BoundedCacher[tuple[str, str, bytes], str] = \
+        BoundedCacher(3600.0, max_size=20000, name="translator")
+    with ThreadPoolExecutor(32) as executor:
+        coalescer = Coalescer(SlowBackend(args.latency), caches, executor)
+        run(replay(coalescer, trace, args.rate))
+
+    coalesced = len(trace) - caches.hits - coalescer.upstream_calls
+    print(f"requests: {len(trace):,}")
+    print(f"cache hits: {caches.hits:,} ({caches.hits / len(trace):.1%})")
+    print(f"coalesced in flight: {coalesced:,} ({coalesced / len(trace):.1%})")
+    print(f"upstream calls: {coalescer.upstream_calls:,} "
+        f"({1 - coalescer.upstream_calls / len(trace):.1%} fewer than one call per request)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# RT by Rext - Cluster Launcher
+
+"""シャードを複数のプロセスに分けてRTを起動します。
+`python3 cluster.py <プロセス数> [main.pyに渡す引数 ...]`のように使います。
+シャードの数は`data.toml`の`shard_count`か、未入力の場合はDiscordの推奨の数になります。
+各プロセスは落ちた場合に再起動されます。
+また、標準入力に`reload cogs.rt.general`のように入力すると、そのコマンドを全てのプロセスで実行します。
+使えるコマンドは`RT.run_cluster_command`を参照してください。"""
+
+from __future__ import annotations
+
+from asyncio import Event, StreamReader, StreamReaderProtocol, create_subprocess_exec, gather, \
+    run, sleep, wait_for, get_running_loop, TimeoutError as AioTimeoutError
+from asyncio.subprocess import Process, DEVNULL
+from signal import SIGINT, SIGTERM
+from time import monotonic
+from os import environ
+import sys
+
+from aiohttp import ClientSession
+
+from rtutil.cluster import ENV_SHARD_IDS, ENV_SHARD_COUNT, ENV_CLUSTER_ID, ENV_SOCKET, \
+    ControlServer, partition, logger
+
+from rtlib.common import set_handler
+
+from data import DATA, SECRET
+
+
+SOCKET_PATH = "rt_control.sock"
+IDENTIFY_INTERVAL = 5.0
+"一つのシャードの接続にかける秒数です。プロセスの起動をこの秒数ずつずらします。"
+MAX_BACKOFF = 60.0
+set_handler(logger)
+
+
+async def get_shard_count() -> int:
+    "シャードの数を取得します。"
+    if DATA["shard_count"]:
+        return int(DATA["shard_count"])
+    async with ClientSession() as session:
+        async with session.get(
+            "https://discord.com/api/v10/gateway/bot",
+            headers={"Authorization": f"Bot {SECRET['token']}"}
+        ) as response:
+            return (await response.json())["shards"]
+
+
+class Cluster:
+    "一つのプロセスを起動して、落ちたら再起動させるためのクラスです。"
+
+    def __init__(self, launcher: Launcher, id_: int, shard_ids: list[int]):
+        self.launcher, self.id, self.shard_ids = launcher, id_, shard_ids
+        self.process: Process | None = None
+
+    async def start(self, argv: list[str]) -> None:
+        "プロセスを起動して、終了するまで監視します。"
+        env = environ | {
+            ENV_SHARD_IDS: ",".join(map(str, self.shard_ids)),
+            ENV_SHARD_COUNT: str(self.launcher.shard_count),
+            ENV_CLUSTER_ID: str(self.id), ENV_SOCKET: SOCKET_PATH
+        }
+        backoff = IDENTIFY_INTERVAL
+        while not self.launcher.closing.is_set():
+            started = monotonic()
+            # 標準入力はランチャーがコマンドを受け取るのに使うので渡さない。
+            self.process = await create_subprocess_exec(
+                sys.executable, "main.py", *argv, env=env, stdin=DEVNULL
+            )
+            logger.info("Started cluster %s (shards: %s)", self.id, self.shard_ids)
+            code = await self.process.wait()
+            if self.launcher.closing.is_set():
+                break
+            # すぐに落ちた場合は再起動の間隔を伸ばしていく。
+            backoff = IDENTIFY_INTERVAL if monotonic() - started > MAX_BACKOFF \
+                else min(backoff * 2, MAX_BACKOFF)
+            logger.warning("Cluster %s exited with %s, restarting in %.0fs", self.id, code, backoff)
+            try:
+                await wait_for(self.launcher.closing.wait(), backoff)
+            except AioTimeoutError:
+                ...
+
+    async def stop(self) -> None:
+        "プロセスを終了させます。"
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await wait_for(self.process.wait(), 30)
+            except AioTimeoutError:
+                self.process.kill()
+
+
+class Launcher:
+    "全てのプロセスを起動して、プロセス間のやり取りを中継します。"
+
+    def __init__(self, clusters: int, argv: list[str]):
+        self.clusters_count, self.argv = clusters, argv
+        self.server = ControlServer(SOCKET_PATH)
+        self.closing = Event()
+
+    async def _start(self, cluster: Cluster, delay: float) -> None:
+        await sleep(delay)
+        await cluster.start(self.argv)
+
+    async def read_commands(self) -> None:
+        "標準入力から一行ずつコマンドを読み込んで、全てのプロセスに送ります。"
+        reader = StreamReader()
+        try:
+            await get_running_loop().connect_read_pipe(
+                lambda: StreamReaderProtocol(reader), sys.stdin
+            )
+        except ValueError:
+            # 標準入力が普通のファイルの場合等は読み込めない。
+            logger.info("Standard input is not readable, so commands are disabled")
+            return
+        while line := await reader.readline():
+            if words := line.decode().split():
+                self.server.broadcast("command", {"name": words[0], "args": words[1:]})
+                logger.info("Broadcasted command: %s", " ".join(words))
+
+    async def run(self) -> None:
+        "起動します。"
+        self.shard_count = await get_shard_count()
+        self.clusters = [
+            Cluster(self, i, shard_ids) for i, shard_ids
+            in enumerate(partition(self.shard_count, self.clusters_count))
+        ]
+        await self.server.start()
+        loop = get_running_loop()
+        for signal in (SIGINT, SIGTERM):
+            loop.add_signal_handler(signal, lambda: loop.create_task(self.close()))
+        self.reader = loop.create_task(self.read_commands(), name="RT.Launcher.commands")
+        # 同時にたくさんのシャードが接続しないように、前のプロセスのシャードの数だけ起動をずらす。
+        delay, tasks = 0.0, []
+        for cluster in self.clusters:
+            tasks.append(self._start(cluster, delay))
+            delay += IDENTIFY_INTERVAL * len(cluster.shard_ids)
+        await gather(*tasks)
+
+    async def close(self) -> None:
+        "全てのプロセスを終了させます。"
+        logger.info("Closing clusters...")
+        self.closing.set()
+        self.reader.cancel()
+        await gather(*(cluster.stop() for cluster in self.clusters))
+        await self.server.close()
+
+
+if __name__ == "__main__":
+    run(Launcher(int(sys.argv[1]), sys.argv[2:]).run())
@@ -9,11 +9,10 @@ from discord.ext import commands
 import discord
 
 from aiohttp import ClientSession
-from bs4 import BeautifulSoup
 from jishaku.functools import executor_function
 from aiofiles.os import remove
-from PIL import Image
 
+from core.lazy import lazy_import
 from core import RT, Cog, t
 
 from rtutil.calculator import aiocalculate, NotSupported
@@ -27,6 +26,8 @@ from data import Colors
 
 
 FSPARENT = "individual"
+bs4 = lazy_import("bs4")
+Image = lazy_import("PIL.Image")
 
 
 class JinData(TypedDict):
@@ -75,7 +76,7 @@ class Individual(Cog):
     async def jin(self) -> AsyncIterator[JinData]:
         "オレ的ゲーム速報＠刃のスクレイピングをします。"
         async with self.bot.session.get("http://jin115.com") as r:
-            soup = BeautifulSoup(await r.text(), "lxml")
+            soup = bs4.BeautifulSoup(await r.text(), "lxml")
         for article_soup in soup.find_all("div", class_="index_article_body"):
             thumbnail_anchor = article_soup.find("a")
             yield JinData(
@@ -14,8 +14,7 @@ import discord
 from orjson import loads, dumps
 
 from core import RT, Cog, t, DatabaseManager, cursor
-
-from rtlib.common.cacher import Cacher
+from core.cacher import BoundedCacher
 
 from rtutil.converters import DayOfWeekTimeConverter, TimeConverter, DateTimeFormatNotSatisfiable
 from rtutil.utils import set_page, separate_from_iterable, artificially_send
@@ -96,6 +95,7 @@ class DataManager(DatabaseManager):
                     ON DUPLICATE KEY UPDATE Content = %s;""",
                 (user_id, content, content)
             )
+        self.cog.bot.invalidations.publish("afk", user_id)
 
     async def get_automations(self, user_id: int, **_) -> list[Automation]:
         "指定されたユーザーのAFKオートメーションのデータを全て取得します。"
@@ -144,6 +144,7 @@ class DataManager(DatabaseManager):
             "INSERT INTO AutoAfk VALUES (%s, %s, %s, %s);",
             (user_id, automation.id_, dumps(automation.timing).decode(), automation.content)
         )
+        self.cog.bot.invalidations.publish("afk_automation", user_id)
 
     async def remove_automation(self, user_id: int, id_: str) -> None:
         "AFKオートメーションのデータを削除します。"
@@ -160,6 +161,7 @@ class DataManager(DatabaseManager):
                     if automation.id_ == id_:
                         self.cog.caches.automation[user_id].remove(automation)
                         break
+            self.cog.bot.invalidations.publish("afk_automation", user_id)
 
     async def clean(self) -> None:
         "掃除をします。"
@@ -171,10 +173,10 @@ class DataManager(DatabaseManager):
 class Caches:
     "キャッシュを格納するためのクラスです。"
 
-    afk: Cacher[int, str | None]
-    automation: Cacher[int, list[Automation]]
-    sent: Cacher[tuple[int, int], bool]
-    set_: Cacher[int, bool]
+    afk: BoundedCacher[int, str | None]
+    automation: BoundedCacher[int, list[Automation]]
+    sent: BoundedCacher[tuple[int, int], bool]
+    set_: BoundedCacher[int, bool]
 
 
 class AFK(Cog, DataManager):
@@ -183,8 +185,8 @@ class AFK(Cog, DataManager):
     def __init__(self, bot: RT):
         self.bot = bot
         self.caches = Caches(
-            self.bot.cachers.acquire(360.0),
-            self.bot.cachers.acquire(180.0, list),
+            self.bot.cachers.acquire_bounded(360.0, max_size=50000, name="afk"),
+            self.bot.cachers.acquire_bounded(180.0, list, max_size=50000, name="afk.automation"),
             self.bot.cachers.acquire(15.0),
             self.bot.cachers.acquire(15.0)
         )
@@ -195,6 +197,13 @@ class AFK(Cog, DataManager):
     async def cog_load(self):
         await self.prepare_table()
         self.automation_loop.start()
+        # AFKはユーザー毎なので、他のシャードで設定されたものもここで消す必要がある。
+        self._invalidations = {
+            topic: self.bot.invalidations.watch_cacher(topic, cacher)
+            for topic, cacher in (
+                ("afk", self.caches.afk), ("afk_automation", self.caches.automation)
+            )
+        }
 
     @commands.Cog.listener()
     async def on_message_noprefix(self, message: discord.Message):
@@ -265,6 +274,8 @@ class AFK(Cog, DataManager):
 
     async def cog_unload(self):
         self.automation_loop.cancel()
+        for topic, subscriber in self._invalidations.items():
+            self.bot.invalidations.unsubscribe(topic, subscriber)
 
     @commands.group(
         aliases=("留守番",), description="Reply absence notification message the AFK",
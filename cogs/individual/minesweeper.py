@@ -6,9 +6,9 @@ from discord.ext import commands
 import discord
 
 from core import Cog, RT, t
+from core.cacher import BoundedCacher
 
 from rtlib.common.utils import code_block
-from rtlib.common.cacher import Cacher
 
 from rtutil.minesweeper import Minesweeper
 from rtutil.views import TimeoutView
@@ -76,7 +76,7 @@ class MinesweeperView(TimeoutView):
 class MinesweeperCog(Cog, name="Minesweeper"):
     def __init__(self, bot: RT):
         self.bot = bot
-        self.games: Cacher[int, Minesweeper] = self.bot.cachers.acquire(180.0)
+        self.games: BoundedCacher[int, Minesweeper] = self.bot.cachers.acquire(180.0)
 
     @commands.command(
         description="Minesweeper", aliases=("ms", "マインスイーパ", "マス"),
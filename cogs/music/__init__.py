@@ -100,10 +100,14 @@ class MusicCog(Cog, name="Music"):
 
     async def cog_load(self):
         await self.data.prepare_table()
+        self._invalidation = self.bot.invalidations.watch_cacher(
+            "music_dj_role", self.data.dj_role_caches
+        )
 
     async def cog_unload(self):
         for player in self.now.values():
             await self.bot.mixers.release(player.mixer)
+        self.bot.invalidations.unsubscribe("music_dj_role", self._invalidation)
 
     async def _search_result_select_callback(
         self, select: EasyCallbackSelect,
@@ -5,8 +5,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from core import DatabaseManager, cursor
+from core.cacher import BoundedCacher
 
-from rtlib.common.cacher import Cacher
 from rtlib.common.json import loads, dumps
 
 if TYPE_CHECKING:
@@ -17,7 +17,8 @@ class DataManager(DatabaseManager):
     def __init__(self, cog: MusicCog):
         self.cog = cog
         self.pool = self.cog.bot.pool
-        self.dj_role_caches: Cacher[int, int | None] = self.cog.bot.cachers.acquire(300.0)
+        self.dj_role_caches: BoundedCacher[int, int | None] = \
+            self.cog.bot.cachers.acquire_bounded(300.0, max_size=10000, name="music.dj_role")
 
     async def prepare_table(self) -> None:
         await cursor.execute(
@@ -46,6 +47,7 @@ class DataManager(DatabaseManager):
                 (guild_id, role_id, role_id)
             )
         self.dj_role_caches[guild_id] = role_id
+        self.cog.bot.invalidations.publish("music_dj_role", guild_id)
 
     async def get_dj_role_id(self, guild_id: int) -> int | None:
         "DJロールを取得します。"
@@ -5,25 +5,32 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, TypeAlias, Literal, Union, Any
 
 from warnings import warn
+from functools import cache
 
 from os.path import exists
 from time import time
 
 import discord
 
-from niconico.niconico import NicoNico
-from niconico.objects import Video, MyListItemVideo
-from yt_dlp import YoutubeDL
 from requests import get
 
+from core.lazy import lazy_import
+
 from data import TEST
 
 from .types_ import MusicType, MusicRaw
 
 if TYPE_CHECKING:
+    from niconico.niconico import NicoNico
+    from niconico.objects import Video, MyListItemVideo
+
     from .__init__ import MusicCog
 
 
+niconico_ = lazy_import("niconico.niconico")
+yt_dlp = lazy_import("yt_dlp")
+
+
 # youtube_dlの音楽再生時に使用するオプション
 NORMAL_OPTIONS = {
     "format": "bestaudio/best",
@@ -69,7 +76,10 @@ def time_to_text(time_: int | float) -> str:
     )
 
 
-niconico = NicoNico()
+@cache
+def get_niconico() -> NicoNico:
+    "ニコニコ動画のクライアントを取得します。最初に使われる時に作られます。"
+    return niconico_.NicoNico()
 def get_niconico_music(
     cog: MusicCog, author: discord.Member, url: str,
     video: Video | MyListItemVideo
@@ -83,7 +93,7 @@ def get_niconico_music(
 
 def get_youtube_data(url: str, mode: Literal["normal", "flat"]) -> dict[str, Any]:
     "YouTubeのデータを取得する関数です。"
-    return YoutubeDL(globals()[f"{mode.upper()}_OPTIONS"]).extract_info(url, download=False)
+    return yt_dlp.YoutubeDL(globals()[f"{mode.upper()}_OPTIONS"]).extract_info(url, download=False)
 
 
 def is_url(url: str) -> bool:
@@ -142,7 +152,7 @@ class Music:
         if self.type_ in (MusicType.youtube, MusicType.soundcloud):
             return get_youtube_data(self.url, "normal")["url"]
         elif self.type_ == MusicType.niconico:
-            self.video = niconico.video.get_video(self.url)
+            self.video = get_niconico().video.get_video(self.url)
             self.video.connect()
             self.on_close = self.video.close
             return self.video.download_link
@@ -183,7 +193,7 @@ class Music:
             # マイリストの場合は取得できるだけ取得する。
             if "mylist" in url:
                 items, length, count_stop = [], 0, True
-                for mylist in niconico.video.get_mylist(url):
+                for mylist in get_niconico().video.get_mylist(url):
                     length += len(mylist.items)
                     items.extend([get_niconico_music(
                         cog, author, item.video.url, item.video
@@ -195,7 +205,7 @@ class Music:
                     count_stop = False
                 return items, count_stop
 
-            video = niconico.video.get_video(url)
+            video = get_niconico().video.get_video(url)
             return get_niconico_music(cog, author, video.url, video.video)
         elif "soundcloud.com" in url or "soundcloud.app.goo.gl" in url:
             # SoundCloud
@@ -48,6 +48,15 @@ class Admin(Cog):
             ), ctx))
         await ctx.reply("Ok")
 
+    @admin.command(aliases=("bc", "全体実行"), description="Run a command on every cluster")
+    @discord.app_commands.describe(
+        name="load, unload, reload or help", extensions="Extension names"
+    )
+    async def broadcast(self, ctx: commands.Context, name: str, *, extensions: str = ""):
+        await ctx.typing()
+        await self.bot.broadcast_command(name, *extensions.split())
+        await ctx.reply("Ok")
+
     @admin.command(aliases=("db", "データベース"), description="Run sql")
     @discord.app_commands.describe(sql="SQL code")
     async def sql(self, ctx: commands.Context, *, sql: str):
@@ -109,6 +118,24 @@ class Admin(Cog):
         embed.add_field(name="Tasks", value=len(all_tasks()))
         await ctx.reply(embed=embed)
 
+    @admin.command(aliases=("cache", "キャッシュ"), description="Displays statistics of cachers.")
+    async def cachers(self, ctx: commands.Context):
+        await ctx.typing()
+        lines = []
+        for cacher in self.bot.cachers.cachers:
+            stats = cacher.stats()
+            lookups = stats["hits"] + stats["misses"]
+            lines.append(
+                "{name}: {size}/{max_size} {kb:.1f}KB hit {rate:.1%} "
+                "evict {evictions} expire {expirations}".format(
+                    kb=stats["bytes"] / 1024,
+                    rate=stats["hits"] / lookups if lookups else 0.0, **stats
+                )
+            )
+        await ctx.reply(embed=Cog.Embed(
+            "Cachers", description=code_block("\n".join(lines) or "Nothing")
+        ))
+
     @admin.command(aliases=("globalban", "グローバルBAN"), description="Modify gban user.")
     @discord.app_commands.describe(mode="Add or Remove", user_id="User ID")
     async def gban(self, ctx, mode: Literal["add", "remove"], user_id: int, reason: str):
@@ -117,9 +144,7 @@ class Admin(Cog):
         result = await getattr(self.bot.cogs["GBan"].data, f"{mode}_user")(user_id, reason)
 
         if result and mode == "add":
-            unavailable_guild_ids = {
-                a async for a in self.bot.cogs["GBan"].data.get_all_guild_ids()
-            }
+            unavailable_guild_ids = self.bot.cogs["GBan"].data.disabled
 
             for guild in self.bot.guilds:
                 if guild.id in unavailable_guild_ids:
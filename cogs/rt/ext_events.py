@@ -8,13 +8,12 @@ from discord.ext import commands
 import discord
 
 from core import Cog, RT
-
-from rtlib.common.cacher import Cacher
+from core.cacher import BoundedCacher
 
 
 @dataclass
 class Caches:
-    members: Cacher[tuple[int, int], int]
+    members: BoundedCacher[tuple[int, int], int]
 
 
 class ExtEvents(Cog):
@@ -27,21 +26,26 @@ class ExtEvents(Cog):
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
         # メンバーのロールの付与と削除のイベントを呼び出します。
-        for role in after.roles:
-            if not role.is_default() and before.get_role(role.id) is None:
-                self.bot.dispatch("member_role_add", after, role)
-        for role in before.roles:
-            if not role.is_default() and after.get_role(role.id) is None:
-                self.bot.dispatch("member_role_remove", after, role)
-
-    def on_member(self, mode: Literal["join", "remove"], member: discord.Member):
+        if before._roles == after._roles:
+            return
+        index = self.bot.role_indexes[after.guild.id]
+        added, removed = index.diff(before, after)
+        for mode, mask in (("add", added), ("remove", removed)):
+            for role_id in index.role_ids(mask):
+                if (role := after.guild.get_role(role_id)) is not None:
+                    self.bot.dispatch(f"member_role_{mode}", after, role)
+
+    def on_member(self, mode: Literal["join", "remove"], member: discord.Member) -> bool:
         if (now := self.caches.members.get((member.guild.id, member.id), 0)) < 3:
             self.caches.members[(member.guild.id, member.id)] = now + 1
             self.bot.dispatch(f"member_{mode}_cooldown", member)
+            return True
+        return False
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        self.on_member("join", member)
+        # 参加時の処理はまとめて行うようにする。詳細は`core.join_pipeline`を参照。
+        self.bot.joins.put(member, self.on_member("join", member))
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
@@ -4,10 +4,15 @@ from __future__ import annotations
 
 from collections.abc import AsyncIterator
 
-from discord.ext import commands
+from functools import partial
+
+from discord.ext import commands, tasks
 import discord
 
 from core import Cog, t, DatabaseManager, cursor, RT
+from core.join_pipeline import make_placeholders
+
+from rtutil.compact import IdSet
 
 from data import FORBIDDEN
 
@@ -18,6 +23,8 @@ class DataManager(DatabaseManager):
     def __init__(self, cog: GBan):
         self.cog = cog
         self.pool = self.cog.bot.pool
+        # 入室毎にデータベースを見ないように、GBANされているユーザーと無効化しているサーバーはメモリに置いておく。
+        self.users, self.disabled = IdSet(), IdSet()
 
     async def prepare_table(self) -> None:
         "テーブルの準備をします。"
@@ -32,6 +39,36 @@ class DataManager(DatabaseManager):
                 GuildId BIGINT PRIMARY KEY NOT NULL
             );"""
         )
+        await self.load(cursor=cursor)
+
+    async def load(self, **_) -> None:
+        "GBANされているユーザーのIDと、機能を無効化しているサーバーのIDを全て読み込みます。"
+        self.users.replace([
+            user_id async for user_id in self.get_all_user_ids(cursor=cursor)
+        ])
+        self.disabled.replace([
+            guild_id async for guild_id in self.get_all_guild_ids(cursor=cursor)
+        ])
+
+    async def sync(self) -> bool:
+        """データベースとメモリ上のGBANリストと無効化しているサーバーの、件数とチェックサムを比べます。
+        違う場合はそのテーブルを読み込み直します。他のプロセスでの変更を反映するためのものです。
+        どちらかを読み込み直した場合は`True`を返します。"""
+        reloaded = False
+        for table, column, ids, load in (
+            ("GlobalBan", "UserId", self.users, self.get_all_user_ids),
+            ("GlobalBanSetting", "GuildId", self.disabled, self.get_all_guild_ids)
+        ):
+            await cursor.execute(f"SELECT COUNT(*), BIT_XOR({column}) FROM {table};")
+            row = await cursor.fetchone()
+            if row is not None and (row[0], int(row[1] or 0)) != (len(ids), ids.checksum):
+                ids.replace([id_ async for id_ in load(cursor=cursor)])
+                reloaded = True
+        return reloaded
+
+    def is_target(self, user_id: int, guild_id: int) -> bool:
+        "ユーザーが指定されたサーバーでBANされるべきかをメモリ上のデータで調べます。"
+        return guild_id not in self.disabled and user_id in self.users
 
     async def add_user(self, user_id: int, reason: str) -> bool:
         "ユーザーを追加します。"
@@ -40,6 +77,7 @@ class DataManager(DatabaseManager):
                 "INSERT INTO GlobalBan VALUES (%s, %s);",
                 (user_id, reason)
             )
+            self.users.add(user_id)
             return True
         return False
 
@@ -50,20 +88,17 @@ class DataManager(DatabaseManager):
                 "DELETE FROM GlobalBan WHERE UserId = %s;",
                 (user_id,)
             )
+            self.users.discard(user_id)
             return True
         return False
 
-    async def is_guild_exists(self, guild_id: int, **_) -> bool:
+    def is_guild_exists(self, guild_id: int) -> bool:
         "サーバーがデータ内に存在するか調べます。"
-        await cursor.execute(
-            "SELECT * FROM GlobalBanSetting WHERE GuildId = %s LIMIT 1;",
-            (guild_id,)
-        )
-        return bool(await cursor.fetchone())
+        return guild_id in self.disabled
 
     async def check(self, user_id: int, guild_id: int) -> str | None:
         "ユーザーが指定されたサーバーでBANされるべきかを調べます。もしそうなら理由を返します。"
-        if await self.is_guild_exists(guild_id, cursor=cursor):
+        if not self.is_target(user_id, guild_id):
             return None
         return await self.get_reason(user_id, cursor=cursor)
 
@@ -76,12 +111,21 @@ class DataManager(DatabaseManager):
         row = await cursor.fetchone()
         return row[0] if row else None
 
-    async def get_all_user_ids(self) -> AsyncIterator[int]:
+    async def get_reasons(self, user_ids: list[int], **_) -> dict[int, str]:
+        "複数のユーザーのGBAN理由をまとめて取得します。"
+        await cursor.execute(
+            "SELECT UserId, Reason FROM GlobalBan WHERE UserId IN ({});".format(
+                make_placeholders(len(user_ids))
+            ), user_ids
+        )
+        return {row[0]: row[1] for row in await cursor.fetchall()}
+
+    async def get_all_user_ids(self, **_) -> AsyncIterator[int]:
         "データベース内に存在する全ユーザーを検索します。"
         async for row in self.fetchstep(cursor, "SELECT UserId FROM GlobalBan;"):
             yield row[0]
 
-    async def get_all_guild_ids(self) -> AsyncIterator[int]:
+    async def get_all_guild_ids(self, **_) -> AsyncIterator[int]:
         "機能を無効化している全サーバーの設定を抽出します。"
         async for row in self.fetchstep(cursor, "SELECT * FROM GlobalBanSetting;"):
             yield row[0]
@@ -89,7 +133,7 @@ class DataManager(DatabaseManager):
     async def toggle_gban(self, guild_id) -> bool:
         "サーバーのGBAN機能のオンオフを切り替えます。"
         await cursor.execute(
-            "SELECT * FROM GBanSetting WHERE GuildId = %s LIMIT 1;",
+            "SELECT * FROM GlobalBanSetting WHERE GuildId = %s LIMIT 1;",
             (guild_id,)
         )
         if await cursor.fetchone():
@@ -97,24 +141,34 @@ class DataManager(DatabaseManager):
                 "DELETE FROM GlobalBanSetting WHERE GuildId = %s;",
                 (guild_id,)
             )
+            self.disabled.discard(guild_id)
             return True
         else:
             await cursor.execute(
                 "INSERT INTO GlobalBanSetting VALUES (%s);",
                 (guild_id,)
             )
+            self.disabled.add(guild_id)
             return False
 
     async def clean(self) -> None:
         "データを掃除します。"
-        for table, column in (("GlobalBanSetting", "Guild"), ("GlobalBan", "User")):
+        for table, column, ids in (
+            ("GlobalBanSetting", "Guild", self.disabled), ("GlobalBan", "User", self.users)
+        ):
             lowered = column.lower()
-            async for id_ in getattr(self, f"get_all_{lowered}_ids")():
-                if not await self.cog.bot.exists(lowered, id_):
-                    await cursor.execute(
-                        f"DELETE FROM {table[0]} WHERE {column}Id = %s;",
-                        (id_,)
-                    )
+            # 読み込み中の同じカーソルで削除をすると残りの行が読めなくなるので、先に全部集めておく。
+            targets = [
+                id_ async for id_ in getattr(self, f"get_all_{lowered}_ids")(cursor=cursor)
+                if not await self.cog.bot.exists(lowered, id_)
+            ]
+            if targets:
+                await cursor.execute(
+                    f"DELETE FROM {table} WHERE {column}Id IN ({make_placeholders(len(targets))});",
+                    targets
+                )
+                for id_ in targets:
+                    ids.discard(id_)
 
 
 class GlobalBanEventContext(Cog.EventContext):
@@ -133,6 +187,18 @@ class GBan(Cog):
 
     async def cog_load(self) -> None:
         await self.data.prepare_table()
+        self.sync_users.start()
+        self.bot.joins.register("GBan", self.on_joins)
+
+    async def cog_unload(self) -> None:
+        self.sync_users.cancel()
+        self.bot.joins.unregister("GBan")
+
+    @tasks.loop(minutes=5)
+    async def sync_users(self):
+        # 他のプロセスで行われた追加や削除を反映させる。
+        if await self.data.sync():
+            self.bot.logger.info("[GBan] Reloaded the global ban list")
 
     @commands.group(description="GlobalBan commands")
     async def gban(self, ctx):
@@ -180,10 +246,18 @@ class GBan(Cog):
             self.gban, user=user, reason=reason
         ))
 
-    @Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        if (reason := await self.data.check(member.id, member.guild.id)):
-            await self.ban(member.guild, member, reason)
+    async def on_joins(self, members: list[discord.Member]) -> None:
+        # 参加したメンバーをまとめて調べて、GBANされている人はBANする。
+        if targets := [
+            member for member in members
+            if self.data.is_target(member.id, member.guild.id)
+        ]:
+            reasons = await self.data.get_reasons(list({member.id for member in targets}))
+            for member in targets:
+                if member.id in reasons:
+                    self.bot.joins.actions.put(member.guild.id, partial(
+                        self.ban, member.guild, member, reasons[member.id]
+                    ), priority=True)
 
     Cog.HelpCommand(gban) \
         .merge_description("headline", ja="GBAN機能です。") \
@@ -13,20 +13,39 @@ from discord.ext.fslash import Context
 from core.utils import make_default
 from core.types_ import CmdGrp
 from core.help import CONV, ANNOTATIONS
+from core.catalog import catalog
 from core import RT, Cog, Embed, t
+from core.cacher import BoundedCacher
 
 from rtutil.converters import DateTimeFormatNotSatisfiable
 from rtutil.views import TimeoutView
 
 from rtlib.common.utils import code_block, make_error_message
 from rtlib.common.reply_error import ReplyError
-from rtlib.common.cacher import Cacher
 
 from data import TEST, SUPPORT_SERVER, PERMISSION_TEXTS
 
 from .help import HelpView
 
 
+# エラー時によく使う文字列です。
+SHOW_HELP = catalog(ja="ヘルプを見る。", en="Show help")
+SUPPORT_SERVER_LABEL = catalog(ja="サポートサーバー", en="Support Server")
+BAD_ARGUMENT = catalog(
+    ja="引数がおかしいです。\nCode:`{code}`", en="The argument format is incorrect.\nCode:`{code}`"
+)
+MISSING_ARGUMENT = catalog(ja="引数が足りません。", en="Argument is missing.")
+ON_COOLDOWN = catalog(
+    ja="クールダウン中です。\n{seconds:.2f}秒お待ちください。",
+    en="It is currently on cool down.\nPlease wait for {seconds:.2f}s."
+)
+PERHAPS = catalog(ja="もしかして：", en="Perhaps: ")
+COMMAND_NOT_FOUND = catalog(
+    ja="コマンドが見つかりませんでした。{suggetion}", en="That command is not found.{suggetion}"
+)
+UNKNOWN_STATUS = catalog(ja="エラー", en="Error")
+
+
 RT_INFO = {
     "ja": cleandoc(
         """どうも、Rextが運営しているRTです。
@@ -74,7 +93,7 @@ class General(Cog):
         self.status_modes = ("guilds", "users")
         self.now_status_mode = "guilds"
 
-        self._replied_caches: Cacher[int, list[str]] = \
+        self._replied_caches: BoundedCacher[int, list[str]] = \
             self.bot.cachers.acquire(5.0, list)
 
         self._dayly.start()
@@ -175,7 +194,7 @@ class General(Cog):
     @tasks.loop(hours=1 if TEST else 24)
     async def _dayly(self):
         # 掃除をする。
-        if not self.bot.shard_id:
+        if not self.bot.shard_id and not self.bot.cluster.id:
             await self.clean()
 
     async def cog_unload(self):
@@ -183,12 +202,12 @@ class General(Cog):
         self._dayly.cancel()
 
     STATUS_MESSAGES = {
-        400: {"ja": "おかしいリクエスト", "en": "Bad Request"},
-        403: {"ja": "権限エラー", "en": "Forbidden"},
-        404: {"ja": "見つからないエラー", "en": "NotFound"},
-        423: {"ja": "鍵がかかっています", "en": "Locked"},
-        429: {"ja": "リクエスト過多", "en": "Too Many Requests"},
-        500: {"ja": "内部エラー", "en": "Internal Server Error"}
+        400: catalog(ja="おかしいリクエスト", en="Bad Request"),
+        403: catalog(ja="権限エラー", en="Forbidden"),
+        404: catalog(ja="見つからないエラー", en="NotFound"),
+        423: catalog(ja="鍵がかかっています", en="Locked"),
+        429: catalog(ja="リクエスト過多", en="Too Many Requests"),
+        500: catalog(ja="内部エラー", en="Internal Server Error")
     }
 
     async def reply_error(
@@ -199,7 +218,7 @@ class General(Cog):
         "エラーの返信を行う。"
         await ctx.reply(embed=discord.Embed(
             title="{} {}".format(
-                status, t(self.STATUS_MESSAGES.get(status, {'ja': 'エラー', 'en': 'Error'}), ctx)
+                status, t(self.STATUS_MESSAGES.get(status, UNKNOWN_STATUS), ctx)
             ), description=content,
             color=getattr(self.bot.Colors, color)
         ), view=view)
@@ -209,9 +228,7 @@ class General(Cog):
         if not message.content.startswith(tuple(await self.bot.get_prefix(message))):
             self.bot.dispatch("message_noprefix", message)
 
-    BAD_ARGUMENT = staticmethod(lambda ctx, code: t(dict(
-        ja="引数がおかしいです。\nCode:`{code}`", en="The argument format is incorrect.\nCode:`{code}`"
-    ), ctx, code=code))
+    BAD_ARGUMENT = staticmethod(lambda ctx, code: t(BAD_ARGUMENT, ctx, code=code))
 
     @commands.Cog.listener()
     async def on_command_error(
@@ -235,8 +252,7 @@ class General(Cog):
         view = None
         if ctx.command is not None:
             view = ShowHelpView(self.bot, ctx.command, (
-                t(dict(ja="ヘルプを見る。", en="Show help"), ctx),
-                t(dict(ja="サポートサーバー", en="Support Server"), ctx)
+                t(SHOW_HELP, ctx), t(SUPPORT_SERVER_LABEL, ctx)
             ))
         content, status = None, 400
 
@@ -250,9 +266,7 @@ class General(Cog):
         elif isinstance(error, commands.UserInputError):
             content = self.BAD_ARGUMENT(ctx, error)
             if isinstance(error, commands.MissingRequiredArgument):
-                content = t(dict(
-                    ja="引数が足りません。", en="Argument is missing."
-                ), ctx)
+                content = t(MISSING_ARGUMENT, ctx)
             elif isinstance(error, commands.BadArgument):
                 if error.__class__.__name__.endswith("NotFound"):
                     status = 404
@@ -329,10 +343,7 @@ class General(Cog):
                 ), ctx)
         elif isinstance(error, commands.CommandOnCooldown):
             status = 429
-            content = t(dict(
-                ja="クールダウン中です。\n{seconds:.2f}秒お待ちください。",
-                en="It is currently on cool down.\nPlease wait for {seconds:.2f}s."
-            ), ctx, seconds=error.retry_after)
+            content = t(ON_COOLDOWN, ctx, seconds=error.retry_after)
         elif isinstance(error, commands.MaxConcurrencyReached):
             name = getattr(ctx.command, "name", "")
             content = t(dict(
@@ -359,11 +370,9 @@ class General(Cog):
                 suggestion = ""
             if suggestion:
                 suggestion = "\n{}`{}`".format(
-                    t({'ja': 'もしかして：', 'en': 'Perhaps: '}, ctx), suggestion
+                    t(PERHAPS, ctx), suggestion
                 )
-            content = t(dict(
-                ja="コマンドが見つかりませんでした。{suggetion}", en="That command is not found.{suggetion}"
-            ), ctx, suggetion=suggestion)
+            content = t(COMMAND_NOT_FOUND, ctx, suggetion=suggestion)
             status = 404
 
         if content is None:
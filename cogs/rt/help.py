@@ -122,38 +122,40 @@ RESULT_TYPES = {
 
 async def help_autocomplete(_, current: str) \
         -> list[discord.app_commands.Choice[str]]:
-    current = current.lower()
-    self = __help_cog__
-    result = [discord.app_commands.Choice(name="...", value="...")]
-    i = 0
-    for category in list(self.bot.help_.data.keys()):
-        if current in category:
-            i += 1
-            result.append(discord.app_commands.Choice(name=category, value=category))
-        for command_name, _ in list(self.bot.help_.data[category].items()):
-            if current in command_name:
-                i += 1
-                result.append(discord.app_commands.Choice(
-                    name=command_name, value=command_name
-                ))
-    if result and result[0].name == "..." and result[0].value == "...":
-        result = result[1:]
-    if i > 25:
-        result = result[:25]
-    return result
+    return [
+        discord.app_commands.Choice(name=name, value=name)
+        for name in (
+            category if command_name is None else command_name
+            for category, command_name in __help_cog__.bot.help_.index.search(current)
+        )
+    ]
 
 
 class HelpCog(Cog, name="Help"): # type: ignore
     def __init__(self, bot: RT):
         self.bot = bot
+        self._parts: dict[tuple[str, Optional[str], Optional[str]], EmbedParts] = {}
         global __help_cog__
         __help_cog__ = self
 
+    @commands.Cog.listener()
+    async def on_help_load(self):
+        self._parts.clear()
+
     def make_parts(
         self, language: str, category_name: Optional[str] = None,
         command_name: Optional[str] = None
     ) -> EmbedParts:
-        "ヘルプ用の埋め込みのパーツを作る。"
+        "ヘルプ用の埋め込みのパーツを作る。一度作ったものはヘルプが読み込み直されるまで使い回します。"
+        key = (language, category_name, command_name)
+        if key not in self._parts:
+            self._parts[key] = self._make_parts(*key)
+        return self._parts[key]
+
+    def _make_parts(
+        self, language: str, category_name: Optional[str],
+        command_name: Optional[str]
+    ) -> EmbedParts:
         level: Literal[0, 1, 2] = 0
         description: str | list[str] = FIRST_OF_HELP[language]
         title = "Help"
@@ -198,21 +200,21 @@ class HelpCog(Cog, name="Help"): # type: ignore
             found = True
         else:
             # ヘルプを検索する。全一致時は即終了する。
-            result: defaultdict[Literal["contain", "detail_contain"], list[tuple[str, str]]] = \
-                defaultdict(list)
-            for category in list(self.bot.help_.data.keys()):
-                if category == word:
-                    command_name = None; found = True; break
-                for command_name, detail in list(self.bot.help_.data[category].items()):
-                    if command_name == word:
-                        found = True; break
-                    if word in command_name:
-                        result["contain"].append((category, command_name))
-                    if word in detail.description.get(language, "...") \
-                            or any(word in extra for extra in list(detail.extras.values())):
-                        result["detail_contain"].append((category, command_name))
-                else: continue
-                break
+            if (entry := self.bot.help_.index.get(word)) is not None:
+                category, command_name = entry
+                found = True
+            else:
+                result: defaultdict[Literal["contain", "detail_contain"], list[tuple[str, str]]] = \
+                    defaultdict(list)
+                result["contain"] = [
+                    entry for entry in self.bot.help_.index.contains(word) # type: ignore
+                    if entry[1] is not None
+                ]
+                for category, helps in list(self.bot.help_.data.items()):
+                    for command_name, detail in list(helps.items()):
+                        if word in detail.description.get(language, "...") \
+                                or any(word in extra for extra in list(detail.extras.values())):
+                            result["detail_contain"].append((category, command_name))
 
         if found:
             # 全一致した場合
@@ -32,9 +32,7 @@ class DataManager(DatabaseManager):
     async def update_cache(self, mode: Mode, **_):
         "キャッシュを更新します。"
         await cursor.execute("SELECT * FROM {}Language;".format(mode))
-        lower_mode = mode.lower()
-        for row in await cursor.fetchall():
-            getattr(self.bot.language, lower_mode)[row[0]] = row[1]
+        getattr(self.bot.language, mode.lower()).update(await cursor.fetchall())
 
     async def update_all_cache(self):
         "全てのキャッシュを更新します。"
@@ -58,6 +56,8 @@ class DataManager(DatabaseManager):
                 (id_, language, language)
             )
             getattr(self.bot.language, mode.lower())[id_] = language
+        # 他のプロセスのキャッシュにも反映させる。
+        self.bot.invalidations.publish("language", (mode, id_), language)
 
     async def clean(self):
         "ゴミデータを消します。"
@@ -77,6 +77,14 @@ class Language(Cog):
     async def cog_load(self):
         await self.data.prepare_table()
 
+    @commands.Cog.listener()
+    async def on_invalidate_language(self, key: tuple[Mode, int], language: Optional[str]):
+        mode, id_ = key
+        if language is None:
+            getattr(self.bot.language, mode.lower()).pop(id_, None)
+        else:
+            getattr(self.bot.language, mode.lower())[id_] = language
+
     @commands.command(
         aliases=("lang", "言語", "言葉"),
         description="Language setting per user/server"
@@ -13,7 +13,7 @@ import discord
 
 from core.utils import truncate, make_default, concat_text
 from core.types_ import Text
-from rtlib.common.cacher import Cacher
+from core.cacher import IdCacher
 from core.log import LogData
 from core import RT, Cog, t
 
@@ -184,8 +184,8 @@ AFTER_TEXT = {"ja": "後", "en": "After"}
 class DiscordLog(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
-        self.caches: Cacher[discord.TextChannel, list[discord.Embed]] = \
-            self.bot.cachers.acquire(30.0, list)
+        self.caches: IdCacher[list[discord.Embed]] = \
+            self.bot.cachers.acquire_by_id(30.0, list)
         self.send_log.start()
 
     @commands.Cog.listener()
@@ -206,15 +206,17 @@ class DiscordLog(Cog):
 
     @tasks.loop(seconds=5)
     async def send_log(self):
-        for channel, embeds in list(self.caches.items()):
-            if embeds:
+        for channel_id, embeds in list(self.caches.items()):
+            # チャンネルのオブジェクトを残さないように、キャッシュにはIDだけを入れている。
+            channel = self.bot.get_channel(channel_id) # allow-get
+            if embeds and isinstance(channel, discord.TextChannel):
                 try:
                     await channel.send(embeds=embeds[:10])
                     if embeds := embeds[10:]:
                         await channel.send(embeds=embeds[:10])
                 except Exception as e:
                     self.bot.ignore(self, e, "\nEmbed:", embeds[int(str(e).split(".")[1])].title)
-            del self.caches[channel]
+            del self.caches[channel_id]
 
     async def cog_unload(self):
         self.send_log.cancel()
@@ -6,6 +6,7 @@ from discord.ext import commands
 from discord import app_commands
 import discord
 
+from core.warmup import WarmUp
 from core import RT, Cog, t, DatabaseManager, cursor
 
 
@@ -13,6 +14,10 @@ TableType: TypeAlias = Literal["Guild", "User"]
 class DataManager(DatabaseManager):
     def __init__(self, bot: RT):
         self.pool, self.bot = bot.pool, bot
+        self.warm_up = WarmUp(bot, "GuildPrefix", self._cache)
+
+    def _cache(self, row: tuple) -> None:
+        self.bot.prefixes["Guild"][row[0]] = row[1]
 
     async def prepare_table(self):
         "テーブルを用意します。"
@@ -22,9 +27,14 @@ class DataManager(DatabaseManager):
                     {table}Id BIGINT PRIMARY KEY NOT NULL, Prefix TEXT
                 );"""
             )
-            async for rows in self.fetchstep(cursor, f"SELECT * FROM {table}Prefix;"):
-                for row in rows:
-                    self.bot.prefixes[table][row[0]] = row[1]
+            if table == "Guild":
+                await self.warm_up.load()
+            else:
+                self.bot.prefixes[table].update([
+                    (row[0], row[1]) async for row in self.fetchstep(
+                        cursor, f"SELECT * FROM {table}Prefix;"
+                    )
+                ])
 
     async def set(self, table: TableType, id_: int, prefix: Optional[str] = None):
         "プリフィックスを設定します。"
@@ -42,6 +52,8 @@ class DataManager(DatabaseManager):
                 (id_, prefix, prefix)
             )
             self.bot.prefixes[table][id_] = prefix
+        # 他のプロセスのキャッシュにも反映させる。
+        self.bot.invalidations.publish("prefix", (table, id_), prefix)
 
     async def clean(self):
         "お掃除します。"
@@ -64,6 +76,14 @@ class Prefix(Cog):
     async def cog_load(self):
         await self.data.prepare_table()
 
+    @commands.Cog.listener()
+    async def on_invalidate_prefix(self, key: tuple[TableType, int], prefix: Optional[str]):
+        table, id_ = key
+        if prefix is None:
+            self.bot.prefixes[table].pop(id_, None)
+        else:
+            self.bot.prefixes[table][id_] = prefix
+
     MO_MSG = {
         "server": {"ja": "このサーバー", "en": 'on this server'},
         "user": {"ja": "あなた", "en": 'of yours'}
@@ -13,8 +13,8 @@ import discord
 from orjson import dumps, loads
 
 from core import RT, Cog, t, DatabaseManager, cursor
-
-from rtlib.common.cacher import Cacher
+from core.join_pipeline import make_placeholders
+from core.cacher import IdCacher, BoundedCacher
 
 from data import OFF_ALIASES, FORBIDDEN, ROLE_NOTFOUND
 
@@ -31,7 +31,7 @@ class DataManager(DatabaseManager):
     def __init__(self, cog: Captcha):
         self.cog = cog
         self.pool = self.cog.bot.pool
-        self.caches: Cacher[int, RowData | None] = self.cog.bot.cachers.acquire(1800.0)
+        self.caches: BoundedCacher[int, RowData | None] = self.cog.bot.cachers.acquire(1800.0)
 
     async def prepare_table(self) -> None:
         "テーブルを作ります。"
@@ -49,6 +49,9 @@ class DataManager(DatabaseManager):
             "UPDATE Captcha SET DeadlineAfter = %s, Kick = %s WHERE GuildId = %s;",
             (deadline, kick, guild_id)
         )
+        if guild_id in self.caches:
+            del self.caches[guild_id]
+        self.cog.bot.invalidations.publish("captcha", guild_id)
 
     async def write(
         self, guild_id: int, role_id: int,
@@ -63,6 +66,7 @@ class DataManager(DatabaseManager):
         )
         if guild_id in self.caches:
             self.caches[guild_id] = RowData(*row[:-1], extras)
+        self.cog.bot.invalidations.publish("captcha", guild_id)
 
     async def delete(self, guild_id: int) -> None:
         "設定を削除します。"
@@ -72,6 +76,7 @@ class DataManager(DatabaseManager):
         )
         if guild_id in self.caches:
             self.caches[guild_id] = None
+        self.cog.bot.invalidations.publish("captcha", guild_id)
 
     async def read(self, guild_id: int) -> RowData | None:
         "設定を読み込みます。"
@@ -80,10 +85,25 @@ class DataManager(DatabaseManager):
                 "SELECT * FROM Captcha WHERE GuildId = %s;",
                 (guild_id,)
             )
-            if row := await cursor.fetchone():
-                self.caches[guild_id] = RowData(*row[:-1], loads(row[-1])) # type: ignore
+            row = await cursor.fetchone()
+            self.caches[guild_id] = RowData(*row[:-1], loads(row[-1])) \
+                if row else None # type: ignore
         return self.caches.get(guild_id, None)
 
+    async def read_many(self, guild_ids: set[int], **_) -> dict[int, RowData | None]:
+        "複数のサーバーの設定をまとめて読み込みます。キャッシュにないものだけデータベースから取得します。"
+        if targets := [guild_id for guild_id in guild_ids if guild_id not in self.caches]:
+            await cursor.execute(
+                "SELECT * FROM Captcha WHERE GuildId IN ({});".format(
+                    make_placeholders(len(targets))
+                ), targets
+            )
+            for guild_id in targets:
+                self.caches[guild_id] = None
+            for row in await cursor.fetchall():
+                self.caches[row[0]] = RowData(*row[:-1], loads(row[-1])) # type: ignore
+        return {guild_id: self.caches.get(guild_id, None) for guild_id in guild_ids}
+
 
 @dataclass
 class Parts:
@@ -98,7 +118,7 @@ class Parts:
 class Captcha(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
-        self.queues: Cacher[tuple[int, discord.Member], CaptchaContext] = self.bot.cachers.acquire(
+        self.queues: IdCacher[CaptchaContext] = self.bot.cachers.acquire_by_id(
             10800.0, on_dead=self.on_dead_queue
         )
         self.parts = Parts(*(globals()[name](self) for name in Parts.__annotations__.values()))
@@ -110,6 +130,12 @@ class Captcha(Cog):
 
     async def cog_load(self):
         await self.data.prepare_table()
+        self.bot.joins.register("Captcha", self.on_joins)
+        self._invalidation = self.bot.invalidations.watch_cacher("captcha", self.data.caches)
+
+    async def cog_unload(self):
+        self.bot.joins.unregister("Captcha")
+        self.bot.invalidations.unsubscribe("captcha", self._invalidation)
 
     @commands.Cog.listener()
     async def on_setup(self):
@@ -146,20 +172,27 @@ class Captcha(Cog):
         "CaptchaPartを手に入れます。"
         return getattr(self.parts, type_)
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        data = await self.data.read(member.guild.id)
-        if data is not None:
-            self.queues[(member.guild.id, member)] = CaptchaContext(
-                data=data, part=self.get_part(data.mode), member=member,
-                event_context=Cog.EventContext(
-                    self.bot, member.guild, "ERROR", {
-                        "ja": "認証成功時のロール付与",
-                        "en": "Granting roles upon successful authentication"
-                    }, feature=self.captcha
-                )
+    def start(self, member: discord.Member, data: RowData) -> None:
+        "メンバーを認証の対象にします。"
+        self.queues[(member.guild.id, member)] = CaptchaContext(
+            data=data, part=self.get_part(data.mode), member=member,
+            event_context=Cog.EventContext(
+                self.bot, member.guild, "ERROR", {
+                    "ja": "認証成功時のロール付与",
+                    "en": "Granting roles upon successful authentication"
+                }, feature=self.captcha
             )
-            self.queues.set_deadline((member.guild.id, member), time() + data.deadline)
+        )
+        self.queues.set_deadline((member.guild.id, member), time() + data.deadline)
+        if data.mode == "image":
+            # 認証が始まる前に画像の補充を始めておく。
+            self.parts.image.pool.refill()
+
+    async def on_joins(self, members: list[discord.Member]) -> None:
+        datas = await self.data.read_many({member.guild.id for member in members})
+        for member in members:
+            if (data := datas[member.guild.id]) is not None:
+                self.start(member, data)
 
     @overload
     async def on_success(
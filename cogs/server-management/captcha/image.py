@@ -1,22 +1,66 @@
 # RT - Image Captcha
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from collections import deque
 from random import randint
 from io import BytesIO
 
 import discord
 
-from jishaku.functools import executor_function
-from captcha.image import ImageCaptcha
-
 from core import t
 
 from rtutil.views import TimeoutView
 from rtutil.utils import make_random_string
+from rtutil.captcha_image import LENGTH, generate_image
 
-from .part import CaptchaPart, CaptchaContext, FAILED_CODE
+from data import DATA
 
+from .part import CaptchaPart, CaptchaContext, FAILED_CODE
 
-LENGTH = 5
+if TYPE_CHECKING:
+    from core import RT
+
+
+class ImagePool:
+    """事前に生成したCaptcha用の画像と答えの組を貯めておくためのプールです。
+    残りが`low`以下になったら、`RT.executors.process`で`size`個になるまで補充します。
+    補充は一枚ずつ依頼するので、プールが空の時にその場で生成する分が補充の後ろで長く待たされることはありません。"""
+
+    def __init__(self, bot: RT, size: int = 64, low: int = 16):
+        self.bot, self.size, self.low = bot, size, low
+        self.images: deque[tuple[str, bytes]] = deque(maxlen=size)
+        self._refilling = False
+
+    def refill(self) -> None:
+        "プールの残りが少ない場合は補充を始めます。"
+        if not self._refilling and len(self.images) <= self.low:
+            self._refilling = True
+            self.bot.loop.create_task(self._refill(), name="RT.Captcha.RefillImagePool")
+
+    async def _refill(self) -> None:
+        try:
+            while len(self.images) < self.size:
+                self.images.append(await self.bot.loop.run_in_executor(
+                    self.bot.executors.process, generate_image
+                ))
+        except Exception as e:
+            self.bot.logger.warning("[Captcha] Failed to refill the image pool: %s", e)
+        finally:
+            self._refilling = False
+
+    async def get(self) -> tuple[str, bytes]:
+        "プールから画像を取り出します。プールが空の場合はその場で生成します。"
+        if self.images:
+            image = self.images.popleft()
+            self.refill()
+            return image
+        # 補充より先にエグゼキューターに依頼しないと、補充の分の生成が終わるまで待たされてしまう。
+        future = self.bot.loop.run_in_executor(self.bot.executors.process, generate_image)
+        self.refill()
+        return await future
 
 
 class SelectNumber(TimeoutView):
@@ -48,16 +92,17 @@ class SelectNumber(TimeoutView):
 class ImageCaptchaPart(CaptchaPart):
     "画像認証のパーツです。"
     def __init__(self, *args, **kwargs):
-        self.generator = ImageCaptcha()
         super().__init__(*args, **kwargs)
-
-    @executor_function
-    def generate_image(self, characters: str | None = None) \
-            -> tuple[BytesIO | None, str]:
-        "Captcha用の画像を生成します。"
-        return self.generator.generate(
-            characters := characters or make_random_string(LENGTH)
-        ), characters
+        self.pool = ImagePool(self.cog.bot, **DATA.get("captcha_image_pool", {})) # type: ignore
+
+    async def generate_image(self) -> tuple[BytesIO | None, str]:
+        "Captcha用の画像を取得します。"
+        try:
+            password, data = await self.pool.get()
+        except Exception as e:
+            self.cog.bot.ignore(self.cog, e, subject="failed to generate captcha image:")
+            return None, ""
+        return BytesIO(data), password
 
     async def on_button_push(self, ctx: CaptchaContext, interaction: discord.Interaction) -> None:
         data, password = await self.generate_image()
@@ -10,8 +10,7 @@ from time import time
 import discord
 
 from core import t
-
-from rtlib.common.cacher import Cacher
+from core.cacher import BoundedCacher
 
 if TYPE_CHECKING:
     from core.rtevent import EventContext
@@ -40,7 +39,7 @@ class CaptchaContext(SimpleNamespace):
 class CaptchaView(discord.ui.View):
     def __init__(self, cog: Captcha, *args, **kwargs):
         self.cog = cog
-        self._cache: Cacher[tuple[int, int], tuple[float, int]] = \
+        self._cache: BoundedCacher[tuple[int, int], tuple[float, int]] = \
             self.cog.bot.cachers.acquire(1800.0)
         kwargs.setdefault("timeout", None)
         super().__init__(*args, **kwargs)
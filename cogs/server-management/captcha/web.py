@@ -26,12 +26,12 @@ class WebCaptchaPart(CaptchaPart):
         ), interaction), view=view, ephemeral=True)
 
     async def on_success(self, user_id: int) -> str:
-        for guild_id, member in self.cog.queues.keys():
-            if member.id == user_id:
+        for guild_id, member_id in self.cog.queues.keys():
+            if member_id == user_id:
                 break
         else:
             return t(dict(
                 ja="あなたは認証対象ではないようです。",
                 en="It appears that you are not eligible for captcha."
             ), user_id)
-        return await self.cog.on_success(self.cog.queues[(guild_id, member)], None)
\ No newline at end of file
+        return await self.cog.on_success(self.cog.queues[(guild_id, member_id)], None)
\ No newline at end of file
@@ -101,7 +101,7 @@ class ChannelMessage(Cog):
             detail = ""
             try:
                 await artificially_send(
-                    channel, channel.guild.get_member(data["author"]) or channel.guild.me,
+                    channel, channel.guild.get_member(data["author"]) or channel.guild.me, # allow-get
                     **content_data.disable_content_json(data)["content"]
                 )
             except discord.Forbidden:
@@ -8,13 +8,14 @@ from dataclasses import dataclass
 from discord.ext import commands
 import discord
 
+from core.warmup import WarmUp
 from core import Cog, RT, t, DatabaseManager, cursor
+from core.cacher import IdCacher
 
 from rtutil.content_data import ContentData, disable_content_json, to_text
 from rtutil.views import separate_to_embeds, EmbedPage
 from rtutil.utils import is_json
 
-from rtlib.common.cacher import Cacher
 from rtlib.common.json import dumps, loads
 
 from data import (
@@ -47,6 +48,10 @@ class DataManager(DatabaseManager):
         self.cog = cog
         self.caches: defaultdict[int, dict[str, CommandData]] = defaultdict(dict)
         self.pool = self.cog.bot.pool
+        self.warm_up = WarmUp(self.cog.bot, "OriginalCommand", self._cache)
+
+    def _cache(self, row: tuple) -> None:
+        self.caches[row[0]][row[1]] = CommandData.from_row(row)
 
     async def prepare_table(self) -> None:
         "テーブルを作ります。"
@@ -55,8 +60,7 @@ class DataManager(DatabaseManager):
                 GuildId BIGINT, Command TEXT, Response JSON, Full BOOLEAN
             );"""
         )
-        async for row in self.fetchstep(cursor, "SELECT * FROM OriginalCommand;"):
-            self.caches[row[0]][row[1]] = CommandData.from_row(row)
+        await self.warm_up.load()
 
     async def read(self, guild_id: int, **_) -> list[CommandData]:
         "データを読み込みます。"
@@ -121,7 +125,7 @@ class OriginalCommand(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
         self.data = DataManager(self)
-        self.sent: Cacher[discord.Member, int] = self.bot.cachers.acquire(15.0)
+        self.sent: IdCacher[int] = self.bot.cachers.acquire_by_id(15.0)
 
     async def cog_load(self):
         await self.data.prepare_table()
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
-from typing import Literal
+from typing import TypeAlias, Literal
 from collections.abc import Iterator
 
+from asyncio import Semaphore, gather
+from datetime import datetime
 from enum import Enum
 from re import findall
 
@@ -12,8 +14,8 @@ from discord.ext import commands
 import discord
 
 from core import RT, Cog, t, DatabaseManager, cursor
+from core.cacher import BoundedCacher
 
-from rtlib.common.cacher import Cacher
 from rtutil.utils import unwrap_or, artificially_send
 
 from .__init__ import FSPARENT
@@ -31,7 +33,7 @@ class DataManager(DatabaseManager):
     def __init__(self, cog: Expander):
         self.cog = cog
         self.pool = self.cog.bot.pool
-        self.caches: Cacher[int, Method] = self.cog.bot.cachers.acquire(3600.0)
+        self.caches: BoundedCacher[int, Method] = self.cog.bot.cachers.acquire(3600.0)
 
     async def prepare_table(self) -> None:
         "テーブルを作ります。"
@@ -61,6 +63,7 @@ class DataManager(DatabaseManager):
             (guild_id, method.name, method.name)
         )
         self.caches[guild_id] = method
+        self.cog.bot.invalidations.publish("expander", guild_id)
 
     async def clean(self) -> None:
         "お掃除をします。"
@@ -82,14 +85,28 @@ def expand(content: str) -> Iterator[tuple[int, int, int]]:
             yield tuple(map(int, (guild_id, channel_id, message_id))) # type: ignore
 
 
+Rendered: TypeAlias = tuple[datetime | None, list[discord.Embed]]
+"展開したメッセージの編集日時と、展開した埋め込みです。"
+
+
 class Expander(Cog):
+    FETCH_CONCURRENCY = 5
+    "ゲートウェイのキャッシュにないメッセージを同時に取得する数の上限です。"
+
     def __init__(self, bot: RT):
         self.bot = bot
         self.data = DataManager(self)
-        self.sent: Cacher[tuple[int, int], bool] = self.bot.cachers.acquire(10.0)
+        self.sent: BoundedCacher[tuple[int, int], bool] = self.bot.cachers.acquire(10.0)
+        self.rendered: BoundedCacher[tuple[int, int], Rendered] = \
+            self.bot.cachers.acquire_bounded(300.0, max_size=2000, name="expander.rendered")
+        self.fetching = Semaphore(self.FETCH_CONCURRENCY)
 
     async def cog_load(self):
         await self.data.prepare_table()
+        self._invalidation = self.bot.invalidations.watch_cacher("expander", self.data.caches)
+
+    async def cog_unload(self):
+        self.bot.invalidations.unsubscribe("expander", self._invalidation)
 
     @commands.Cog.listener()
     async def on_message_noprefix(self, message: discord.Message):
@@ -103,31 +120,19 @@ class Expander(Cog):
             return
 
         # メッセージリンクの展開を行う。
-        embeds: list[discord.Embed] = []
+        targets: list[tuple[int, int]] = []
         for guild_id, channel_id, target_id in expand(message.content):
-            if self.sent.get((message.guild.id, target_id), False):
+            if guild_id != message.guild.id \
+                    or self.sent.get((message.channel.id, target_id), False):
                 continue
-            assert message.guild is not None
-            if guild_id == message.guild.id:
-                # リンク先のオブジェクトを取得する。
-                if (channel := message.guild.get_channel(channel_id)) is None \
-                        or not isinstance(
-                            channel, discord.Thread | discord.TextChannel
-                        ) or (target := await channel.fetch_message(target_id)) is None:
-                    continue
-                self.sent[(message.channel.id, target_id)] = True
-                embeds.append(discord.Embed(
-                    description=target.content,
-                    color=target.author.color
-                ).set_author(
-                    name=target.author.display_name,
-                    icon_url=unwrap_or(target.author.display_avatar, "url", "")
-                ))
-                # もし画像がメッセージに設定されているのなら画像を追加する。
-                if target.attachments:
-                    embeds[-1].set_image(url=target.attachments[0].url)
-                if target.embeds:
-                    embeds.extend(target.embeds)
+            self.sent[(message.channel.id, target_id)] = True
+            targets.append((channel_id, target_id))
+        if not targets:
+            return
+        embeds = [
+            embed for rendered in await self.render_all(message.guild, targets)
+            for embed in rendered
+        ]
 
         # 展開したものを送信する。
         if embeds:
@@ -142,6 +147,75 @@ class Expander(Cog):
                     embeds=embeds[:5], allowed_mentions=discord.AllowedMentions.none()
                 )
 
+    def render(self, target: discord.Message) -> list[discord.Embed]:
+        "メッセージを展開した埋め込みを作ります。"
+        embeds = [discord.Embed(
+            description=target.content,
+            color=target.author.color
+        ).set_author(
+            name=target.author.display_name,
+            icon_url=unwrap_or(target.author.display_avatar, "url", "")
+        )]
+        # もし画像がメッセージに設定されているのなら画像を追加する。
+        if target.attachments:
+            embeds[-1].set_image(url=target.attachments[0].url)
+        if target.embeds:
+            embeds.extend(target.embeds)
+        return embeds
+
+    async def _fetch(
+        self, channel: discord.TextChannel | discord.Thread, message_id: int
+    ) -> discord.Message | None:
+        async with self.fetching:
+            try:
+                return await channel.fetch_message(message_id)
+            except discord.HTTPException:
+                return None
+
+    async def render_all(
+        self, guild: discord.Guild, targets: list[tuple[int, int]]
+    ) -> list[list[discord.Embed]]:
+        """`(チャンネルID, メッセージID)`のメッセージを展開した埋め込みを、渡された順番で返します。
+        ゲートウェイのキャッシュにあるメッセージと、少し前に展開したメッセージは取得しません。
+        それ以外のメッセージは同時に取得します。
+        キャッシュは全てのサーバーで共有しているので、`guild`のチャンネルではないメッセージは展開しません。"""
+        results: list[list[discord.Embed] | None] = [None] * len(targets)
+        misses: list[tuple[int, tuple[int, int], discord.TextChannel | discord.Thread]] = []
+        for index, key in enumerate(targets):
+            if not isinstance(
+                channel := guild.get_channel_or_thread(key[0]), # allow-get
+                discord.TextChannel | discord.Thread
+            ):
+                continue
+            cached = self.bot._connection._get_message(key[1])
+            if cached is not None and cached.channel.id == channel.id:
+                # 編集されている場合は展開し直す。
+                if (rendered := self.rendered.get(key)) is None or rendered[0] != cached.edited_at:
+                    self.rendered[key] = rendered = (cached.edited_at, self.render(cached))
+                results[index] = rendered[1]
+            elif (rendered := self.rendered.get(key)) is not None:
+                results[index] = rendered[1]
+            else:
+                misses.append((index, key, channel))
+
+        for (index, key, _), target in zip(misses, await gather(*(
+            self._fetch(channel, key[1]) for _, key, channel in misses
+        ))):
+            if target is not None:
+                self.rendered[key] = (target.edited_at, self.render(target))
+                results[index] = self.rendered[key][1]
+        return [result for result in results if result is not None]
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        if (key := (payload.channel_id, payload.message_id)) in self.rendered:
+            del self.rendered[key]
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if (key := (payload.channel_id, payload.message_id)) in self.rendered:
+            del self.rendered[key]
+
     @commands.command(
         aliases=("展開", "メッセージリンク", "expr"), fsparent=FSPARENT,
         description="Message Link Expansion Settings"
@@ -11,14 +11,14 @@ import discord
 
 from orjson import loads, dumps
 
+from core.warmup import WarmUp
 from core import RT, Cog, t, DatabaseManager, cursor
+from core.cacher import IdCacher
 
 from rtutil.utils import artificially_send
 from rtutil.content_data import ContentData
 from rtutil.views import TimeoutView
 
-from rtlib.common.cacher import Cacher
-
 from data import TEST, NO_MORE_SETTING, NUMBER_CANT_USED, FORBIDDEN
 
 from .__init__ import FSPARENT
@@ -33,6 +33,14 @@ class DataManager(DatabaseManager):
         self.cog = cog
         self.caches: dict[int, Data] = {}
         self.pool = self.cog.bot.pool
+        self.warm_up = WarmUp(
+            self.cog.bot, "ForcePinnedMessage", self._cache,
+            "ChannelId, Content, PinInterval, BeforeMessage"
+        )
+
+    def _cache(self, row: tuple) -> None:
+        if row[0] not in self.caches:
+            self.caches[row[0]] = (loads(row[1]), row[2], row[3])
 
     async def prepare_table(self) -> None:
         "テーブルを作ります。"
@@ -42,11 +50,7 @@ class DataManager(DatabaseManager):
                 Content JSON, PinInterval FLOAT, BeforeMessage BIGINT
             );"""
         )
-        async for row in self.fetchstep(
-            cursor, "SELECT ChannelId, Content, PinInterval, BeforeMessage FROM ForcePinnedMessage;"
-        ):
-            if row[0] not in self.caches:
-                self.caches[row[0]] = (loads(row[1]), row[2], row[3])
+        await self.warm_up.load()
 
     def merge(self, channel_id: int, new: dict[int, Any]) -> Data:
         "既存のキャッシュと新しいデータをマージします。"
@@ -229,8 +233,8 @@ class ForcePinnedMessage(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
         self.data = DataManager(self)
-        self.queues: Cacher[discord.TextChannel, tuple[Data, float]] = \
-            self.bot.cachers.acquire(10860.0)
+        self.queues: IdCacher[tuple[Data, float]] = \
+            self.bot.cachers.acquire_by_id(10860.0)
         self.bot.tree.remove_command(FEATURE_NAME)
         self.bot.tree.add_command(discord.app_commands.ContextMenu(
             name=FEATURE_NAME, callback=self.on_pin, type=discord.AppCommandType.message
@@ -294,11 +298,16 @@ class ForcePinnedMessage(Cog):
     @tasks.loop(seconds=5)
     async def pin(self):
         now = time()
-        for channel, (
+        for channel_id, (
             (data, interval, before_message), at_that_time
         ) in list(self.queues.items()):
             if now - at_that_time <= interval:
                 continue
+            # チャンネルのオブジェクトを残さないように、キューにはIDだけを入れている。
+            channel = self.bot.get_channel(channel_id) # allow-get
+            if not isinstance(channel, discord.TextChannel):
+                del self.queues[channel_id]
+                continue
 
             ctx = ForcePinnedMessageEventContext(
                 self.bot, channel.guild, "ERROR", self.SUBJECT,
@@ -335,7 +344,7 @@ class ForcePinnedMessage(Cog):
                 ctx.detail = ""
 
             self.bot.rtevent.dispatch("on_force_pinned_message", ctx)
-            del self.queues[channel]
+            del self.queues[channel_id]
 
             if new is None:
                 continue
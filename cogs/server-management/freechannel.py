@@ -11,8 +11,7 @@ from discord.ext import commands
 import discord
 
 from core import Cog, RT, t
-
-from rtlib.common.cacher import Cacher
+from core.cacher import BoundedCacher
 
 from data import FORBIDDEN
 
@@ -121,7 +120,7 @@ class FreeChannel(Cog):
 
     def __init__(self, bot: RT):
         self.bot = bot
-        self.created: Cacher[tuple[str, int, int], int] = self.bot.cachers.acquire(43200)
+        self.created: BoundedCacher[tuple[str, int, int], int] = self.bot.cachers.acquire(43200)
         self.views = Views(
             FreeChannelPanelVoiceView(self, timeout=None),
             FreeChannelPanelTextView(self, timeout=None),
@@ -8,8 +8,7 @@ from discord.ext import commands, tasks
 import discord
 
 from core import Cog, RT, t, DatabaseManager, cursor
-
-from rtlib.common.cacher import Cacher
+from core.cacher import BoundedCacher
 
 from data import (
     ROLE_NOTFOUND, FORBIDDEN, SET_ALIASES, DELETE_ALIASES,
@@ -38,12 +37,11 @@ class DataManager(DatabaseManager):
     def __init__(self, cog: LevelCog):
         self.cog = cog
         self.pool = self.cog.bot.pool
-        self.caches: Cacher[int, dict[int, LevelData]] = self.cog.bot.cachers.acquire(
-            3600.0, dict
-        )
-        self.reward_caches: Cacher[int, dict[int, int | None]] = self.cog.bot.cachers.acquire(
-            1800.0, dict
-        )
+        # 大きいサーバーでメンバーの数だけ増えないように、サーバー毎ではなくメンバー毎に数を制限する。
+        self.caches: BoundedCacher[tuple[int, int], LevelData] = \
+            self.cog.bot.cachers.acquire_bounded(3600.0, max_size=50000, name="level")
+        self.reward_caches: BoundedCacher[int, dict[int, int | None]] = \
+            self.cog.bot.cachers.acquire_bounded(1800.0, dict, max_size=5000, name="level.reward")
 
     async def preapre_table(self) -> None:
         "テーブルを準備します。"
@@ -72,15 +70,15 @@ class DataManager(DatabaseManager):
     async def read(self, guild_id: int, user_id: int, cache: bool = True, **_) \
             -> tuple[LevelData, bool]:
         "レベルを読み込みます。"
-        new = True
-        if not cache or (guild_id not in self.caches or user_id not in self.caches[guild_id]):
+        new, key = True, (guild_id, user_id)
+        if not cache or key not in self.caches:
             if (row := await self._read(guild_id, user_id, cursor=cursor)):
-                self.caches[guild_id][user_id] = LevelData(*row)
+                self.caches[key] = LevelData(*row)
                 new = False
             else:
-                self.caches[guild_id][user_id] = LevelData(guild_id, user_id, 0, 0, 1)
+                self.caches[key] = LevelData(guild_id, user_id, 0, 0, 1)
                 new = True
-        return self.caches[guild_id][user_id], new
+        return self.caches[key], new
 
     async def write(self, guild_id: int, user_id: int, **_) -> None:
         "レベルを書き込みます。"
@@ -120,6 +118,7 @@ class DataManager(DatabaseManager):
             )
         if guild_id in self.reward_caches and level in self.reward_caches[guild_id]:
             self.reward_caches[guild_id][level] = role_id
+        self.cog.bot.invalidations.publish("level_reward", guild_id)
 
     async def read_reward(self, guild_id: int, level: int) -> int | None:
         "レベル報酬を取得します。"
@@ -149,11 +148,11 @@ class DataManager(DatabaseManager):
             if row[0] in did or row[1] in did:
                 continue
             if guild is None:
-                guild = self.cog.bot.get_guild(row[0])
+                guild = self.cog.bot.get_guild(row[0]) # allow-get
                 if guild is None and not await self.cog.bot.exists("guild", row[0]):
                     did.append(row[0])
-                    if row[0] in self.caches:
-                        del self.caches[row[0]]
+                    for key in [key for key in self.caches.keys() if key[0] == row[0]]:
+                        del self.caches[key]
                     await cursor.execute("DELETE FROM Level WHERE GuildId = %s;", (row[0],))
                     continue
             if not await self.cog.bot.exists("user", row[1]):
@@ -177,9 +176,13 @@ class LevelCog(Cog, name="Level"):
     async def cog_load(self):
         await self.data.preapre_table()
         self.process_queues.start()
+        self._invalidation = self.bot.invalidations.watch_cacher(
+            "level_reward", self.data.reward_caches
+        )
 
     async def cog_unload(self):
         self.process_queues.cancel()
+        self.bot.invalidations.unsubscribe("level_reward", self._invalidation)
 
     @commands.group(
         aliases=("lv", "レベル"), fsparent=FSPARENT,
@@ -261,12 +264,13 @@ class LevelCog(Cog, name="Level"):
         await ctx.typing()
         guild = ctx.guild
         assert guild is not None
+        members = {member.id: member for member in await self.bot.member_cache.fetch(guild)}
         await ctx.reply(embed=Cog.Embed(
             t(dict(ja="レベルランキング", en="Level ranking"), ctx),
             description="\n".join(
                 f"**{index}**：{member}　`{data.level}`"
                 for index, (member, data) in enumerate([
-                    (await self.bot.search_member(guild, data.user_id), data)
+                    (members.get(data.user_id), data)
                     for data in await self.data.read_ranking(guild.id)
                 ], 1)
                 if member is not None
@@ -7,6 +7,7 @@ from collections import defaultdict
 from discord.ext import commands
 import discord
 
+from core.warmup import WarmUp
 from core import Cog, RT, DatabaseManager, cursor
 
 from data import ADD_ALIASES, REMOVE_ALIASES, LIST_ALIASES, FORBIDDEN
@@ -21,6 +22,9 @@ class DataManager(DatabaseManager):
         self.cog = cog
         self.pool = self.cog.bot.pool
         self.caches: defaultdict[int, list[str]] = defaultdict(list)
+        self.warm_up = WarmUp(
+            self.cog.bot, "NgWord", lambda row: self.caches[row[0]].append(row[1])
+        )
 
     async def setup(self) -> None:
         "DataManagerのセットアップをします。"
@@ -29,8 +33,7 @@ class DataManager(DatabaseManager):
                 GuildId BIGINT, Word TEXT
             );"""
         )
-        async for row in self.fetchstep(cursor, "SELECT * FROM NgWord;"):
-            self.caches[row[0]].append(row[1])
+        await self.warm_up.load()
 
     async def read(self, guild_id: int, **_) -> list[str]:
         "データを読み込みます。"
@@ -48,6 +51,7 @@ class DataManager(DatabaseManager):
                 (guild_id, word)
             )
             self.caches[guild_id].append(word)
+            self.cog.bot.invalidations.publish("ngword", guild_id)
 
     async def delete(self, guild_id: int, word: str) -> None:
         "データを削除します。"
@@ -57,6 +61,14 @@ class DataManager(DatabaseManager):
                 (guild_id, word)
             )
             self.caches[guild_id].remove(word)
+            self.cog.bot.invalidations.publish("ngword", guild_id)
+
+    async def reload(self, guild_id: int, **_) -> None:
+        "サーバーのキャッシュをデータベースから読み込み直します。"
+        if words := await self.read(guild_id, cursor=cursor):
+            self.caches[guild_id] = words
+        else:
+            self.caches.pop(guild_id, None)
 
     async def clean(self) -> None:
         "お掃除をします。"
@@ -80,6 +92,10 @@ class NgWord(Cog):
     async def cog_load(self):
         await self.data.setup()
 
+    @commands.Cog.listener()
+    async def on_invalidate_ngword(self, guild_id: int, _):
+        await self.data.reload(guild_id)
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.guild is None or (isinstance(message.author, discord.Member)
@@ -6,8 +6,7 @@ from discord.ext import commands
 import discord
 
 from core import Cog, RT, t, DatabaseManager, cursor
-
-from rtlib.common.cacher import Cacher
+from core.cacher import IdCacher, BoundedCacher
 
 from data import Colors, FORBIDDEN
 
@@ -18,7 +17,7 @@ class DataManager(DatabaseManager):
     def __init__(self, cog: NoIconNotice):
         self.cog = cog
         self.pool = self.cog.bot.pool
-        self.caches: Cacher[int, str | None] = self.cog.bot.cachers.acquire(1800.0)
+        self.caches: BoundedCacher[int, str | None] = self.cog.bot.cachers.acquire(1800.0)
 
     async def prepare_table(self) -> None:
         "テーブルを作ります。"
@@ -46,6 +45,7 @@ class DataManager(DatabaseManager):
                 self.caches[guild_id] = text
             else:
                 del self.caches[guild_id]
+        self.cog.bot.invalidations.publish("no_icon_notice", guild_id)
 
     async def read(self, guild_id: int) -> str | None:
         "設定を読み込みます。"
@@ -70,10 +70,16 @@ class NoIconNotice(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
         self.data = DataManager(self)
-        self.sent: Cacher[discord.Member, None] = self.bot.cachers.acquire(180.0)
+        self.sent: IdCacher[None] = self.bot.cachers.acquire_by_id(180.0)
 
     async def cog_load(self):
         await self.data.prepare_table()
+        self._invalidation = self.bot.invalidations.watch_cacher(
+            "no_icon_notice", self.data.caches
+        )
+
+    async def cog_unload(self):
+        self.bot.invalidations.unsubscribe("no_icon_notice", self._invalidation)
 
     @commands.command(
         aliases=("nin", "アイコン未設定警告", "あみけ"), fsparent=FSPARENT,
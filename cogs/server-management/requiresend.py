@@ -2,8 +2,6 @@
 
 from __future__ import annotations
 
-from collections.abc import AsyncIterator
-
 from dataclasses import dataclass
 from time import time
 
@@ -13,8 +11,9 @@ import discord
 from orjson import loads, dumps
 
 from core import RT, Cog, t, DatabaseManager, cursor
+from core.join_pipeline import make_placeholders
+from core.cacher import BoundedCacher
 
-from rtlib.common.cacher import Cacher
 from rtutil.utils import unwrap_or
 
 from data import (
@@ -29,8 +28,8 @@ from .__init__ import FSPARENT
 class Caches:
     "複数のキャッシュ一つにまとめるためのクラスです。"
 
-    settings: Cacher[int, dict[int, float]]
-    queues: Cacher[int, dict[int, list[int]]]
+    settings: BoundedCacher[int, dict[int, float]]
+    queues: dict[tuple[int, int], list[int]]
 
 
 class RequireSentKickEventContext(Cog.EventContext):
@@ -48,9 +47,7 @@ class DataManager(DatabaseManager):
     def __init__(self, cog: RequireSent):
         self.cog = cog
         self.pool = self.cog.bot.pool
-        self.caches = Caches(*(
-            self.cog.bot.cachers.acquire(1800.0, dict) for _ in "__"
-        ))
+        self.caches = Caches(self.cog.bot.cachers.acquire(1800.0), {})
 
     async def prepare_table(self):
         "テーブルを作ります。"
@@ -64,15 +61,36 @@ class DataManager(DatabaseManager):
                 GuildId BIGINT, UserId BIGINT, Done JSON
             );"""
         )
+        # キューはメッセージ毎にテーブルを見ないように、全てメモリに置いておく。
+        async for row in self.fetchstep(cursor, "SELECT * FROM RequireSentQueue;"):
+            self.caches.queues[(row[0], row[1])] = loads(row[2])
 
     async def get(self, guild_id: int, **_) -> dict[int, float]:
-        "サーバーの設定を読み込みます。"
-        await cursor.execute(
-            "SELECT ChannelId, Deadline FROM RequireSent WHERE GuildId = %s;",
-            (guild_id,)
-        )
-        self.caches.settings[guild_id] = {row[0]: row[1] for row in await cursor.fetchall() if row}
-        return self.caches.settings[guild_id]
+        "サーバーの設定を読み込みます。キャッシュにある場合はデータベースにアクセスしません。"
+        if (data := self.caches.settings.get(guild_id)) is None:
+            await cursor.execute(
+                "SELECT ChannelId, Deadline FROM RequireSent WHERE GuildId = %s;",
+                (guild_id,)
+            )
+            self.caches.settings[guild_id] = data = {
+                row[0]: row[1] for row in await cursor.fetchall() if row
+            }
+        return data
+
+    async def get_many(self, guild_ids: set[int], **_) -> dict[int, dict[int, float]]:
+        "複数のサーバーの設定をまとめて読み込みます。"
+        if targets := [guild_id for guild_id in guild_ids if guild_id not in self.caches.settings]:
+            await cursor.execute(
+                "SELECT * FROM RequireSent WHERE GuildId IN ({});".format(
+                    make_placeholders(len(targets))
+                ), targets
+            )
+            datas: dict[int, dict[int, float]] = {guild_id: {} for guild_id in targets}
+            for row in await cursor.fetchall():
+                datas[row[0]][row[1]] = row[2]
+            for guild_id, data in datas.items():
+                self.caches.settings[guild_id] = data
+        return {guild_id: self.caches.settings[guild_id] for guild_id in guild_ids}
 
     async def add(self, guild_id: int, channel_id: int, deadline: float) -> None:
         "設定を追加します。"
@@ -87,28 +105,36 @@ class DataManager(DatabaseManager):
             "INSERT INTO RequireSent VALUES (%s, %s, %s);",
             (guild_id, channel_id, deadline)
         )
-        if guild_id in self.caches.settings:
-            self.caches.settings[guild_id][channel_id] = deadline
+        channel_ids[channel_id] = deadline
+        self.cog.bot.invalidations.publish("requiresend", guild_id)
 
     async def remove(self, guild_id: int, channel_id: int) -> None:
         "設定を削除します。"
-        if channel_id not in await self.get(guild_id, cursor=cursor):
+        if channel_id not in (channel_ids := await self.get(guild_id, cursor=cursor)):
             raise Cog.reply_error.BadRequest(SETTING_NOTFOUND)
         await cursor.execute(
-            "DELETE FROM RequireSent WHERE GuildId = %s;",
-            (guild_id,)
+            "DELETE FROM RequireSent WHERE GuildId = %s AND ChannelId = %s;",
+            (guild_id, channel_id)
         )
-        if guild_id in self.caches.settings and channel_id in self.caches.settings[guild_id]:
-            del self.caches.settings[guild_id][channel_id]
+        del channel_ids[channel_id]
+        self.cog.bot.invalidations.publish("requiresend", guild_id)
 
     async def clear(self, guild_id: int, **_) -> None:
         "指定されたサーバーの設定を全部消します。"
         await cursor.execute("DELETE FROM RequireSent WHERE GuildId = %s;", (guild_id,))
         await cursor.execute("DELETE FROM RequireSentQueue WHERE GuildId = %s;", (guild_id,))
+        self.caches.settings[guild_id] = {}
+        for key in [key for key in self.caches.queues if key[0] == guild_id]:
+            del self.caches.queues[key]
+        self.cog.bot.invalidations.publish("requiresend", guild_id)
 
     def check_exists_both(self, guild_id: int, user_id: int) -> bool:
         "指定されたギルドIDとユーザーIDのキューがあるかをチェックします。"
-        return guild_id in self.caches.queues and user_id in self.caches.queues[guild_id]
+        return (guild_id, user_id) in self.caches.queues
+
+    def get_queue(self, guild_id: int, user_id: int) -> list[int] | None:
+        "指定されたギルドIDとユーザーIDのキューを取得します。"
+        return self.caches.queues.get((guild_id, user_id))
 
     async def delete_queue(self, guild_id: int, user_id: int, **_) -> None:
         "キューを削除します。"
@@ -116,21 +142,14 @@ class DataManager(DatabaseManager):
             "DELETE FROM RequireSentQueue WHERE GuildId = %s AND UserId = %s;",
             (guild_id, user_id)
         )
-        if self.check_exists_both(guild_id, user_id):
-            del self.caches.queues[guild_id][user_id]
+        self.caches.queues.pop((guild_id, user_id), None)
 
     async def set_queue(self, guild_id: int, user_id: int, done: list[int], **_) -> None:
         "RequireSentチャンネルのキューを設定か更新または削除します。"
         if all(channel_id in done for channel_id in await self.get(guild_id, cursor=cursor)):
             await self.delete_queue(guild_id, user_id, cursor=cursor)
-            if self.check_exists_both(guild_id, user_id):
-                del self.caches.queues[guild_id][user_id]
         else:
-            await cursor.execute(
-                "SELECT UserId FROM RequireSentQueue WHERE GuildId = %s AND UserId = %s;",
-                (guild_id, user_id)
-            )
-            if await cursor.fetchone():
+            if self.check_exists_both(guild_id, user_id):
                 await cursor.execute(
                     "UPDATE RequireSentQueue SET Done = %s WHERE GuildId = %s AND UserId = %s;",
                     (dumps(done).decode(), guild_id, user_id)
@@ -140,32 +159,25 @@ class DataManager(DatabaseManager):
                     "INSERT INTO RequireSentQueue VALUES (%s, %s, %s);",
                     (guild_id, user_id, dumps(done).decode())
                 )
-            if guild_id not in self.caches.queues:
-                self.caches.queues[guild_id][user_id] = done
-
-    async def get_queues(self, guild_id: int, **_) -> dict[int, list[int]]:
-        "指定されたサーバーのキューを全て取得します。"
-        if guild_id not in self.caches.queues:
-            await cursor.execute(
-                "SELECT UserId, Done FROM RequireSentQueue WHERE GuildId = %s;",
-                (guild_id,)
-            )
-            self.caches.queues[guild_id] = {
-                row[0]: loads(row[1]) for row in await cursor.fetchall()
-            }
-        return self.caches.queues[guild_id]
+            self.caches.queues[(guild_id, user_id)] = done
 
-    async def get_all_queues(self, **_) -> AsyncIterator[tuple[int, int, list[int]]]:
-        "全てのキューをサーバーづつ取得して返すイテレーターを返します。"
-        async for row in self.fetchstep(cursor, "SELECT * FROM RequireSentQueue;"):
-            yield row[:-1] + (loads(row[-1]),)
+    async def add_queues(self, keys: list[tuple[int, int]], **_) -> None:
+        "複数のキューをまとめて追加します。"
+        await cursor.execute(
+            "INSERT INTO RequireSentQueue VALUES {};".format(
+                make_placeholders(len(keys), 3)
+            ), [value for key in keys for value in key + ("[]",)]
+        )
+        for key in keys:
+            self.caches.queues[key] = []
 
     SUBJECT = {"ja": "RequireSent キック", "en": "RequireSent Kick"}
 
     async def process_queues(self) -> None:
         "キューの処理をします。"
         guild, data, now = None, None, time()
-        async for row in self.get_all_queues(cursor=cursor):
+        # キューの途中で削除が行われるので、コピーしたものを使う。
+        for row in sorted(key + (done,) for key, done in self.caches.queues.items()):
             if guild is None or guild.id != row[0]:
                 guild = await self.cog.bot.search_guild(row[0])
             if guild is None:
@@ -221,45 +233,72 @@ class DataManager(DatabaseManager):
                     (row[1],)
                 )
         await self.cog.bot.clean(cursor, "RequireSentQueue", "GuildId")
+        # 消されたキューがメモリに残らないようにする。読み込み直すと、その間に来たメッセージを取りこぼすので、
+        # `bot.clean`と同じ条件で消えたサーバーを調べてから、それを除いた辞書に一度に入れ替える。
+        gone = {
+            guild_id for guild_id in {key[0] for key in self.caches.queues}
+            if await self.cog.bot.not_exists_check_for_clean("GuildId", guild_id)
+        }
+        if gone:
+            self.caches.queues = {
+                key: done for key, done in self.caches.queues.items()
+                if key[0] not in gone
+            }
 
 
 class RequireSent(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
         self.data = DataManager(self)
-        self.checked: Cacher[tuple[int, int], bool] = self.bot.cachers.acquire(10.0)
+        self.checked: BoundedCacher[tuple[int, int], bool] = self.bot.cachers.acquire(10.0)
 
     async def cog_load(self):
         await self.data.prepare_table()
         self.check_queues.start()
+        self.bot.joins.register("RequireSent", self.on_joins)
+        self._invalidation = self.bot.invalidations.watch_cacher(
+            "requiresend", self.data.caches.settings
+        )
 
     async def cog_unload(self):
         self.check_queues.cancel()
+        self.bot.joins.unregister("RequireSent")
+        self.bot.invalidations.unsubscribe("requiresend", self._invalidation)
 
     @tasks.loop(seconds=10)
     async def check_queues(self):
-        await self.data.process_queues()
+        if self.data.caches.queues:
+            await self.data.process_queues()
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        if not member.bot and await self.data.get(member.guild.id):
-            if self.checked.get((member.guild.id, member.id), False):
-                return
-            self.checked[(member.guild.id, member.id)] = True
+    async def on_joins(self, members: list[discord.Member]) -> None:
+        members = [member for member in members if not member.bot]
+        if not members:
+            return
+        datas = await self.data.get_many({member.guild.id for member in members})
+        keys = set()
+        for member in members:
+            key = (member.guild.id, member.id)
+            if not datas[key[0]] or self.checked.get(key, False) \
+                    or key in keys or self.data.check_exists_both(*key):
+                continue
+            self.checked[key] = True
+            keys.add(key)
+        if keys:
             # RequireSentのチェック対象になるようにキューを追加する。
-            await self.data.set_queue(member.guild.id, member.id, [])
+            await self.data.add_queues(list(keys))
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.bot or not message.guild \
                 or message.type == discord.MessageType.new_member:
             return
-        if data := await self.data.get(message.guild.id):
-            if message.channel.id in data:
-                done = (await self.data.get_queues(message.guild.id)).get(message.author.id)
-                if done is not None:
-                    done.append(message.channel.id)
-                    await self.data.set_queue(message.guild.id, message.author.id, done)
+        if message.channel.id in await self.data.get(message.guild.id):
+            done = self.data.get_queue(message.guild.id, message.author.id)
+            if done is not None and message.channel.id not in done:
+                await self.data.set_queue(
+                    message.guild.id, message.author.id,
+                    done + [message.channel.id]
+                )
 
     @commands.group(
         aliases=("入力必須", "rst"), fsparent=FSPARENT,
@@ -346,7 +385,7 @@ class RequireSent(Cog):
         await ctx.typing()
         assert ctx.guild is not None
         await ctx.reply("\n".join(
-            f"{unwrap_or(ctx.guild.get_channel(cid), 'mention', cid)}: `{deadline}`"
+            f"{unwrap_or(ctx.guild.get_channel(cid), 'mention', cid)}: `{deadline}`" # allow-get
             for cid, deadline in (await self.data.get(ctx.guild.id)).items()
         ))
 
@@ -4,15 +4,17 @@ from __future__ import annotations
 
 from collections.abc import Sequence
 
+from functools import partial
 from time import time
 
 from discord.ext import commands
 import discord
 
 from core import Cog, RT, t, DatabaseManager, cursor
+from core.join_pipeline import make_placeholders
+from core.cacher import BoundedCacher
 
 from rtlib.common.json import dumps, loads
-from rtlib.common.cacher import Cacher
 
 from data import ROLE_NOTFOUND, FORBIDDEN
 
@@ -23,7 +25,7 @@ class DataManager(DatabaseManager):
     def __init__(self, cog: RoleKeeper):
         self.cog = cog
         self.pool = self.cog.bot.pool
-        self.caches: Cacher[int, bool] = self.cog.bot.cachers.acquire(180.0)
+        self.caches: BoundedCacher[int, bool] = self.cog.bot.cachers.acquire(180.0)
 
     async def prepare_table(self) -> None:
         "テーブルを作ります。"
@@ -46,6 +48,19 @@ class DataManager(DatabaseManager):
             self.caches[guild_id] = bool(await cursor.fetchone())
         return self.caches[guild_id]
 
+    async def get_enabled(self, guild_ids: set[int], **_) -> set[int]:
+        "渡されたサーバーIDのうち、ONになっているものをまとめて調べます。"
+        if targets := [guild_id for guild_id in guild_ids if guild_id not in self.caches]:
+            await cursor.execute(
+                "SELECT GuildId FROM RoleKeeper WHERE GuildId IN ({});".format(
+                    make_placeholders(len(targets))
+                ), targets
+            )
+            enabled = {row[0] for row in await cursor.fetchall()}
+            for guild_id in targets:
+                self.caches[guild_id] = guild_id in enabled
+        return {guild_id for guild_id in guild_ids if self.caches.get(guild_id, False)}
+
     async def toggle(self, guild_id: int) -> None:
         "ロールキーパーの設定の無効/有効を切り替えます。"
         if await self.is_on(guild_id, cursor=cursor):
@@ -58,6 +73,7 @@ class DataManager(DatabaseManager):
         else:
             await cursor.execute("INSERT INTO RoleKeeper VALUES (%s);", (guild_id,))
             self.caches[guild_id] = True
+        self.cog.bot.invalidations.publish("role_keeper", guild_id)
 
     async def get_cache(self, guild_id: int, user_id: int, delete: bool = True, **_) \
             -> Sequence[int] | None:
@@ -74,6 +90,22 @@ class DataManager(DatabaseManager):
                 )
             return loads(row[0])
 
+    async def pop_caches(self, keys: list[tuple[int, int]], **_) \
+            -> dict[tuple[int, int], Sequence[int]]:
+        "複数のメンバーのロールのキャッシュをまとめて取得して削除します。"
+        placeholders = make_placeholders(len(keys), 2)
+        args = [value for key in keys for value in key]
+        await cursor.execute(
+            "SELECT GuildId, UserId, Roles FROM RoleKeeperCache WHERE (GuildId, UserId) IN ({});"
+                .format(placeholders), args
+        )
+        if rows := await cursor.fetchall():
+            await cursor.execute(
+                "DELETE FROM RoleKeeperCache WHERE (GuildId, UserId) IN ({});"
+                    .format(placeholders), args
+            )
+        return {(row[0], row[1]): loads(row[2]) for row in rows}
+
     async def set_cache(self, guild_id: int, user_id: int, roles: Sequence[int]) -> None:
         "キャッシュを設定します。"
         if await self.get_cache(guild_id, user_id, delete=False, cursor=cursor):
@@ -118,6 +150,12 @@ class RoleKeeper(Cog):
 
     async def cog_load(self):
         await self.data.prepare_table()
+        self.bot.joins.register("RoleKeeper", self.on_joins, True)
+        self._invalidation = self.bot.invalidations.watch_cacher("role_keeper", self.data.caches)
+
+    async def cog_unload(self):
+        self.bot.joins.unregister("RoleKeeper")
+        self.bot.invalidations.unsubscribe("role_keeper", self._invalidation)
 
     @commands.command(
         aliases=("rk", "ロールキーパー", "役職管理人"), fsparent=FSPARENT,
@@ -147,31 +185,39 @@ class RoleKeeper(Cog):
                 role.id for role in member.roles if not role.is_default()
             ])
 
-    @commands.Cog.listener()
-    async def on_member_join_cooldown(self, member: discord.Member):
-        if await self.data.is_on(member.guild.id) \
-                and (roles := await self.data.get_cache(member.guild.id, member.id)) \
-                    is not None:
-            roles = [
-                member.guild.get_role(role_id)
-                for role_id in roles
-                if member.get_role(role_id) is None
-            ]
-            detail = ""
-            if any(role is None for role in roles):
-                detail = ROLE_NOTFOUND
-            else:
-                try:
-                    await member.add_roles(*roles, reason=t(dict( # type: ignore
-                        ja="ロールキーパーのロール付与", en="Role Keeper's Role Added"
-                    ), member.guild))
-                except discord.Forbidden:
-                    detail = FORBIDDEN
-            self.bot.rtevent.dispatch("on_role_keeper_role_add", RoleKeeperRoleAddEventContext(
-                self.bot, member.guild, "ERROR" if detail else "SUCCESS",
-                {"ja": "ロールキーパーのロール付与", "en": "Role Keeper Role Add"},
-                detail, self.role_keeper, roles=roles, member=member
-            ))
+    async def on_joins(self, members: list[discord.Member]) -> None:
+        enabled = await self.data.get_enabled({member.guild.id for member in members})
+        if not (members := [member for member in members if member.guild.id in enabled]):
+            return
+        caches = await self.data.pop_caches(list({
+            (member.guild.id, member.id) for member in members
+        }))
+        for member in members:
+            if (roles := caches.pop((member.guild.id, member.id), None)) is not None:
+                self.bot.joins.actions.put(member.guild.id, partial(self.restore, member, roles))
+
+    async def restore(self, member: discord.Member, role_ids: Sequence[int]) -> None:
+        "ロールキーパーで保存していたロールを付与します。"
+        roles = [
+            member.guild.get_role(role_id)
+            for role_id in role_ids
+            if member.get_role(role_id) is None
+        ]
+        detail = ""
+        if any(role is None for role in roles):
+            detail = ROLE_NOTFOUND
+        else:
+            try:
+                await self.bot.role_editor.edit(member, roles, reason=t(dict( # type: ignore
+                    ja="ロールキーパーのロール付与", en="Role Keeper's Role Added"
+                ), member.guild))
+            except discord.Forbidden:
+                detail = FORBIDDEN
+        self.bot.rtevent.dispatch("on_role_keeper_role_add", RoleKeeperRoleAddEventContext(
+            self.bot, member.guild, "ERROR" if detail else "SUCCESS",
+            {"ja": "ロールキーパーのロール付与", "en": "Role Keeper Role Add"},
+            detail, self.role_keeper, roles=roles, member=member
+        ))
 
 
 async def setup(bot: RT) -> None:
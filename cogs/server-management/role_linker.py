@@ -2,18 +2,19 @@
 
 from __future__ import annotations
 
-from typing import NoReturn, TypeAlias, NamedTuple, Literal
+from typing import TypeAlias, NamedTuple, Literal
 
 from collections import defaultdict
 
+from asyncio import gather
+
 from discord.ext import commands, tasks
 import discord
 
-from jishaku.functools import executor_function
-
 from core import Cog, RT, t, DatabaseManager, cursor
+from core.cacher import BoundedCacher
 
-from rtlib.common.cacher import Cacher
+from rtutil.link_graph import LinkGraph
 
 from data import (
     ADD_ALIASES, REMOVE_ALIASES, LIST_ALIASES,
@@ -30,40 +31,23 @@ Data = NamedTuple("Data", (
 Datas: TypeAlias = defaultdict[int, list[Data]]
 
 
-class LoopChecker:
-    "ループをチェックします。"
-
-    def __init__(self, datas: Datas):
-        self.datas = datas
-        self.checked: dict[int, list[int]] = defaultdict(list)
-
-    def reset(self) -> None:
-        self.checked = defaultdict(list)
-
-    def walk(self, attempt: int, key: int) -> None:
-        if key in self.checked[attempt]:
-            raise OverflowError("ループを検知しました。")
-        self.checked[attempt].append(key)
-        if key in self.datas:
-            for data in self.datas[key]:
-                self.walk(attempt, data.after)
-
-    @executor_function
-    def validate(self) -> None | NoReturn:
-        "ループがないかを調べます。"
-        self.reset()
-        for attempt, key in enumerate(self.datas):
-            self.walk(attempt, key)
-
-
 class DataManager(DatabaseManager):
     "データ管理用のクラスです。"
 
     def __init__(self, cog: RoleLinker):
         self.cog = cog
         self.pool = self.cog.bot.pool
-        self.caches: Cacher[int, Datas] = \
+        self.caches: BoundedCacher[int, Datas] = \
             self.cog.bot.cachers.acquire(1800.0, lambda: defaultdict(list))
+        self.graphs: BoundedCacher[int, LinkGraph] = self.cog.bot.cachers.acquire(1800.0)
+
+    def graph(self, guild_id: int, datas: Datas) -> LinkGraph:
+        "ループの検知に使うグラフを取得します。ない場合は設定から作ります。"
+        if guild_id not in self.graphs:
+            self.graphs[guild_id] = LinkGraph(
+                (before, data.after) for before, links in datas.items() for data in links
+            )
+        return self.graphs[guild_id]
 
     async def prepare_table(self) -> None:
         "テーブルを作ります。"
@@ -102,18 +86,16 @@ class DataManager(DatabaseManager):
                     }
         if self.MAX <= sum(len(datas) for datas in self.caches[guild_id].values()):
             return NO_MORE_SETTING
-        row = (guild_id, before, after, reverse)
-        self.caches[guild_id][before].append(Data(*row))
         # ループが起きないかをチェックする。
-        try:
-            await LoopChecker(datas).validate()
-        except OverflowError:
-            del self.caches[guild_id][before][-1]
+        if not self.graph(guild_id, datas).add(before, after):
             return {
                 "ja": "ループが発生する可能性があったので設定を中止しました。",
                 "en": "The setting was discontinued because of the possibility of a loop."
             }
+        row = (guild_id, before, after, reverse)
+        self.caches[guild_id][before].append(Data(*row))
         await cursor.execute("INSERT INTO RoleLinker VALUES (%s, %s, %s, %s);", row)
+        self.cog.bot.invalidations.publish("role_linker", guild_id)
 
     async def delete(self, guild_id: int, before: int, after: int, **_) -> None:
         "データを書き込みます。"
@@ -126,6 +108,9 @@ class DataManager(DatabaseManager):
                 if data.after == after:
                     del self.caches[guild_id][before][index]
                     break
+        if guild_id in self.graphs:
+            self.graphs[guild_id].remove(before, after)
+        self.cog.bot.invalidations.publish("role_linker", guild_id)
 
     async def clean(self) -> None:
         "データをお掃除します。"
@@ -138,9 +123,11 @@ class DataManager(DatabaseManager):
                     await cursor.execute("DELETE FROM RoleLinker WHERE GuildId = %s;", row[:1])
                     if row[0] in self.caches:
                         del self.caches[row[0]]
+                    if row[0] in self.graphs:
+                        del self.graphs[row[0]]
                     did.append(row[0])
                     continue
-                guild = self.cog.bot.get_guild(row[0])
+                guild = self.cog.bot.get_guild(row[0]) # allow-get
             if guild is None:
                 did.append(row[0])
             else:
@@ -155,12 +142,14 @@ class RoleLinkerEventContext(Cog.EventContext):
     remove_roles: list[discord.Role]
 
 
-Queues: TypeAlias = defaultdict[discord.Member, tuple[list[discord.Role], list[discord.Role]]]
+Queues: TypeAlias = dict[
+    tuple[int, int], tuple[discord.Member, list[discord.Role], list[discord.Role]]
+]
 class RoleLinker(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
         self.data = DataManager(self)
-        self.queues: Queues = defaultdict(lambda: ([], []))
+        self.queues: Queues = {}
 
     @commands.group(
         aliases=("rl", "ロールリンカー"), fsparent=FSPARENT,
@@ -186,10 +175,9 @@ class RoleLinker(Cog):
     ):
         await ctx.typing()
         assert ctx.guild is not None
-        await ctx.reply(t(
-            await self.data.write(ctx.guild.id, before.id, after.id, reverse)
-            or {"ja": "Ok"}, ctx
-        ))
+        if (error := await self.data.write(ctx.guild.id, before.id, after.id, reverse)) is None:
+            await self.bot.member_cache.fetch(ctx.guild, True)
+        await ctx.reply(t(error or {"ja": "Ok"}, ctx))
 
     @role_linker.command(
         aliases=REMOVE_ALIASES,
@@ -200,6 +188,8 @@ class RoleLinker(Cog):
         await ctx.typing()
         assert ctx.guild is not None
         await self.data.delete(ctx.guild.id, before.id, after.id)
+        if not any((await self.data.read(ctx.guild.id)).values()):
+            self.bot.member_cache.release(ctx.guild.id)
         await ctx.reply("Ok")
 
     @role_linker.command("list", aliases=LIST_ALIASES, description="Displays roleLink setting")
@@ -249,9 +239,19 @@ class RoleLinker(Cog):
     async def cog_load(self):
         await self.data.prepare_table()
         self.queue_processer.start()
+        self._invalidation = self.bot.invalidations.watch_cacher(
+            "role_linker", self.data.caches, self.data.graphs
+        )
 
     async def cog_unload(self):
         self.queue_processer.cancel()
+        self.bot.invalidations.unsubscribe("role_linker", self._invalidation)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        # ロールの付与/削除のイベントはキャッシュにあるメンバーでしか来ないので、設定のあるサーバーのメンバーは常にキャッシュしておく。
+        if await self.data.read(guild.id):
+            await self.bot.member_cache.fetch(guild, True)
 
     @commands.Cog.listener()
     async def on_member_role_add(self, member: discord.Member, role: discord.Role):
@@ -268,56 +268,53 @@ class RoleLinker(Cog):
         # キューに追加/付与を行うロールを追加する。
         datas = await self.data.read(member.guild.id)
         if role.id in datas:
+            if (key := (member.guild.id, member.id)) not in self.queues:
+                self.queues[key] = (member, [], [])
+            queue = self.queues[key]
             for data in datas[role.id]:
                 add = data.reverse
                 if mode == "add":
                     add = not add
-                add = int(add) - 1
-                if role not in self.queues[member][add]:
-                    if (after_role := member.guild.get_role(data.after)) is None:
-                        raise ValueError("NotFound")
-                    self.queues[member][add].append(after_role)
-
-    async def _manage_roles(
-        self, mode: Literal["add", "remove"], member: discord.Member,
-        roles: list[discord.Role]
+                roles = queue[1] if add else queue[2]
+                if (after_role := member.guild.get_role(data.after)) is None:
+                    raise ValueError("NotFound")
+                if after_role not in roles:
+                    roles.append(after_role)
+
+    async def _process(
+        self, member: discord.Member, add_roles: list[discord.Role],
+        remove_roles: list[discord.Role]
     ) -> None:
-        # ロールの付与/削除を行う。
-        roles = roles = list(filter(lambda role:
-            (mode == "add" and member.get_role(role.id) is None)
-            or (mode == "remove" and member.get_role(role.id) is not None),
-        roles))
-        self.queues[member] = ([], self.queues[member][1]) if mode == "add" \
-            else (self.queues[member][0], [])
-        if roles:
-            await getattr(member, f"{mode}_roles")(*roles, reason=t(dict(
-                ja=f"ロールリンカーのロールの{'付与' if mode == 'add' else '削除'}",
-                en=f"RoleLinker's {mode}"
-            ), member.guild))
+        # ロールの付与と削除をまとめて一回で行う。
+        detail = ""
+        try:
+            await self.bot.role_editor.edit(
+                member, add_roles, remove_roles, reason=t(dict(
+                    ja="ロールリンカーのロールの付与/削除", en="RoleLinker's add/remove"
+                ), member.guild)
+            )
+        except discord.Forbidden:
+            detail = FORBIDDEN
+        except discord.NotFound:
+            detail = ROLE_NOTFOUND
+        self.bot.rtevent.dispatch("on_role_linker_process", RoleLinkerEventContext(
+            self.bot, member.guild, "ERROR" if detail else "SUCCESS", {
+                "ja": "ロールリンカーのリンク", "en": "RoleLinker's link"
+            }, detail or {
+                "ja": "ロールリンカーのロール付与/削除", "en": "Roll linker rolls granted/removed"
+            }, self.role_linker, member=member,
+            add_roles=add_roles, remove_roles=remove_roles
+        ))
 
     @tasks.loop(seconds=5)
     async def queue_processer(self):
         # ロールの付与/削除のキューにあるロールの処理をする。
-        for member, (add_roles, remove_roles) in list(self.queues.items()):
-            detail = ""
-            try:
-                if add_roles:
-                    await self._manage_roles("add", member, add_roles)
-                if remove_roles:
-                    await self._manage_roles("remove", member, remove_roles)
-            except discord.Forbidden:
-                detail = FORBIDDEN
-            except ValueError:
-                detail = ROLE_NOTFOUND
-            if add_roles or remove_roles:
-                self.bot.rtevent.dispatch("on_role_linker_process", RoleLinkerEventContext(
-                    self.bot, member.guild, "ERROR" if detail else "SUCCESS", {
-                        "ja": "ロールリンカーのリンク", "en": "RoleLinker's link"
-                    }, detail or {
-                        "ja": "ロールリンカーのロール付与/削除", "en": "Roll linker rolls granted/removed"
-                    }, self.role_linker, member=member,
-                    add_roles=add_roles, remove_roles=remove_roles
-                ))
+        queues, self.queues = self.queues, {}
+        await gather(*(
+            self._process(member, add_roles, remove_roles)
+            for member, add_roles, remove_roles in queues.values()
+            if add_roles or remove_roles
+        ))
 
 
 async def setup(bot: RT) -> None:
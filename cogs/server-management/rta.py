@@ -13,8 +13,7 @@ from time import time
 
 from core.types_ import Channel
 from core import RT, Cog, t, DatabaseManager, cursor
-
-from rtlib.common.cacher import Cacher
+from core.cacher import BoundedCacher
 
 from data import FORBIDDEN
 
@@ -32,7 +31,7 @@ class DataManager(DatabaseManager):
             (guild_id,)
         )
         if row := await cursor.fetchone():
-            return self.bot.get_channel(row[0])
+            return self.bot.get_channel(row[0]) # allow-get
 
     async def prepare_table(self):
         "テーブルを用意します。"
@@ -84,7 +83,7 @@ IMMEDIATE_EXIT = dict(ja="即抜けRTA", en="Immediate Quit")
 class RTA(Cog):
     def __init__(self, bot: RT):
         self.data, self.bot = DataManager(bot), bot
-        self.sended: Cacher[str, float] = bot.cachers.acquire(60)
+        self.sended: BoundedCacher[str, float] = bot.cachers.acquire(60)
 
     async def cog_load(self):
         await self.data.prepare_table()
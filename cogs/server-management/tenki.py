@@ -14,8 +14,8 @@ from aiohttp import ClientSession
 
 from core.utils import make_default
 from core import RT, Cog, t, DatabaseManager, cursor
+from core.cacher import BoundedCacher
 
-from rtlib.common.cacher import Cacher
 from rtutil.views import TimeoutView, EmbedPage
 from rtutil.utils import make_datetime_text
 from rtutil.collectors import CITY_CODES, tenki
@@ -179,7 +179,7 @@ class Tenki(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
         self.data = DataManager(self)
-        self.caches: Cacher[str, dict[str, Any]] = self.bot.cachers.acquire(3600.0)
+        self.caches: BoundedCacher[str, dict[str, Any]] = self.bot.cachers.acquire(3600.0)
 
     async def make_content(self, city: str) -> EmbedPage:
         "天気予報を取得して埋め込みを作りそれのEmbedPageを作ります。"
@@ -233,9 +233,9 @@ class Tenki(Cog):
                     if data.time != now:
                         continue
                     if data.mode == "user":
-                        sendable = self.bot.get_user(data.id_)
+                        sendable = self.bot.get_user(data.id_) # allow-get
                     else:
-                        sendable = self.bot.get_channel(data.id_)
+                        sendable = self.bot.get_channel(data.id_) # allow-get
                         assert isinstance(sendable, discord.TextChannel)
                     if sendable is None:
                         continue
@@ -7,7 +7,7 @@ import discord
 
 from core import RT, Cog, t
 
-from rtlib.common.cacher import Cacher
+from core.cacher import IdCacher
 
 from data import FORBIDDEN
 
@@ -24,7 +24,7 @@ class TokenRemoverEventContext(Cog.EventContext):
 class TokenRemover(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
-        self.caches: Cacher[discord.Member, int] = self.bot.cachers.acquire(3600.0)
+        self.caches: IdCacher[int] = self.bot.cachers.acquire_by_id(3600.0)
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -1,34 +1,39 @@
 # RT - Translator
 
+from __future__ import annotations
+
 from discord.ext import commands
 import discord
 
 from discord.ext.fslash import Context
 
-from jishaku.functools import executor_function
-
-from deep_translator.exceptions import LanguageNotSupportedException
-from deep_translator import GoogleTranslator
-
 from core.utils import quick_invoke_command
+from core.lazy import lazy_import
 from core import Cog, RT, t
 
+from rtutil.translation import GoogleBackend, Coalescer
+
 from .__init__ import FSPARENT
 
 
+exceptions = lazy_import("deep_translator.exceptions")
+
+
 FEATURE_NAME = "Translate"
 class Translator(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
+        self.coalescer = Coalescer(GoogleBackend(), self.bot.cachers.acquire_bounded(
+            3600.0, max_size=20000, name="translator"
+        ), self.bot.executors.normal)
         self.bot.tree.remove_command(FEATURE_NAME)
         self.bot.tree.add_command(discord.app_commands.ContextMenu(
             name=FEATURE_NAME, callback=self.translate_from_context_menu,
             type=discord.AppCommandType.message
         ))
 
-    @executor_function
-    def translate(self, target: str, content: str) -> str:
-        return GoogleTranslator(target=target).translate(content)
+    async def translate(self, target: str, content: str) -> str:
+        return await self.coalescer.translate(target, content)
 
     @commands.command(
         "translate", description="Translation.",
@@ -59,7 +64,7 @@ class Translator(Cog):
                     icon_url="http://tasuren.syanari.com/RT/GoogleTranslate.png"
                 )
             )
-        except LanguageNotSupportedException:
+        except exceptions.LanguageNotSupportedException:
             await ctx.reply(t(dict(
                 ja="その言語は対応していません。", en="That language is not supported."
             ), ctx))
@@ -4,10 +4,14 @@ from __future__ import annotations
 
 from typing import NamedTuple, Literal
 
+from functools import partial
+
 from discord.ext import commands
 import discord
 
 from core import Cog, RT, DatabaseManager, cursor
+from core.join_pipeline import make_placeholders
+from core.cacher import BoundedCacher
 
 from rtutil.content_data import ContentData, disable_content_json, convert_content_json
 
@@ -26,6 +30,9 @@ class DataManager(DatabaseManager):
     def __init__(self, cog: WelcomeMessage):
         self.cog = cog
         self.pool = self.cog.bot.pool
+        # 設定がないサーバーも`None`としてキャッシュして、参加の度にデータベースを見ないようにする。
+        self.caches: BoundedCacher[tuple[int, Mode], WelcomeData | None] = \
+            self.cog.bot.cachers.acquire(3600.0)
 
     async def prepare_table(self) -> None:
         "テーブルを用意します。"
@@ -46,27 +53,53 @@ class DataManager(DatabaseManager):
                 "DELETE FROM WelcomeMessage WHERE GuildId = %s AND Mode = %s;",
                 (guild_id, mode)
             )
+            self.caches[(guild_id, mode)] = None
         else:
             if await self.read(guild_id, mode, cursor=cursor):
                 await cursor.execute(
                     """UPDATE WelcomeMessage SET Text = %s, ChannelId = %s
                         WHERE GuildId = %s AND Mode = %s;""",
-                    (dumps(data), guild_id, channel_id, mode)
+                    (dumps(data), channel_id, guild_id, mode)
                 )
             else:
                 await cursor.execute(
                     "INSERT INTO WelcomeMessage VALUES (%s, %s, %s, %s)",
                     (guild_id, channel_id, mode, dumps(data))
                 )
+            self.caches[(guild_id, mode)] = WelcomeData(channel_id, mode, data)
+        self.cog.bot.invalidations.publish("welcome_message", (guild_id, mode))
 
     async def read(self, guild_id: int, mode: Mode, **_) -> WelcomeData | None:
         "データを読み込みます。"
-        await cursor.execute(
-            "SELECT * FROM WelcomeMessage WHERE GuildId = %s AND Mode = %s;",
-            (guild_id, mode)
-        )
-        if row := await cursor.fetchone():
-            return WelcomeData(row[1], row[2], loads(row[3]))
+        if (guild_id, mode) not in self.caches:
+            await cursor.execute(
+                "SELECT * FROM WelcomeMessage WHERE GuildId = %s AND Mode = %s;",
+                (guild_id, mode)
+            )
+            row = await cursor.fetchone()
+            self.caches[(guild_id, mode)] = WelcomeData(row[1], row[2], loads(row[3])) \
+                if row else None
+        return self.caches.get((guild_id, mode), None)
+
+    async def read_many(self, guild_ids: set[int], mode: Mode, **_) -> dict[int, WelcomeData]:
+        "複数のサーバーのデータをまとめて読み込みます。キャッシュにないものだけデータベースから取得します。"
+        if targets := [
+            guild_id for guild_id in guild_ids
+            if (guild_id, mode) not in self.caches
+        ]:
+            await cursor.execute(
+                "SELECT * FROM WelcomeMessage WHERE Mode = %s AND GuildId IN ({});".format(
+                    make_placeholders(len(targets))
+                ), (mode, *targets)
+            )
+            for guild_id in targets:
+                self.caches[(guild_id, mode)] = None
+            for row in await cursor.fetchall():
+                self.caches[(row[0], mode)] = WelcomeData(row[1], row[2], loads(row[3]))
+        return {
+            guild_id: data for guild_id in guild_ids
+            if (data := self.caches.get((guild_id, mode), None)) is not None
+        }
 
     async def clean(self) -> None:
         "データのお掃除をします。"
@@ -87,6 +120,14 @@ class WelcomeMessage(Cog):
 
     async def cog_load(self):
         await self.data.prepare_table()
+        self.bot.joins.register("WelcomeMessage", self.on_joins, True)
+        self._invalidation = self.bot.invalidations.watch_cacher(
+            "welcome_message", self.data.caches
+        )
+
+    async def cog_unload(self):
+        self.bot.joins.unregister("WelcomeMessage")
+        self.bot.invalidations.unsubscribe("welcome_message", self._invalidation)
 
     @commands.command(
         fsparent=FSPARENT, aliases=(
@@ -143,34 +184,42 @@ class WelcomeMessage(Cog):
     async def on_member(self, mode: Mode, member: discord.Member):
         data = await self.data.read(member.guild.id, mode)
         if data is not None:
-            detail = ""
-            if (channel := self.bot.get_channel(data.channel_id)) is not None:
-                assert isinstance(channel, discord.TextChannel)
-                kwargs = disable_content_json(data.text)["content"]
-                # もしメッセージ内容に`!bt!`などがあるなら、それに対応する数に交換する。
-                if "content" in kwargs:
-                    kwargs["content"] = self._update_text(
-                        self.bot.cogs["ChannelStatus"]._update_text( # type: ignore
-                            kwargs["content"], channel.guild
-                        ), member
-                    )
-                try:
-                    await channel.send(**kwargs)
-                except discord.Forbidden:
-                    detail = FORBIDDEN
-            else:
-                detail = CHANNEL_NOTFOUND
-            self.bot.rtevent.dispatch("on_welcome_message_send", WelcomeSendEventContext(
-                self.bot, member.guild, "ERROR" if detail else "SUCCESS",
-                {"ja": "ウェルカムメッセージ", "en": "Welcome message"}, detail or {
-                    "ja": f"送信チャンネルID：{data.channel_id}",
-                    "en": f"Channel ID：{data.channel_id}"
-                }, self.welcome, channel=channel, data=data
-            ))
-
-    @commands.Cog.listener()
-    async def on_member_join_cooldown(self, member: discord.Member):
-        await self.on_member("join", member)
+            await self.send(member, data)
+
+    async def send(self, member: discord.Member, data: WelcomeData):
+        "ウェルカムメッセージを送信します。"
+        detail = ""
+        if (channel := self.bot.get_channel(data.channel_id)) is not None: # allow-get
+            assert isinstance(channel, discord.TextChannel)
+            kwargs = disable_content_json(data.text)["content"]
+            # もしメッセージ内容に`!bt!`などがあるなら、それに対応する数に交換する。
+            if "content" in kwargs:
+                kwargs["content"] = self._update_text(
+                    await self.bot.cogs["ChannelStatus"].update_text( # type: ignore
+                        kwargs["content"], channel.guild
+                    ), member
+                )
+            try:
+                await channel.send(**kwargs)
+            except discord.Forbidden:
+                detail = FORBIDDEN
+        else:
+            detail = CHANNEL_NOTFOUND
+        self.bot.rtevent.dispatch("on_welcome_message_send", WelcomeSendEventContext(
+            self.bot, member.guild, "ERROR" if detail else "SUCCESS",
+            {"ja": "ウェルカムメッセージ", "en": "Welcome message"}, detail or {
+                "ja": f"送信チャンネルID：{data.channel_id}",
+                "en": f"Channel ID：{data.channel_id}"
+            }, self.welcome, channel=channel, data=data
+        ))
+
+    async def on_joins(self, members: list[discord.Member]) -> None:
+        datas = await self.data.read_many({member.guild.id for member in members}, "join")
+        for member in members:
+            if member.guild.id in datas:
+                self.bot.joins.actions.put(member.guild.id, partial(
+                    self.send, member, datas[member.guild.id]
+                ))
 
     @commands.Cog.listener()
     async def on_member_remove_cooldown(self, member: discord.Member):
@@ -84,11 +84,7 @@ class AutoSpoiler(Cog):
             # Auto Spoiler
             is_replaced = False
             # 添付ファイルをスポイラーにする。
-            new = []
-            for attachment in message.attachments:
-                new.append(await attachment.to_file(
-                    filename=f"SPOILER_{attachment.filename}", spoiler=True
-                ))
+            if message.attachments:
                 is_replaced = True
 
             # urlをスポイラーにする。
@@ -119,13 +115,19 @@ class AutoSpoiler(Cog):
             if message.reference:
                 message.content = f"返信先：{message.reference.jump_url}\n{message.content}"
             error = None
-            await webhook_send(
-                message.channel, message.author, content=message.content,
-                files=new, embeds=message.embeds,
-                username=message.author.display_name + " RT Auto Spoiler",
-                avatar_url=message.author.display_avatar.url,
-                view=RemoveButton(message.author)
-            )
+            async with self.bot.relay.download(
+                message.attachments, message.guild.filesize_limit
+            ) as relayed:
+                if not relayed.complete:
+                    # 送り直せない添付ファイルがある場合は、元のメッセージを消すと添付ファイルが失われるのでやめる。
+                    return
+                await webhook_send(
+                    message.channel, message.author, content=message.content,
+                    files=relayed.to_files(spoiler=True), embeds=message.embeds,
+                    username=message.author.display_name + " RT Auto Spoiler",
+                    avatar_url=message.author.display_avatar.url,
+                    view=RemoveButton(message.author)
+                )
             try:
                 await message.delete()
             except discord.NotFound:
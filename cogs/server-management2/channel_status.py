@@ -89,6 +89,12 @@ class ChannelStatus(Cog):
     async def cog_unload(self):
         self._update_channels.cancel()
 
+    async def update_text(self, text: str, guild: discord.Guild) -> str:
+        "`_update_text`を、必要な場合はサーバーの全メンバーを取得してから実行します。"
+        if "!mb!" in text or "!bt!" in text:
+            await self.bot.member_cache.fetch(guild)
+        return self._update_text(text, guild)
+
     def _update_text(self, text: str, guild: discord.Guild) -> str:
         # 新しい名前を作る。
         if "!tch!" in text:
@@ -97,20 +103,20 @@ class ChannelStatus(Cog):
         if "!vch!" in text:
             # ボイスチャンネル数
             text = text.replace("!vch!", str(len(guild.voice_channels)))
-        # ユーザー数
-        mb, us, bt = 0, 0, 0
-        for member in guild.members:
-            us += 1
-            if member.bot:
-                bt += 1
-            else:
-                mb += 1
+        if "!us!" in text:
+            # ユーザー数
+            text = text.replace("!us!", str(guild.member_count or len(guild.members)))
+        # メンバー数とBot数は全メンバーが必要なので、使われている時だけ数える。
+        mb, bt = 0, 0
+        if "!mb!" in text or "!bt!" in text:
+            for member in guild.members:
+                if member.bot:
+                    bt += 1
+                else:
+                    mb += 1
         if "!mb!" in text:
             # メンバー数
             text = text.replace("!mb!", str(mb))
-        if "!us!" in text:
-            # ユーザー数
-            text = text.replace("!us!", str(us))
         if "!bt!" in text:
             # Bot数
             text = text.replace("!bt!", str(bt))
@@ -134,7 +140,7 @@ class ChannelStatus(Cog):
             else:
                 assert isinstance(channel, discord.TextChannel | discord.VoiceChannel)
                 # チャンネルの名前を新しいのに更新する。
-                text = self._update_text(row[2], guild)
+                text = await self.update_text(row[2], guild)
                 if text == channel.name:
                     continue
                 try:
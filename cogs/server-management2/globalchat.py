@@ -11,10 +11,11 @@ import discord
 from discord.ext import commands
 
 from core import Cog, RT, t, DatabaseManager, cursor
+from core.relay import RelayedAttachments
+from core.cacher import BoundedCacher
 
 from rtutil.utils import webhook_send
 
-from rtlib.common.cacher import Cacher
 from rtlib.common.json import dumps, loads
 
 from data import FORBIDDEN
@@ -96,6 +97,7 @@ class DataManager(DatabaseManager):
             (name, channel_id)
         )
         self.caches[name].append(channel_id)
+        self.bot.invalidations.publish("globalchat", name)
 
     async def create(
         self, name: str, author_id: int,
@@ -129,6 +131,7 @@ class DataManager(DatabaseManager):
             (name, channel_id)
         )
         self.caches[name].append(channel_id)
+        self.bot.invalidations.publish("globalchat", name)
 
     async def is_connected(self, channel_id: int, **_) -> bool:
         "これはすでに接続されているか確認するものです。"
@@ -179,6 +182,17 @@ class DataManager(DatabaseManager):
             (channel_id,)
         )
         self.caches[name].remove(channel_id)
+        self.bot.invalidations.publish("globalchat", name)
+
+    async def reload(self, name: str, **_) -> None:
+        "グローバルチャットに接続しているチャンネルのキャッシュを読み込み直します。"
+        await cursor.execute(
+            "SELECT ChannelId FROM GlobalChatChannel WHERE Name = %s;", (name,)
+        )
+        if channel_ids := [row[0] for row in await cursor.fetchall()]:
+            self.caches[name] = channel_ids
+        else:
+            self.caches.pop(name, None)
 
     async def insert_message(self, source: int, channel_id: int, message_id: int) -> None:
         "メッセージを保存します。"
@@ -215,11 +229,15 @@ class GlobalChat(Cog):
         self.bot = bot
         self.pool = self.bot.pool
         self.data = DataManager(bot)
-        self.cooldowns: Cacher[tuple[int, int], int] = self.bot.cachers.acquire(10.0)
+        self.cooldowns: BoundedCacher[tuple[int, int], int] = self.bot.cachers.acquire(10.0)
 
     async def cog_load(self):
         await self.data.prepare_table()
 
+    @commands.Cog.listener()
+    async def on_invalidate_globalchat(self, name: str, _):
+        await self.data.reload(name)
+
     @commands.group(
         description="The command of globalchat.", fsparent=FSPARENT,
         aliases=("gc", "gchat", "グローバルチャット", "ぐろちゃ")
@@ -319,25 +337,40 @@ class GlobalChat(Cog):
             self.cooldowns[(message.channel.id, message.author.id)] += 1
 
         # メッセージの送信を行う。
-        for channel_id in self.data.caches[name]:
+        # 添付ファイルは一度だけダウンロードして、全ての送信先で使い回す。
+        # どのサーバーにも送れない大きさのものはダウンロードしない。
+        channels = await self.get_channels(message, name)
+        async with self.bot.relay.download(message.attachments, max(
+            (channel.guild.filesize_limit for channel in channels), default=0
+        )) as relayed:
+            await self.send_all(message, channels, relayed)
+
+    async def get_channels(self, message: discord.Message, name: str) -> list[discord.TextChannel]:
+        "グローバルチャットに接続している、送信先のチャンネルを取得します。見つからないチャンネルは接続を解除します。"
+        channels = []
+        for channel_id in list(self.data.caches[name]):
             if message.channel.id == channel_id:
                 continue
-
-            # チャンネルの取得を行う。
             channel = await self.bot.search_channel(channel_id)
-            assert isinstance(channel, discord.TextChannel)
             if channel is None:
                 await self.data.disconnect(channel_id, cursor=cursor)
                 continue
+            assert isinstance(channel, discord.TextChannel)
+            channels.append(channel)
+        return channels
 
+    async def send_all(
+        self, message: discord.Message, channels: list[discord.TextChannel],
+        relayed: RelayedAttachments
+    ) -> None:
+        "渡されたグローバルチャットのチャンネルにメッセージを送信します。"
+        for channel in channels:
             # 送信を行う。
             error = None
             try:
                 await webhook_send(
-                    channel, message.author, message.clean_content, files=[
-                        await attachment.to_file()
-                        for attachment in message.attachments
-                    ]
+                    channel, message.author, message.clean_content,
+                    files=relayed.to_files(channel.guild)
                 )
             except discord.Forbidden:
                 error = FORBIDDEN
@@ -67,23 +67,26 @@ class RolePanelView(discord.ui.View):
         # ロールの処理を行う。
         try:
             if not error:
-                # 削除するロールのリストを作り削除を行う。
-                if remove_roles := set(role for role in filter(
+                # 削除するロールのリストを作り、付与と一緒に一回で行う。
+                remove_roles = set(role for role in filter(
                     lambda role: role.id not in selected and str(role.id) in description,
                     interaction.user.roles
-                )):
-                    await interaction.user.remove_roles(*remove_roles)
-                # ロールの付与を行う。
-                if roles:
-                    await interaction.user.add_roles(*roles)
+                ))
+                # ロールの処理は他のものとまとめて行うので、三秒以内に終わらないことがある。そのため先に応答しておく。
+                await interaction.response.defer(ephemeral=True)
+                if roles or remove_roles:
+                    await self.cog.bot.role_editor.edit(
+                        interaction.user, roles, remove_roles
+                    )
         except discord.Forbidden:
-            await interaction.response.send_message(t(dict(
+            await interaction.followup.send(t(dict(
                 ja="権限がないためロールの処理に失敗しました。",
                 en="Role processing failed due to lack of permissions."
             ), interaction), ephemeral=True)
             error = FORBIDDEN
         else:
-            await interaction.response.send_message("Ok", ephemeral=True)
+            if not error:
+                await interaction.followup.send("Ok", ephemeral=True)
 
         self.cog.bot.rtevent.dispatch("on_role_panel", RolePanelEventContext(
             self.cog.bot, interaction.guild, self.cog.detail_or(error), {
@@ -104,9 +107,10 @@ class RolePanelView(discord.ui.View):
         # 役職を削除する。
         description = self.extract_description(interaction)
         assert isinstance(interaction.user, discord.Member)
+        await interaction.response.defer(ephemeral=True)
         if roles := set(role for role in interaction.user.roles if str(role.id) in description):
-            await interaction.user.remove_roles(*roles)
-        await interaction.response.send_message("Ok", ephemeral=True)
+            await self.cog.bot.role_editor.edit(interaction.user, remove=roles)
+        await interaction.followup.send("Ok", ephemeral=True)
 
 
 class RolePanel(Cog):
@@ -10,8 +10,7 @@ import discord
 
 from core import Cog, RT, t, DatabaseManager, cursor
 from core.types_ import Text
-
-from rtlib.common.cacher import Cacher
+from core.cacher import BoundedCacher
 
 from data import (
     FORBIDDEN, LIST_ALIASES, NO_MORE_SETTING, ROLE_NOTFOUND,
@@ -99,7 +98,7 @@ class Threading(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
         self.data = DataManager(self)
-        self.caches: Cacher[int, None] = self.bot.cachers.acquire(5)
+        self.caches: BoundedCacher[int, None] = self.bot.cachers.acquire(5)
 
     async def cog_load(self):
         await self.data.prepare_table()
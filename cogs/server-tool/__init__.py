@@ -102,12 +102,12 @@ class ServerTool(Cog):
             async with conn.cursor() as cursor:
                 async for row in self.data.read_all_unlock_queues(cursor=cursor):
                     if guild is None or guild.id != row[0]:
-                        guild = self.bot.get_guild(row[0])
+                        guild = self.bot.get_guild(row[0]) # allow-get
                     if guild is None:
                         continue
 
                     remove, error = False, None
-                    if (channel := guild.get_channel(row[1])) is None:
+                    if (channel := guild.get_channel(row[1])) is None: # allow-get
                         remove = True
                         error = CHANNEL_NOTFOUND
                     if not remove and now > row[2]:
@@ -333,7 +333,7 @@ class ServerTool(Cog):
             embed.add_field(
                 name=t({"ja": "サーバーのメンバー数", "en": "Server member count"}, ctx),
                 value="{} ({})".format(guild.member_count, guild.member_count - len(
-                    set(filter(lambda m: m.bot, guild.members))
+                    set(filter(lambda m: m.bot, await self.bot.member_cache.fetch(guild)))
                 ))
             )
         text, voice, count = 0, 0, 0
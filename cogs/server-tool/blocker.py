@@ -12,6 +12,7 @@ from asyncio import gather
 from discord.ext import commands
 import discord
 
+from core.warmup import WarmUp
 from core import Cog, DatabaseManager, cursor, RT, t
 
 from rtutil.views import EmbedPage
@@ -35,6 +36,12 @@ class DataManager(DatabaseManager):
         self.cog = cog
         self.pool = self.cog.bot.pool
         self.caches: dict[int, dict[str, list[int]]] = {}
+        self.warm_up = WarmUp(self.cog.bot, "Blocker", self._cache, "GuildId, Mode, Roles")
+
+    def _cache(self, row: tuple) -> None:
+        if row[0] not in self.caches:
+            self.caches[row[0]] = {}
+        self.caches[row[0]][row[1]] = loads(row[2])
 
     async def prepare_table(self) -> None:
         "テーブルを準備します。"
@@ -46,10 +53,7 @@ class DataManager(DatabaseManager):
             );"""
         )
         # キャッシュを作る。
-        async for row in self.fetchstep(cursor, "SELECT GuildId, Mode, Roles FROM Blocker;"):
-            if row[0] not in self.caches:
-                self.caches[row[0]] = {}
-            self.caches[row[0]][row[1]] = loads(row[2])
+        await self.warm_up.load()
 
     @overload
     async def toggle(self, guild_id: int, mode: Mode, **_) -> bool: ...
@@ -74,6 +78,7 @@ class DataManager(DatabaseManager):
             del self.caches[guild_id][mode]
             if not self.caches[guild_id]:
                 del self.caches[guild_id]
+            self.cog.bot.role_indexes.forget(guild_id, ("blocker", mode))
             return False
         else:
             await cursor.execute(
@@ -81,6 +86,7 @@ class DataManager(DatabaseManager):
                 (guild_id, mode, "[]", r"{}")
             )
             self.caches[guild_id][mode] = []
+            self.cog.bot.role_indexes.forget(guild_id, ("blocker", mode))
             return True
 
     def _is_enabled(self, guild_id: int, mode: Mode) -> None:
@@ -109,6 +115,7 @@ class DataManager(DatabaseManager):
             })
         else:
             self.caches[guild_id][mode].append(role_id)
+            self.cog.bot.role_indexes.forget(guild_id, ("blocker", mode))
             await cursor.execute(
                 "UPDATE Blocker SET Roles = %s WHERE GuildId = %s AND Mode = %s;",
                 (dumps(self.caches[guild_id][mode]), guild_id, mode)
@@ -143,6 +150,7 @@ class DataManager(DatabaseManager):
             (dumps(self.caches[guild_id][mode]), guild_id, mode)
         )
         self.caches[guild_id][mode].remove(role_id)
+        self.cog.bot.role_indexes.forget(guild_id, ("blocker", mode))
 
     async def clean(self):
         "データを掃除します。"
@@ -304,9 +312,12 @@ class Blocker(Cog):
 
     def is_target(self, guild_id: int, author: discord.Member, mode: Mode) -> bool:
         "ブロッカーのチェックが必要かどうかを返します。"
-        return mode in self.data.caches[guild_id] and any(
-            author.get_role(role_id) is not None
-            for role_id in self.data.caches[guild_id][mode]
+        # 設定のロールのビットマスクは設定が変わるまでキャッシュする。削除されたロールにはビットを割り当てない。
+        return mode in self.data.caches[guild_id] and self.bot.role_indexes[guild_id].has_any(
+            author, (
+                role_id for role_id in self.data.caches[guild_id][mode]
+                if author.guild.get_role(role_id) is not None
+            ), ("blocker", mode)
         )
 
     @Cog.listener()
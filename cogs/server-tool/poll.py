@@ -333,12 +333,12 @@ class Poll(Cog):
             async with conn.cursor() as cursor:
                 async for data in self.data.read_whole_data(cursor=cursor):
                     if guild is None or guild.id != data.guild_id:
-                        guild = self.bot.get_guild(data.guild_id)
+                        guild = self.bot.get_guild(data.guild_id) # allow-get
                     if guild is None:
                         continue
                     # チャンネルを取得する。
                     error = None
-                    if (channel := guild.get_channel(data.channel_id)) is None:
+                    if (channel := guild.get_channel(data.channel_id)) is None: # allow-get
                         error = CHANNEL_NOTFOUND
                     # 投票の期限が切れているか確認する。
                     if error is not None or now < data.deadline:
@@ -6,14 +6,16 @@ from typing import TYPE_CHECKING, TypeVar, Literal, TypedDict, Any
 from collections.abc import Callable
 
 from functools import wraps
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from logging import currentframe, getLogger, DEBUG
+from logging import getLogger, DEBUG
 from warnings import warn
 
-from concurrent.futures import ThreadPoolExecutor
-from os.path import isdir
-from os import listdir
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import get_context, get_all_start_methods
+from os.path import isdir, exists
+from hashlib import sha256
+from sys import _getframe
 from time import time
 
 from asyncio import gather, sleep, all_tasks
@@ -30,20 +32,31 @@ from ipcs import Client, logger as ipcs_logger
 
 from aiomysql import create_pool, Cursor, Pool
 from aiohttp import ClientSession
-from orjson import dumps
+from orjson import dumps, OPT_SORT_KEYS
 
 from rtutil.utils import make_random_string
+from rtutil.compact import IdMap
+from rtutil.cluster import ControlClient
 
 from rtlib.common import set_handler
 from rtlib.common.database import DatabaseManager
-from rtlib.common.cacher import CacherPool, Cacher
 from rtlib.common.chiper import ChiperManager
 from rtlib.common.utils import make_simple_error_text
 
-from data import DATA, CATEGORIES, PREFIXES, SECRET, TEST, SHARD, ADMINS, URL, API_URL, Colors
+from data import (
+    DATA, CATEGORIES, PREFIXES, SECRET, TEST, SHARD, CHECK_GET, ADMINS, URL, API_URL, Colors
+)
 
 from .customer_pool import CustomerPool
 from .mixer_pool import MixerPool
+from .join_pipeline import JoinPipeline
+from .loader import StartupProfiler, ExtensionLoader, find_extensions, loading
+from .invalidation import InvalidationBus
+from .cacher import CacherPool, BoundedCacher
+from .relay import AttachmentRelay
+from .role_index import RoleIndexes
+from .role_editor import RoleEditor
+from .member_cache import MemberCache, make_member_cache_kwargs
 from .utils import logger
 from .rtws import setup
 from . import tdpocket
@@ -56,20 +69,41 @@ if TYPE_CHECKING:
 
 
 __all__ = ("RT",)
+TREE_HASH_PATH = "tree_hash.{}.txt"
+"""最後に同期したスラッシュコマンドの内容のハッシュを保存するファイルです。
+同じ場所から別のBot(テスト用のBot等)を動かしても同期を飛ばさないように、アプリケーションID毎に分けます。"""
 set_handler(ipcs_logger)
 
 
 class Prefixes(TypedDict):
-    Guild: dict[int, str]
-    User: dict[int, str]
+    Guild: IdMap
+    User: IdMap
 @dataclass
 class Caches:
-    guild: dict[int, str]
-    user: dict[int, str]
+    guild: IdMap
+    user: IdMap
 @dataclass
 class Executors:
     normal: ThreadPoolExecutor
-    clean: ThreadPoolExecutor    
+    clean: ThreadPoolExecutor
+    process_workers: int = 2
+    _process: ProcessPoolExecutor | None = field(default=None, init=False)
+
+    @property
+    def process(self) -> ProcessPoolExecutor:
+        """プロセスプールです。最初に使われた時に作ります。
+        スレッドのあるこのプロセスをフォークしないように、`forkserver`か`spawn`で子プロセスを作ります。
+        そのため、ここで実行する関数はBotのモジュールを読み込まないモジュールに置いてください。"""
+        if self._process is None:
+            self._process = ProcessPoolExecutor(self.process_workers, mp_context=get_context(
+                "forkserver" if "forkserver" in get_all_start_methods() else "spawn"
+            ))
+        return self._process
+
+    def shutdown_process(self) -> None:
+        "プロセスプールが作られていれば止めます。"
+        if self._process is not None:
+            self._process.shutdown(False, cancel_futures=True)
 
 
 GetT = TypeVar("GetT", bound=discord.abc.Snowflake)
@@ -79,7 +113,7 @@ class RT(commands.Bot):
     Colors = Colors
     log: LogCore
     rtevent: RTEvent
-    exists_caches: Cacher[int, bool]
+    exists_caches: BoundedCacher[int, bool]
     help_: HelpCore
     URL = URL
     API_URL = API_URL
@@ -91,14 +125,26 @@ class RT(commands.Bot):
             if DATA["shard_ids"] != "auto":
                 kwargs["shard_ids"] = DATA["shard_ids"]
                 kwargs["shard_count"] = DATA["shard_count"]
+        kwargs.update(make_member_cache_kwargs(DATA.get("member_cache"))) # type: ignore
         super().__init__(*args, **kwargs)
 
-        self.prefixes: Prefixes = {"User": {}, "Guild": {}}
-        self.language = Caches({}, {})
-        self.rtws = Client(str(self.shard_id))
+        self.prefixes: Prefixes = {"User": IdMap(), "Guild": IdMap()}
+        self.language = Caches(IdMap(), IdMap())
+        self.cluster = ControlClient(
+            lambda event, data: self.dispatch(f"cluster_{event}", data)
+        )
+        self.add_listener(self._on_cluster_command, "on_cluster_command")
+        # `cluster.py`から起動された場合は、プロセス毎に別のIDでバックエンドに繋ぐ。
+        self.rtws_id = f"cluster-{self.cluster.id}" if self.cluster.enabled \
+            else str(self.shard_id)
+        self.rtws = Client(self.rtws_id)
         self.rtws.set_route(self.exists_object, "exists")
+        self.invalidations = InvalidationBus(self)
         self.chiper = ChiperManager.from_key_file("secret.key")
         self.logger = logger
+        self.profiler = StartupProfiler()
+        self.member_cache = MemberCache(self, DATA.get("member_cache")) # type: ignore
+        self.role_indexes = RoleIndexes(self)
         if TEST:
             logger.setLevel(DEBUG)
         self.executors = Executors(
@@ -107,10 +153,12 @@ class RT(commands.Bot):
         )
         self.after_queue: list[Callable[[], Any]] = [
             lambda: self.executors.normal.shutdown(False, cancel_futures=True),
-            lambda: self.executors.clean.shutdown(True)
+            lambda: self.executors.clean.shutdown(True),
+            self.executors.shutdown_process
         ]
 
         self._closing = False
+        self._tree_hash: str | None = None
         extend_force_slash(self, replace_invalid_annotation_to_str=True,
         first_groups=[discord.app_commands.Group(
             name=key, description=CATEGORIES[key]["en"]
@@ -159,36 +207,99 @@ class RT(commands.Bot):
             else:
                 logger.info("Load extension: %s", path)
 
+    async def add_cog(self, cog: commands.Cog, /, **kwargs) -> None:
+        # `cog_load`にかかった時間を、読み込み中のエクステンション毎に記録する。
+        with self.profiler.measure("cog_load", loading.get() or cog.qualified_name):
+            await super().add_cog(cog, **kwargs)
+
     async def setup_hook(self):
-        self.mixers = MixerPool(self)
-        self.cachers = CacherPool()
-        self.cachers.start()
-        logger.info("Prepared cacher")
-        self.exists_caches = self.cachers.acquire(60.0)
-        self.pool: Pool = await create_pool(**SECRET["mysql"])
-        logger.info("Prepared customer pool")
-        self.customers = CustomerPool(self)
-
-        self.session = ClientSession(json_serialize=dumps) # type: ignore
-        logger.info("Prepared client session")
-
-        await self.load_extension("core.rtevent")
-        await self.load_extension("core.log")
-        await self.load_extension("core.help")
-        await self.load_extension("jishaku")
+        self.cluster.start()
+        self.member_cache.start()
+        with self.profiler.measure("prepare"):
+            self.mixers = MixerPool(self)
+            self.joins = JoinPipeline(self)
+            self.cachers = CacherPool()
+            self.cachers.start()
+            logger.info("Prepared cacher")
+            self.exists_caches = self.cachers.acquire(60.0)
+            self.role_editor = RoleEditor(self)
+            self.pool: Pool = await create_pool(**SECRET["mysql"])
+            logger.info("Prepared customer pool")
+            self.customers = CustomerPool(self)
+
+            self.session = ClientSession(json_serialize=dumps) # type: ignore
+            self.relay = AttachmentRelay(self)
+            logger.info("Prepared client session")
+
+        with self.profiler.measure("core"):
+            await self.load_extension("core.rtevent")
+            await self.load_extension("core.log")
+            await self.load_extension("core.help")
+            await self.load_extension("jishaku")
         logger.info("Loaded core extensions")
         tdpocket.bot = self
-        for path in listdir("cogs"):
-            path = f"cogs/{path}"
-            if isdir(path):
-                for deep in listdir(path):
-                    await self._load(f"{path}/{deep}")
-            else:
-                await self._load(path)
+        with self.profiler.measure("load"):
+            await ExtensionLoader(self).load(find_extensions())
         logger.info("Loaded extensions")
+        logger.info("Startup profile:\n%s", self.profiler.report())
         self.dispatch("load")
         self.dispatch("setup")
 
+    def _command_to_dict(self, command: Any) -> dict:
+        try:
+            return command.to_dict(self.tree)
+        except TypeError:
+            # 古いdiscord.pyでは`to_dict`は引数を取らない。
+            return command.to_dict()
+
+    def make_tree_hash(self) -> str:
+        "スラッシュコマンドの内容のハッシュを作ります。内容が同じなら同じ値になります。"
+        return sha256(dumps(sorted(
+            (self._command_to_dict(command) for command in self.tree.get_commands()),
+            key=lambda data: (data.get("type", 1), data["name"])
+        ), option=OPT_SORT_KEYS)).hexdigest()
+
+    async def sync_tree(self, force: bool = False) -> bool:
+        """スラッシュコマンドを同期します。前回同期した時と内容が変わっていない場合は同期しません。
+        同期した場合は`True`を返します。"""
+        hash_, path = self.make_tree_hash(), TREE_HASH_PATH.format(self.application_id)
+        if not force:
+            if self._tree_hash is None and exists(path):
+                with open(path, "r") as f:
+                    self._tree_hash = f.read().strip()
+            if self._tree_hash == hash_:
+                return False
+        await self.tree.sync()
+        self._tree_hash = hash_
+        with open(path, "w") as f:
+            f.write(hash_)
+        return True
+
+    async def run_cluster_command(self, name: str, *args: str) -> None:
+        """全てのプロセスで実行するためのコマンドを、このプロセスで実行します。
+        `load`/`unload`/`reload`(引数はエクステンションの名前)と`help`(ヘルプの再読み込み)があります。"""
+        if name in ("load", "unload", "reload"):
+            for extension in args:
+                await getattr(self, f"{name}_extension")(extension)
+        elif name == "help":
+            await self.cogs["HelpCore"].aioload() # type: ignore
+        else:
+            raise ValueError(f"Unknown cluster command: {name}")
+
+    async def broadcast_command(self, name: str, *args: str) -> None:
+        "`.run_cluster_command`のコマンドを、他の全てのプロセスに送ってからこのプロセスでも実行します。"
+        self.cluster.broadcast("command", {"name": name, "args": args})
+        await self.run_cluster_command(name, *args)
+
+    async def _on_cluster_command(self, data: dict[str, Any]) -> None:
+        # ランチャーか他のプロセスから送られてきたコマンドを実行する。
+        try:
+            await self.run_cluster_command(data["name"], *data["args"])
+        except Exception as e:
+            logger.error("Failed to run cluster command %s: %s", data, make_simple_error_text(e))
+        else:
+            logger.info("Ran cluster command: %s", data)
+
     async def connect(self, reconnect: bool = True) -> None:
         logger.info("Connecting...")
         await super().connect(reconnect=reconnect)
@@ -203,8 +314,12 @@ class RT(commands.Bot):
     async def on_connect(self):
         logger.info("Connected")
         # スラッシュコマンドを同期させる。
-        await self.tree.sync()
-        logger.info("Command tree was synced")
+        with self.profiler.measure("tree_sync"):
+            synced = await self.sync_tree()
+        if synced:
+            logger.info("Command tree was synced (%.3fs)", self.profiler.total("tree_sync"))
+        else:
+            logger.info("Command tree is not changed, so it was not synced")
         # rtws (ipcs) を繋げる。
         logger.info("Starting ipcs client...")
         self._start_rtws()
@@ -249,7 +364,7 @@ class RT(commands.Bot):
 
     def exists_object(self, _, mode: str, id_: int) -> bool:
         "指定されたIDの存在確認をします。"
-        return not self.is_ready() or getattr(self, f"get_{mode}")(id_, force=True) is not None
+        return not self.is_ready() or getattr(self, f"get_{mode}")(id_) is not None
 
     async def exists(self, mode: str, id_: int) -> bool:
         "指定されたオブジェクトがRTが見える範囲に存在しているかを確認します。"
@@ -269,30 +384,30 @@ class RT(commands.Bot):
         (TODO: ここに詳細を書いたウェブページのURLを入れる。)"""
         if not self.is_ready():
             raise ValueError("`get_obj`はBotが起動完了してからでなければ実行できません。")
-        return getattr(self, f"get_{attribute}")(id_, force=True)
+        return getattr(self, f"get_{attribute}")(id_)
 
     def get_obj_from_guild(
         self, guild: discord.Guild, attribute: str,
         id_: int, _: type[GetT]
     ) -> GetT | None:
         "`.get_obj`の`discord.Guild`版です。詳細は`.get_obj`のドキュメントをご覧ください。"
-        return getattr(guild, attribute)(id_, force=True)
+        return getattr(guild, attribute)(id_)
 
     async def search_user(self, user_id: int) -> discord.User | None:
         "`get_user`または`fetch_user`のどちらかを使用してユーザーデータの取得を試みます。"
-        user = self.get_user(user_id, force=True) # type: ignore
+        user = self.get_user(user_id) # type: ignore
         if user is None:
             user = await self.fetch_user(user_id)
         return user
 
     def is_sharded(self) -> bool:
         "シャードが使われているBotかどうかを返します。"
-        return bool(getattr(self, "shard_ids"))
+        return bool(getattr(self, "shard_ids", None))
 
     async def search_guild(self, guild_id: int, consider_shard: bool = True) -> discord.Guild | None:
         """`get_guild`または`fetch_guild`のどちらかを使用してギルドデータの取得を試みます。
         これで返されるギルドの`get_member`や`members`そして`channels`などの属性は使えないことがあります。"""
-        guild = self.get_guild(guild_id, force=True) # type: ignore
+        guild = self.get_guild(guild_id) # type: ignore
         if consider_shard and self.is_sharded() \
                 and (guild_id >> 22) % getattr(self, "shard_count") \
                     in getattr(self, "shard_ids", ()) \
@@ -305,7 +420,7 @@ class RT(commands.Bot):
         self, guild: discord.Guild, id_: int, type_: str,
         type_for_fetch: str | None = None
     ) -> discord.Object | None:
-        obj = getattr(guild, f"get_{type_}")(id_, force=True)
+        obj = getattr(guild, f"get_{type_}")(id_)
         if obj is None:
             type_for_fetch = type_for_fetch or type_
             try:
@@ -328,7 +443,7 @@ class RT(commands.Bot):
 
     async def search_channel(self, channel_id: int) \
             -> discord.abc.GuildChannel | discord.Thread | discord.abc.PrivateChannel | None:
-        if (channel := self.get_channel(channel_id, force=True)) is None: # type: ignore
+        if (channel := self.get_channel(channel_id)) is None: # type: ignore
             channel = await self.fetch_channel(channel_id)
         return channel
 
@@ -344,6 +459,9 @@ class RT(commands.Bot):
         await self.rtws.close(reason="Closing bot")
         self.dispatch("close")
         self.after_queue.append(self.cachers.close)
+        self.joins.close()
+        self.cluster.close()
+        self.member_cache.close()
         self.pool.close()
 
     @property
@@ -360,7 +478,7 @@ class RT(commands.Bot):
         "データベースのテーブルのDiscordのIDの名前などから存在確認をして、存在しない場合は`True`を返します。"
         if type_ == "CategoryId":
             type_ = "ChannelId"
-        return (getattr(self, f"get_{type_.lower()[:-2]}")(data, force=True) is None) # type: ignore
+        return (getattr(self, f"get_{type_.lower()[:-2]}")(data) is None) # type: ignore
 
     async def clean(self, cursor: Cursor, table: str, type_: str, **kwargs) -> None:
         "データのお掃除をします。"
@@ -394,23 +512,25 @@ class RT(commands.Bot):
 
 
 # `get_...`を非推奨とする。
+# 呼び出し毎にフレームを調べるので重たく、本番では使わない。起動時の引数に`check_get`を入れた時のみ有効になる。
+# 普段は`rtutil.deprecation`で静的にチェックをする。
 def _check_frame(frame):
-    return frame is not None and "discord" not in frame.f_code.co_filename
+    return frame is not None and "discord" not in frame.f_code.co_filename \
+        and frame.f_code.co_filename != __file__
 def _mark_get_as_deprecated(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        if not kwargs.pop("force", False):
-            frame = currentframe()
-            if _check_frame(frame) or _check_frame(frame.f_back):
-                warn("This function is deprecated. Use a function that starts with search_... instead.", stacklevel=2)
+        if not kwargs.pop("force", False) and _check_frame(_getframe(1)):
+            warn("This function is deprecated. Use a function that starts with search_... instead.", stacklevel=2)
         return func(*args, **kwargs)
     return wrapper
 def _mark_all_get_method_as_deprecated(obj, ignore=()):
     for name in dir(obj):
         if name.startswith("get") and (not ignore or all(word not in name for word in ignore)):
             setattr(obj, name, _mark_get_as_deprecated(getattr(obj, name)))
-_mark_all_get_method_as_deprecated(RT, ignore=("prefix",))
-_mark_all_get_method_as_deprecated(discord.Guild, ignore=("role", "scheduled"))
+if CHECK_GET:
+    _mark_all_get_method_as_deprecated(RT, ignore=("prefix",))
+    _mark_all_get_method_as_deprecated(discord.Guild, ignore=("role", "scheduled"))
 
 
 # シャードが指定されいる場合はシャードBotに交換する。
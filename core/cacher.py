@@ -0,0 +1,308 @@
+# RT - Cacher
+
+from __future__ import annotations
+
+from typing import Generic, TypeVar, Any
+from collections.abc import Callable, Hashable, Iterator
+
+from asyncio import Task, get_running_loop, sleep
+from collections import OrderedDict
+from heapq import heappush, heappop, heapify
+from itertools import islice, count
+from time import time
+from sys import getsizeof
+
+
+__all__ = ("CacherPool", "IdCacher", "BoundedCacher", "Entry", "to_id", "estimate_size")
+
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+
+def to_id(key: Any) -> Hashable:
+    """キーにdiscord.pyのオブジェクト(`discord.Member`等)があれば、それをIDに変換します。
+    タプルの場合は中身を変換します。"""
+    if isinstance(key, tuple):
+        return tuple(map(to_id, key))
+    if isinstance(key, int | str):
+        return key
+    return getattr(key, "id", key)
+
+
+class IdCacher(Generic[ValueT]):
+    """キーをIDにしてから保存するキャッシュです。
+    `discord.Member`等のオブジェクトをキーとして渡せますが、保存されるのはIDだけです。
+    そのため、キャッシュの寿命の間、メンバーやサーバー等のオブジェクトをメモリに残してしまうことがありません。
+    `.keys`や`.items`で取り出されるキーはIDです。"""
+
+    __slots__ = ("cacher",)
+
+    def __init__(self, cacher: BoundedCacher[Any, ValueT]):
+        self.cacher = cacher
+
+    def __getitem__(self, key: Any) -> ValueT:
+        return self.cacher[to_id(key)]
+
+    def __setitem__(self, key: Any, value: ValueT) -> None:
+        self.cacher[to_id(key)] = value
+
+    def __delitem__(self, key: Any) -> None:
+        del self.cacher[to_id(key)]
+
+    def __contains__(self, key: Any) -> bool:
+        return to_id(key) in self.cacher
+
+    def __len__(self) -> int:
+        return len(self.cacher)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.cacher)
+
+    def get(self, key: Any, *args: Any, **kwargs: Any) -> Any:
+        return self.cacher.get(to_id(key), *args, **kwargs)
+
+    def get_raw(self, key: Any) -> Any:
+        return self.cacher.get_raw(to_id(key))
+
+    def set_deadline(self, key: Any, *args: Any, **kwargs: Any) -> Any:
+        return self.cacher.set_deadline(to_id(key), *args, **kwargs)
+
+    def merge_deadline(self, key: Any, *args: Any, **kwargs: Any) -> Any:
+        return self.cacher.merge_deadline(to_id(key), *args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # `.keys`や`.items`等のキーを受け取らないものはそのまま渡す。
+        return getattr(self.cacher, name)
+
+
+def estimate_size(obj: Any) -> int:
+    """オブジェクトのおおよそのメモリ使用量をバイトで返します。
+    辞書やリスト等は一段階だけ中身も数えます。"""
+    size = getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += getsizeof(key) + getsizeof(value)
+    elif isinstance(obj, list | tuple | set | frozenset):
+        for value in obj:
+            size += getsizeof(value)
+    return size
+
+
+class Entry(Generic[ValueT]):
+    "`BoundedCacher`の値と期限です。"
+
+    __slots__ = ("data", "deadline")
+
+    def __init__(self, data: ValueT, deadline: float):
+        self.data, self.deadline = data, deadline
+
+    def merge_deadline(self, seconds: float) -> None:
+        "期限を指定された秒数だけ伸ばします。"
+        self.deadline += seconds
+
+
+class BoundedCacher(Generic[KeyT, ValueT]):
+    """寿命に加えて、最大の個数を設定できるキャッシュです。
+    最大の個数を超えた場合は、最も長く使われていないものから消します。(LRU)
+    また、ヒットやミス、消した数等を数えます。`CacherPool.acquire`か`CacherPool.acquire_bounded`で作ってください。
+    期限切れは取り出す時にも調べるので、プールの掃除の間隔に関係なく期限切れのものは返しません。
+    期限は`(期限, 順番, キー)`のヒープで管理していて、掃除では期限が来たものだけを調べます。
+    期限が変わった時は古いものをヒープに残したまま新しいものを追加して、取り出した時に古いものは無視します。
+    `on_dead`は期限切れと最大の個数を超えて消された時にだけ呼ばれ、`del`で消した時は呼ばれません。"""
+
+    def __init__(
+        self, lifetime: float, default: Callable[[], ValueT] | None = None,
+        on_dead: Callable[[KeyT, ValueT], Any] | None = None,
+        max_size: int | None = None, name: str = ""
+    ):
+        self.lifetime, self.default, self.on_dead = lifetime, default, on_dead
+        self.max_size, self.name = max_size, name
+        self.data: OrderedDict[KeyT, Entry[ValueT]] = OrderedDict()
+        self.deadlines: list[tuple[float, int, KeyT]] = []
+        self._counter = count()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def _schedule(self, key: KeyT, deadline: float) -> None:
+        heappush(self.deadlines, (deadline, next(self._counter), key))
+        # 期限の変更が多いと古いものがヒープに溜まるので、溜まりすぎたら作り直す。
+        if len(self.deadlines) > 2 * len(self.data) + 64:
+            self.deadlines = [
+                (entry.deadline, next(self._counter), key)
+                for key, entry in self.data.items()
+            ]
+            heapify(self.deadlines)
+
+    def _kill(self, key: KeyT, entry: Entry[ValueT]) -> None:
+        if self.on_dead is not None:
+            self.on_dead(key, entry.data)
+
+    def _lookup(self, key: KeyT) -> Entry[ValueT] | None:
+        # 期限切れでない値を取り出して、最近使ったものとして後ろに移動させる。
+        if (entry := self.data.get(key)) is not None:
+            if entry.deadline <= time():
+                del self.data[key]
+                self.expirations += 1
+                self._kill(key, entry)
+            else:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return entry
+        self.misses += 1
+
+    def __contains__(self, key: KeyT) -> bool:
+        return self._lookup(key) is not None
+
+    def __getitem__(self, key: KeyT) -> ValueT:
+        if (entry := self._lookup(key)) is None:
+            if self.default is None:
+                raise KeyError(key)
+            self[key] = value = self.default()
+            return value
+        return entry.data
+
+    def get(self, key: KeyT, default: Any = None) -> Any:
+        return default if (entry := self._lookup(key)) is None else entry.data
+
+    def get_raw(self, key: KeyT) -> Entry[ValueT]:
+        if (entry := self._lookup(key)) is None:
+            raise KeyError(key)
+        return entry
+
+    def __setitem__(self, key: KeyT, value: ValueT) -> None:
+        deadline = time() + self.lifetime
+        if (entry := self.data.get(key)) is None:
+            self.data[key] = Entry(value, deadline)
+            self._schedule(key, deadline)
+            if self.max_size is not None and len(self.data) > self.max_size:
+                # 期限切れのものが残っていると、それより新しいものを消してしまうので先に掃除する。
+                self.clean()
+                if len(self.data) > self.max_size:
+                    old_key, old = self.data.popitem(last=False)
+                    self.evictions += 1
+                    self._kill(old_key, old)
+        else:
+            entry.data, entry.deadline = value, deadline
+            self.data.move_to_end(key)
+            self._schedule(key, deadline)
+
+    def __delitem__(self, key: KeyT) -> None:
+        del self.data[key]
+
+    def set_deadline(self, key: KeyT, deadline: float) -> None:
+        "期限を設定します。"
+        self.data[key].deadline = deadline
+        self._schedule(key, deadline)
+
+    def merge_deadline(self, key: KeyT, seconds: float | None = None) -> None:
+        "期限を指定された秒数だけ伸ばします。指定されなかった場合は寿命の分だけ伸ばします。"
+        (entry := self.data[key]).merge_deadline(self.lifetime if seconds is None else seconds)
+        self._schedule(key, entry.deadline)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[KeyT]:
+        return iter(self.keys())
+
+    def keys(self) -> list[KeyT]:
+        self.clean()
+        return list(self.data.keys())
+
+    def values(self) -> list[ValueT]:
+        self.clean()
+        return [entry.data for entry in self.data.values()]
+
+    def items(self) -> list[tuple[KeyT, ValueT]]:
+        self.clean()
+        return [(key, entry.data) for key, entry in self.data.items()]
+
+    def clean(self) -> None:
+        "期限切れのものを消します。"
+        now, deadlines = time(), self.deadlines
+        while deadlines and deadlines[0][0] <= now:
+            deadline, _, key = heappop(deadlines)
+            # 既に消されたものは無視する。期限が伸びたものは、`Entry.merge_deadline`で
+            # 伸ばされてヒープに入っていない場合があるので入れ直しておく。
+            if (entry := self.data.get(key)) is None:
+                continue
+            if entry.deadline > now:
+                self._schedule(key, entry.deadline)
+                continue
+            del self.data[key]
+            self.expirations += 1
+            self._kill(key, entry)
+
+    def estimate_size(self, sample: int = 64) -> int:
+        "おおよそのメモリ使用量をバイトで返します。最初の`sample`個の平均から見積もります。"
+        if not self.data:
+            return getsizeof(self.data)
+        sampled = sum(
+            getsizeof(key) + getsizeof(entry) + estimate_size(entry.data)
+            for key, entry in islice(self.data.items(), sample)
+        )
+        return getsizeof(self.data) + sampled * len(self.data) // min(sample, len(self.data))
+
+    def stats(self) -> dict[str, Any]:
+        "統計を辞書で返します。"
+        return {
+            "name": self.name, "size": len(self.data), "max_size": self.max_size,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "expirations": self.expirations, "bytes": self.estimate_size()
+        }
+
+
+class CacherPool:
+    """`BoundedCacher`を作って、期限切れのものを定期的に掃除するプールです。
+    `rtlib`の`CacherPool`は掃除の度に全てのキャッシュの全てのキーを調べるので、それは使わずにこちらで作ります。
+    `BoundedCacher`の掃除では期限が来たものだけを調べるので、キーが多くてもイベントループを長く止めません。"""
+
+    SWEEP_INTERVAL = 5.0
+    "期限切れのものを消す間隔です。"
+
+    def __init__(self):
+        self.cachers: list[BoundedCacher[Any, Any]] = []
+        self._sweeper: Task | None = None
+
+    def acquire(
+        self, lifetime: float, default: Callable[[], Any] | None = None,
+        on_dead: Callable[[Any, Any], Any] | None = None
+    ) -> BoundedCacher[Any, Any]:
+        "最大の個数を設定しない`BoundedCacher`を作ります。"
+        return self.acquire_bounded(lifetime, default, on_dead)
+
+    def acquire_by_id(self, *args: Any, **kwargs: Any) -> IdCacher[Any]:
+        "キーをIDにして保存する`IdCacher`を作ります。引数は`.acquire`と同じです。"
+        return IdCacher(self.acquire(*args, **kwargs))
+
+    def acquire_bounded(
+        self, lifetime: float, default: Callable[[], Any] | None = None,
+        on_dead: Callable[[Any, Any], Any] | None = None,
+        max_size: int | None = None, name: str | None = None
+    ) -> BoundedCacher[Any, Any]:
+        "最大の個数を設定できる`BoundedCacher`を作ります。"
+        cacher: BoundedCacher[Any, Any] = BoundedCacher(
+            lifetime, default, on_dead, max_size,
+            name or f"{lifetime}s#{len(self.cachers)}"
+        )
+        self.cachers.append(cacher)
+        return cacher
+
+    def sweep(self) -> None:
+        "全てのキャッシュの期限切れのものを消します。"
+        for cacher in self.cachers:
+            cacher.clean()
+
+    def start(self) -> None:
+        self._sweeper = get_running_loop().create_task(
+            self._sweep_loop(), name="RT.CacherPool.sweep"
+        )
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await sleep(self.SWEEP_INTERVAL)
+            self.sweep()
+
+    def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
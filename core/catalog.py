@@ -0,0 +1,91 @@
+# RT - Catalog
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+from collections.abc import Callable
+
+if TYPE_CHECKING:
+    from .types_ import Text
+
+
+__all__ = ("LANGUAGES", "CatalogText", "catalog")
+
+
+LANGUAGES = ("ja", "en")
+"RTが対応している言語のコードです。"
+INDEXES = {language: index for index, language in enumerate(LANGUAGES)}
+FALLBACK = len(LANGUAGES)
+"対応していない言語が指定された時に使う値の位置です。"
+
+
+def _resolve(text: Text, language: str | None) -> str:
+    # `core.utils.gettext`と同じ方法で取り出す。
+    last = "Translations not found..."
+    for key, value in text.items():
+        if key == language:
+            return value
+        last = value
+    return text.get("en") or text.get("ja") or last
+
+
+class CatalogText(dict):
+    """事前に言語毎の文字列を解決しておいたTextです。`catalog`で作ってください。
+    普通のTextと同じように使えますが、`t`や`gettext`では添字一つで文字列を取り出せます。
+    また、`str.format`が必要ない文字列は`format`を呼ばないようにしています。"""
+
+    __slots__ = ("table", "formatters")
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._build()
+
+    def _build(self) -> None:
+        self.table: tuple[str, ...] = tuple(
+            _resolve(self, language) for language in LANGUAGES
+        ) + (_resolve(self, None),)
+        self.formatters: tuple[Callable[..., str] | None, ...] = tuple(
+            value.format if "{" in value or "}" in value else None
+            for value in self.table
+        )
+
+    def __setitem__(self, key: str, value: str) -> None:
+        super().__setitem__(key, value)
+        self._build()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._build()
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self._build()
+
+    def get_text(self, language: str | None) -> str:
+        "指定された言語の文字列を取り出します。"
+        index = INDEXES.get(language, FALLBACK) # type: ignore
+        if index == FALLBACK and language in self:
+            return self[language]
+        return self.table[index]
+
+    def format_text(self, language: str | None, **kwargs: Any) -> str:
+        "指定された言語の文字列を取り出して、`str.format`を通します。"
+        index = INDEXES.get(language, FALLBACK) # type: ignore
+        if index == FALLBACK and language in self:
+            return self[language].format(**kwargs)
+        if (formatter := self.formatters[index]) is None:
+            return self.table[index]
+        return formatter(**kwargs)
+
+
+_interned: dict[tuple[tuple[str, str], ...], CatalogText] = {}
+def catalog(text: Text | None = None, **kwargs: str) -> CatalogText:
+    """渡されたTextを`CatalogText`にします。同じ内容のものは同じオブジェクトを返します。
+    モジュールの読み込み時に定数として作っておくことを想定しています。"""
+    if isinstance(text, CatalogText):
+        return text
+    text = dict(text or {}, **kwargs)
+    key = tuple(text.items())
+    if key not in _interned:
+        _interned[key] = CatalogText(text)
+    return _interned[key]
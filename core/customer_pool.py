@@ -4,11 +4,12 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from rtlib.common.cacher import Cacher
 from rtlib.common.reply_error import BadRequest
 
 from data import NOT_PAID
 
+from .cacher import BoundedCacher
+
 if TYPE_CHECKING:
     from .types_ import Text
     from .bot import RT
@@ -33,7 +34,11 @@ class CustomerPool:
 
     def __init__(self, bot: RT):
         self.bot = bot
-        self.caches: Cacher[int, bool] = self.bot.cachers.acquire(900.0)
+        self.caches: BoundedCacher[int, bool] = self.bot.cachers.acquire(900.0)
+        # 製品版の情報はバックエンドで書き込まれるので、そちらから`customer`の無効化が送られてきます。
+        self.bot.invalidations.subscribe(
+            "customer", lambda guild_id, _: self.remove_customer_cache(guild_id)
+        )
         self.bot.loop.create_task(self.prepare_table(), name="CreateCustomersTable")
 
     async def prepare_table(self) -> None:
@@ -14,6 +14,7 @@ from rtlib.common.utils import make_error_message, code_block, text_format
 from rtlib.common import reply_error
 
 from .utils import gettext
+from .catalog import CatalogText, catalog
 from .types_ import NameIdObj, MentionIdObj
 from .bot import RT
 from . import tdpocket
@@ -41,11 +42,8 @@ def _get_client(obj):
     return obj._state._get_client()
 
 
-def t(text: Text, ctx: Any, ignore_key_error: bool = False, **kwargs) -> str:
-    """Extracts strings in the correct language from a dictionary of language code keys and their corresponding strings, based on information such as the `ctx` guild passed in.
-    You can use keyword arguments to exchange strings like f-string."""
-    # Extract client
-    client: Optional[RT] = kwargs.pop("client", None)
+def _get_language(ctx: Any, client: Optional[RT]) -> str | None:
+    # `t`に渡された`ctx`から使う言語を決める。
     user, gu = False, False
     if isinstance(ctx, (discord.User, discord.Member, discord.Object)):
         client = _get_client(ctx) # type: ignore
@@ -60,38 +58,46 @@ def t(text: Text, ctx: Any, ignore_key_error: bool = False, **kwargs) -> str:
         client = _get_client(ctx.user)
     elif gu := isinstance(ctx, (discord.Guild, discord.User)):
         client = _get_client(ctx) # type: ignore
-    # Extract correct text
     if client is None:
-        text = gettext(text, "en") # type: ignore
-    elif isinstance(ctx, int):
-        text = gettext(text, client.language.user.get(ctx) # type: ignore
-            or client.language.guild.get(ctx))
-    else:
-        language = None
-        if user:
-            language = client.language.user.get(ctx.id)
-        else:
-            if getattr(ctx, "user", None):
-                language = client.language.user.get(ctx.user.id) # type: ignore
-            if language is None and getattr(ctx, "author", None):
-                language = client.language.user.get(ctx.author.id) # type: ignore
-            if language is None and getattr(ctx, "guild", None):
-                language = client.language.guild.get(ctx.guild.id) # type: ignore
-            if language is None and gu:
-                language = client.language.guild.get(ctx.id)
-            if language is None: language = "en"
-        text = gettext(text, "en") if language is None else gettext(text, language) # type: ignore
+        return "en"
+    if isinstance(ctx, int):
+        return client.language.user.get(ctx) or client.language.guild.get(ctx)
+    if user:
+        return client.language.user.get(ctx.id) or "en"
+    language = None
+    if getattr(ctx, "user", None):
+        language = client.language.user.get(ctx.user.id) # type: ignore
+    if language is None and getattr(ctx, "author", None):
+        language = client.language.user.get(ctx.author.id) # type: ignore
+    if language is None and getattr(ctx, "guild", None):
+        language = client.language.guild.get(ctx.guild.id) # type: ignore
+    if language is None and gu:
+        language = client.language.guild.get(ctx.id)
+    return language or "en"
+
+
+def t(text: Text, ctx: Any, ignore_key_error: bool = False, **kwargs) -> str:
+    """Extracts strings in the correct language from a dictionary of language code keys and their corresponding strings, based on information such as the `ctx` guild passed in.
+    You can use keyword arguments to exchange strings like f-string.
+    If `text` is made by `core.catalog.catalog`, the string is taken by index and formatting is skipped when it is not needed."""
+    language = _get_language(ctx, kwargs.pop("client", None))
     try:
-        return text.format(**kwargs) # type: ignore
+        if isinstance(text, CatalogText):
+            return text.format_text(language, **kwargs)
+        return gettext(text, language).format(**kwargs) # type: ignore
     except KeyError:
         if ignore_key_error:
-            return text # type: ignore
+            return gettext(text, language) # type: ignore
         else:
             raise
 tdpocket.t = t
 _set_t(t)
 
 
+WRONG_WAY = catalog(ja="使い方が違います。", en="This is wrong way to use this command.")
+WRONG_WAY_INDEX = catalog(ja="使用方法が違います。", en="It is wrong way to use this command.")
+
+
 UCReT = TypeVar("UCReT")
 PoP = ParamSpec("PoP")
 PoT = TypeVar("PoT")
@@ -112,9 +118,7 @@ class Cog(commands.Cog):
     HelpCommand: type[HelpCommand]
     Embed = Embed
     ERRORS = {
-        "WRONG_WAY": lambda ctx: t(dict(
-            ja="使い方が違います。", en="This is wrong way to use this command."
-        ), ctx)
+        "WRONG_WAY": lambda ctx: t(WRONG_WAY, ctx)
     }
     t = staticmethod(t)
     EventContext: type[EventContext]
@@ -123,9 +127,7 @@ class Cog(commands.Cog):
     async def group_index(self, ctx: commands.Context) -> None:
         "グループコマンドが実行された際に「使用方法が違います」と返信します。"
         if not ctx.invoked_subcommand:
-            await ctx.reply(t({
-                "ja": "使用方法が違います。", "en": "It is wrong way to use this command."
-            }, ctx))
+            await ctx.reply(t(WRONG_WAY_INDEX, ctx))
 
     @staticmethod
     def mention_and_id(obj: MentionIdObj) -> str:
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING, TypeVar, TypeAlias, Literal, Optional
-from collections.abc import Iterator
+from collections.abc import Iterator, Iterable
 
 from collections import defaultdict
 from itertools import chain
@@ -28,7 +28,7 @@ if TYPE_CHECKING:
     from .rtevent import EventContext
 
 
-__all__ = ("Help", "HelpCore", "CONV", "ANNOTATIONS", "OPTIONS", "EXTRAS", "COMMAND_TYPES")
+__all__ = ("Help", "HelpCore", "HelpIndex", "CONV", "ANNOTATIONS", "OPTIONS", "EXTRAS", "COMMAND_TYPES")
 
 
 CONV = {"ja": "のメンションか名前またはID", "en": " mention, name or id"}
@@ -287,11 +287,108 @@ Cog.Help = Help
 Cog.HelpCommand = HelpCommand
 
 
+def _ngrams(text: str, n: int) -> Iterator[str]:
+    return (text[i:i + n] for i in range(max(len(text) - n + 1, 1)))
+
+
+class HelpIndex:
+    """ヘルプの検索用の索引です。`HelpCore.load`の度に作り直されます。
+    カテゴリー名とコマンド名、エイリアスの接頭辞の表と、それらと全言語の見出しのN-gramの転置索引を持ちます。
+    名前の接頭辞一致、部分一致、見出し等とのあいまい一致の順に並べて検索結果を返します。"""
+
+    SHORT = 2
+    "この文字数以下の検索語は、名前の一文字または二文字の組で探します。"
+    FUZZY = 0.5
+    "あいまい一致とする、検索語のトライグラムが一致している割合の下限です。"
+
+    def __init__(self, data: dict[str, dict[str, Help]]):
+        self.entries: list[tuple[str, str | None]] = []
+        "索引の項目です。`(カテゴリー名, コマンド名)`で、カテゴリーの項目のコマンド名は`None`です。"
+        self.names: list[str] = []
+        self.prefixes: defaultdict[str, list[int]] = defaultdict(list)
+        self.grams: defaultdict[str, set[int]] = defaultdict(set)
+        self.exact: dict[str, int] = {}
+
+        for category, helps in data.items():
+            self._add(category, None, category, (), ())
+            for name, help_ in helps.items():
+                self._add(
+                    category, name, name, getattr(
+                        getattr(help_, "command", None), "aliases", ()
+                    ), help_.headline.values()
+                )
+        self.default = range(len(self.entries))
+
+    def _add(
+        self, category: str, command: str | None, name: str,
+        aliases: Iterable[str], headlines: Iterable[str]
+    ) -> None:
+        index = len(self.entries)
+        self.entries.append((category, command))
+        self.names.append(name.lower())
+        self.exact.setdefault(name, index)
+        for word in {name.lower(), *map(str.lower, aliases)}:
+            for i in range(1, len(word) + 1):
+                self.prefixes[word[:i]].append(index)
+            for n in range(1, self.SHORT + 1):
+                for gram in _ngrams(word, n):
+                    self.grams[gram].add(index)
+            for gram in _ngrams(word, 3):
+                self.grams[gram].add(index)
+        for headline in headlines:
+            for gram in _ngrams(headline.lower(), 3):
+                self.grams[gram].add(index)
+
+    def get(self, word: str) -> tuple[str, str | None] | None:
+        "名前が完全に一致する項目を取得します。"
+        if (index := self.exact.get(word)) is not None:
+            return self.entries[index]
+
+    def contains(self, word: str) -> list[tuple[str, str | None]]:
+        "名前に検索語が含まれている項目を取得します。"
+        if not (word := word.lower()):
+            return []
+        grams = set(_ngrams(word, min(len(word), 3)))
+        candidates = set.intersection(*(self.grams.get(gram, set()) for gram in grams))
+        return [self.entries[i] for i in sorted(candidates) if word in self.names[i]]
+
+    def search(self, word: str, limit: int = 25) -> list[tuple[str, str | None]]:
+        "検索語に合う項目を、合っている順に`limit`個まで取得します。"
+        word = word.lower()
+        if not word:
+            return [self.entries[i] for i in self.default[:limit]]
+        scores: dict[int, float] = {}
+        for index in self.prefixes.get(word, ()):
+            scores[index] = 4 if self.names[index] == word else 3
+        if len(word) <= self.SHORT:
+            for index in self.grams.get(word, ()):
+                scores.setdefault(index, 2)
+        else:
+            hits: defaultdict[int, int] = defaultdict(int)
+            grams = set(_ngrams(word, 3))
+            for gram in grams:
+                for index in self.grams.get(gram, ()):
+                    hits[index] += 1
+            for index, hit in hits.items():
+                if index in scores:
+                    continue
+                if word in self.names[index]:
+                    scores[index] = 2
+                elif (rate := hit / len(grams)) >= self.FUZZY:
+                    scores[index] = rate
+        return [
+            self.entries[index] for index, _ in sorted(
+                scores.items(), key=lambda x: (-x[1], self.names[x[0]])
+            )[:limit]
+        ]
+
+
 class HelpCore(Cog):
     def __init__(self, bot: RT):
         self.bot = bot
         self.bot.help_ = self
         self.data: defaultdict[str, dict[str, Help]] = defaultdict(dict)
+        self.index = HelpIndex(self.data)
 
     @commands.Cog.listener()
     async def on_load(self):
@@ -335,6 +432,7 @@ class HelpCore(Cog):
                         self.data["Other"][command.name].add_sub(
                             self.make_other_command_help(target)
                         )
+        self.index = HelpIndex(self.data)
         self.bot.dispatch("help_load")
 
 
@@ -0,0 +1,91 @@
+# RT - Invalidation
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+from collections.abc import Callable
+
+from collections import defaultdict
+from inspect import isawaitable
+
+if TYPE_CHECKING:
+    from .cacher import BoundedCacher
+    from .bot import RT
+
+
+__all__ = ("InvalidationBus", "Subscriber")
+
+
+Subscriber = Callable[[Any, Any], Any]
+"購読する関数です。`(キー, データ)`が渡されます。コルーチン関数でも良いです。"
+
+
+class InvalidationBus:
+    """シャードやプロセスを跨いでキャッシュの無効化を伝えるためのクラスです。
+    データの書き込みをした時に`.publish`でトピックとキーを送ると、他のプロセスの購読している関数が呼ばれます。
+    また、`on_invalidate_<トピック>`のイベントが`(キー, データ)`で呼ばれるので、コグではリスナーで受け取れます。
+    送られてきたキーをキャッシュから消すだけの場合は、リスナーを書かずに`.watch_cacher`を使ってください。
+    rtws (ipcs) で繋がっている他のクライアントに送り、rtwsが繋がっていない時は`cluster.py`の制御用ソケットを使います。"""
+
+    ROUTE = "invalidate"
+
+    def __init__(self, bot: RT):
+        self.bot = bot
+        self.subscribers: defaultdict[str, list[Subscriber]] = defaultdict(list)
+        self.bot.rtws.set_route(self._on_route, self.ROUTE)
+        self.bot.add_listener(self._on_cluster, "on_cluster_invalidate")
+
+    def subscribe(self, topic: str, subscriber: Subscriber) -> Subscriber:
+        "トピックを購読します。"
+        self.subscribers[topic].append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, topic: str, subscriber: Subscriber) -> None:
+        "トピックの購読を解除します。"
+        if subscriber in self.subscribers[topic]:
+            self.subscribers[topic].remove(subscriber)
+
+    def watch_cacher(self, topic: str, *cachers: BoundedCacher) -> Subscriber:
+        """トピックに送られてきたキーを、渡されたキャッシュから消すように購読します。
+        購読した関数を返すので、コグの`cog_unload`では`.unsubscribe`に渡して購読を解除してください。"""
+        def subscriber(key: Any, _):
+            for cacher in cachers:
+                if key in cacher:
+                    del cacher[key]
+        return self.subscribe(topic, subscriber)
+
+    def publish(self, topic: str, key: Any, data: Any = None) -> None:
+        """他のプロセスにキャッシュの無効化を伝えます。
+        キーとデータはJSONにできるものにしてください。タプルはリストとして送られ、受け取る時にタプルに戻されます。"""
+        if self.bot.rtws.ready.is_set():
+            for id_, connection in list(self.bot.rtws.connections.items()):
+                if id_ not in ("__IPCS_SERVER__", self.bot.rtws_id):
+                    self.bot.loop.create_task(self._send(
+                        connection, topic, key, data
+                    ), name="RT.InvalidationBus.publish")
+        else:
+            self.bot.cluster.broadcast("invalidate", (topic, key, data))
+
+    async def _send(self, connection: Any, topic: str, key: Any, data: Any) -> None:
+        try:
+            await connection.request(self.ROUTE, topic, key, data)
+        except Exception as e:
+            self.bot.logger.warning("Failed to publish invalidation (%s): %s", topic, e)
+
+    async def _on_route(self, _, topic: str, key: Any, data: Any) -> None:
+        await self.receive(topic, key, data)
+
+    async def _on_cluster(self, message: list[Any]) -> None:
+        await self.receive(*message)
+
+    async def receive(self, topic: str, key: Any, data: Any = None) -> None:
+        "無効化を受け取って、購読している関数を呼び出します。"
+        if isinstance(key, list):
+            key = tuple(key)
+        self.bot.dispatch(f"invalidate_{topic}", key, data)
+        for subscriber in list(self.subscribers.get(topic, ())):
+            try:
+                if isawaitable(result := subscriber(key, data)):
+                    await result
+            except Exception as e:
+                self.bot.logger.warning("Ignoring error in invalidation subscriber (%s): %s", topic, e)
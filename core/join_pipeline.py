@@ -0,0 +1,199 @@
+# RT - Join Pipeline
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, TypeAlias, NamedTuple, Any
+from collections.abc import Callable, Awaitable
+
+from asyncio import TimerHandle, Task, gather, sleep
+from collections import deque
+from time import monotonic
+
+import discord
+
+if TYPE_CHECKING:
+    from .bot import RT
+
+
+__all__ = ("JoinPipeline", "ActionQueue", "JoinHandler", "make_placeholders")
+
+
+JoinHandler: TypeAlias = Callable[[list[discord.Member]], Awaitable[Any]]
+Action: TypeAlias = Callable[[], Awaitable[Any]]
+
+
+def make_placeholders(count: int, width: int = 1) -> str:
+    """SQLの`IN (...)`の中に入れるプレースホルダーを作ります。
+    `width`が二以上の場合は`(%s, %s), (%s, %s)`のように組のプレースホルダーを作ります。"""
+    one = "%s" if width == 1 else "({})".format(", ".join("%s" for _ in range(width)))
+    return ", ".join(one for _ in range(count))
+
+
+class _GuildActions:
+    "一つのサーバーの実行待ちの処理です。"
+
+    __slots__ = ("priority", "normal", "ready_at")
+
+    def __init__(self, max_pending: int):
+        self.priority: deque[Action] = deque()
+        self.normal: deque[Action] = deque(maxlen=max_pending)
+        self.ready_at = 0.0
+
+    def __bool__(self) -> bool:
+        return bool(self.priority or self.normal)
+
+
+class ActionQueue:
+    """メッセージの送信やBAN等の外向きの処理を、一秒あたりの実行回数を制限して順番に実行するためのキューです。
+    大量の参加があった際に、一度にDiscordへリクエストが飛ばないようにするためのものです。
+    キューはサーバー毎にあり、全体で`rate`回/秒、一つのサーバーで`guild_rate`回/秒を超えないように実行します。
+    実行できるサーバーが複数ある場合は順番に一つずつ実行するので、一つのサーバーに参加が殺到しても他のサーバーは待たされません。
+    また、`priority`を付けて追加した処理(BAN等)は、どのサーバーでも優先して実行します。
+    優先しない処理はサーバー毎に`max_pending`個まで貯めて、超えたら古いものから捨てます。"""
+
+    def __init__(
+        self, bot: RT, rate: float = 25.0,
+        guild_rate: float = 5.0, max_pending: int = 500
+    ):
+        self.bot, self.rate, self.guild_rate = bot, rate, guild_rate
+        self.max_pending = max_pending
+        self.guilds: dict[int, _GuildActions] = {}
+        self.running: set[Task] = set()
+        self.dropped = 0
+        self._task: Task | None = None
+
+    def put(self, guild_id: int, action: Action, priority: bool = False) -> None:
+        "処理を追加します。"
+        if (actions := self.guilds.get(guild_id)) is None:
+            actions = self.guilds[guild_id] = _GuildActions(self.max_pending)
+        if priority:
+            actions.priority.append(action)
+        else:
+            if len(actions.normal) == self.max_pending:
+                self.dropped += 1
+                if self.dropped % 100 == 1:
+                    self.bot.logger.warning(
+                        "Dropped actions in action queue because guild %s has too many pending actions. (total: %s)",
+                        guild_id, self.dropped
+                    )
+            actions.normal.append(action)
+        if self._task is None or self._task.done():
+            self._task = self.bot.loop.create_task(self._work(), name="RT.ActionQueue")
+
+    async def _run(self, action: Action) -> None:
+        try:
+            await action()
+        except Exception as e:
+            self.bot.logger.warning("Ignoring error in action queue: %s", e)
+
+    def _next(self, now: float) -> Action | float:
+        # 実行できるサーバーの中から、優先する処理があるものを先に、なければ一番前のものを選ぶ。
+        # 実行できるサーバーがない場合は、一番早く実行できるようになる時間を返す。
+        chosen = None
+        for guild_id, actions in self.guilds.items():
+            if actions.ready_at <= now:
+                if actions.priority:
+                    chosen = guild_id
+                    break
+                if chosen is None:
+                    chosen = guild_id
+        if chosen is None:
+            return min(actions.ready_at for actions in self.guilds.values())
+        # 選ばれたサーバーは後ろに回して、次は他のサーバーが選ばれるようにする。
+        actions = self.guilds.pop(chosen)
+        action = actions.priority.popleft() if actions.priority else actions.normal.popleft()
+        if actions:
+            actions.ready_at = now + 1 / self.guild_rate
+            self.guilds[chosen] = actions
+        return action
+
+    async def _work(self) -> None:
+        while self.guilds:
+            now = monotonic()
+            if isinstance(action := self._next(now), float):
+                await sleep(action - now)
+                continue
+            task = self.bot.loop.create_task(self._run(action), name="RT.ActionQueue.run")
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+            await sleep(1 / self.rate)
+
+    def close(self) -> None:
+        "キューを空にして、実行を止めます。"
+        self.guilds.clear()
+        if self._task is not None:
+            self._task.cancel()
+        for task in self.running:
+            task.cancel()
+
+
+class _Handler(NamedTuple):
+    function: JoinHandler
+    cooldown: bool
+
+
+class JoinPipeline:
+    """メンバーの参加を少しの間貯めてから、登録された機能毎にまとめて処理をするためのクラスです。
+    各機能はまとめて渡されたメンバーのリストに対して`WHERE ... IN (...)`で一括でデータを取得して、
+    送信等の処理は`.actions`に入れることで、大量の参加時でもクエリ数がまとめた回数に比例するようにします。
+    メンバーは`ExtEvents`から`.put`で追加されます。"""
+
+    WINDOW = 0.5
+    "参加を貯める秒数です。"
+    MAX_BATCH = 500
+    "一度にまとめる最大の参加数です。"
+
+    def __init__(self, bot: RT):
+        self.bot = bot
+        self.handlers: dict[str, _Handler] = {}
+        self.actions = ActionQueue(bot)
+        self.members: list[tuple[discord.Member, bool]] = []
+        self._timer: TimerHandle | None = None
+
+    def register(self, name: str, function: JoinHandler, cooldown: bool = False) -> None:
+        """参加時の処理を登録します。
+        `cooldown`が`True`の場合は、`on_member_join_cooldown`と同じように短時間に何度も参加と退出を繰り返したメンバーは渡されません。"""
+        self.handlers[name] = _Handler(function, cooldown)
+
+    def unregister(self, name: str) -> None:
+        "参加時の処理の登録を解除します。"
+        self.handlers.pop(name, None)
+
+    def put(self, member: discord.Member, cooldown: bool = True) -> None:
+        "参加したメンバーを追加します。`cooldown`はクールダウンを通過したかどうかです。"
+        self.members.append((member, cooldown))
+        if len(self.members) >= self.MAX_BATCH:
+            self.flush()
+        elif self._timer is None:
+            self._timer = self.bot.loop.call_later(self.WINDOW, self.flush)
+
+    def flush(self) -> None:
+        "貯めた参加を処理します。"
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.members:
+            members, self.members = self.members, []
+            self.bot.loop.create_task(self._process(members), name="RT.JoinPipeline")
+
+    async def _run(self, name: str, handler: _Handler, members: list[discord.Member]) -> None:
+        try:
+            await handler.function(members)
+        except Exception as e:
+            self.bot.logger.warning("Ignoring error in join pipeline (%s): %s", name, e)
+
+    async def _process(self, members: list[tuple[discord.Member, bool]]) -> None:
+        all_ = [member for member, _ in members]
+        passed = [member for member, cooldown in members if cooldown]
+        await gather(*(
+            self._run(name, handler, passed if handler.cooldown else all_)
+            for name, handler in list(self.handlers.items())
+            if not handler.cooldown or passed
+        ))
+
+    def close(self) -> None:
+        "お片付けをします。"
+        if self._timer is not None:
+            self._timer.cancel()
+        self.members.clear()
+        self.actions.close()
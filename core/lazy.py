@@ -0,0 +1,49 @@
+# RT - Lazy
+
+from __future__ import annotations
+
+from typing import Any
+
+from importlib import import_module
+from types import ModuleType
+from sys import modules
+
+
+__all__ = ("LazyModule", "lazy_import")
+
+
+class LazyModule(ModuleType):
+    """最初に属性にアクセスされた時に本当のインポートを行うモジュールの代わりです。
+    使われない機能のために重たいライブラリを起動時に読み込まないようにするためのものです。
+    `lazy_import`で作ってください。"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        if (module := self.__dict__["_lazy_module"]) is None:
+            module = self.__dict__["_lazy_module"] = import_module(self.__name__)
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        "本当のインポートが行われたかどうかです。"
+        return self.__dict__["_lazy_module"] is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        return f"<LazyModule name={self.__name__!r} loaded={self.is_loaded}>"
+
+
+def lazy_import(name: str) -> Any:
+    """遅延してインポートするモジュールを取得します。
+    既にインポートされている場合は、そのモジュールをそのまま返します。
+    `from x import y`の代わりに使う場合は、`x = lazy_import("x")`として`x.y`のように使ってください。
+    型ヒントのためのインポートは`TYPE_CHECKING`の中で行ってください。"""
+    return modules[name] if name in modules else LazyModule(name)
@@ -0,0 +1,187 @@
+# RT - Loader
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from collections.abc import Iterator, Iterable, Sequence
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import defaultdict
+from time import perf_counter
+from os.path import isdir, exists
+from os import listdir
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ModuleSpec
+from types import ModuleType
+import ast
+import sys
+
+from asyncio import Event, gather
+
+if TYPE_CHECKING:
+    from .bot import RT
+
+
+__all__ = ("StartupProfiler", "ImportTimer", "ExtensionLoader", "find_extensions", "read_depends", "loading")
+
+
+loading: ContextVar[str | None] = ContextVar("loading", default=None)
+"今読み込んでいるエクステンションの名前です。"
+
+
+class StartupProfiler:
+    """起動時の各段階にかかった時間を記録するためのクラスです。
+    `measure`で囲んだ処理の時間を、段階と名前毎に記録します。"""
+
+    def __init__(self):
+        self.records: defaultdict[str, dict[str, float]] = defaultdict(dict)
+
+    @contextmanager
+    def measure(self, phase: str, name: str = "all") -> Iterator[None]:
+        "囲んだ処理の時間を記録します。"
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, name, perf_counter() - start)
+
+    def add(self, phase: str, name: str, seconds: float) -> None:
+        "時間を記録します。同じ段階と名前のものがある場合は足します。"
+        self.records[phase][name] = self.records[phase].get(name, 0.0) + seconds
+
+    def total(self, phase: str) -> float:
+        "段階の合計の時間を取得します。"
+        return sum(self.records[phase].values())
+
+    def report(self, top: int = 3) -> str:
+        "記録を文字列にします。段階毎に合計と、時間がかかった上位`top`個の名前を載せます。"
+        return "\n".join(
+            "{}: {:.3f}s{}".format(phase, self.total(phase), "".join(
+                f"\n\t{name}: {seconds:.3f}s" for name, seconds in sorted(
+                    records.items(), key=lambda x: x[1], reverse=True
+                )[:top]
+            ) if len(records) > 1 else "")
+            for phase, records in self.records.items()
+        )
+
+
+class ImportTimer(MetaPathFinder):
+    """読み込み中のエクステンションのモジュールの実行にかかった時間を、`import`の段階として記録するためのものです。
+    `sys.meta_path`の先頭に入れておくと、`loading`に設定されている名前のモジュールの実行だけを計ります。
+    エクステンションは並行して読み込まれますが、モジュールの実行は同期的なので、他の読み込みの時間は混ざりません。"""
+
+    def __init__(self, profiler: StartupProfiler):
+        self.profiler = profiler
+
+    def find_spec(
+        self, fullname: str, path: Sequence[str] | None,
+        target: ModuleType | None = None
+    ) -> ModuleSpec | None:
+        if fullname != loading.get():
+            return None
+        for finder in sys.meta_path:
+            if finder is self or (find_spec := getattr(finder, "find_spec", None)) is None:
+                continue
+            if (spec := find_spec(fullname, path, target)) is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            original = spec.loader.exec_module
+            def exec_module(module: ModuleType) -> None:
+                start = perf_counter()
+                try:
+                    original(module)
+                finally:
+                    self.profiler.add("import", fullname, perf_counter() - start)
+            spec.loader.exec_module = exec_module # type: ignore
+        return spec
+
+
+def read_depends(path: str) -> tuple[str, ...]:
+    """エクステンションのファイルから`__depends__`を読み込みます。
+    インポートせずに読むため、`__depends__`はタプルかリストのリテラルで書いてください。"""
+    if isdir(path):
+        path = f"{path}/__init__.py"
+    if not exists(path):
+        return ()
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "__depends__"
+            for target in node.targets
+        ):
+            return tuple(ast.literal_eval(node.value))
+    return ()
+
+
+def to_name(path: str) -> str:
+    "パスをエクステンションの名前にします。"
+    return path.replace("/", ".").replace(".py", "")
+
+
+def find_extensions(root: str = "cogs") -> Iterator[str]:
+    "エクステンションとして読み込むパスを探します。"
+    for path in listdir(root):
+        path = f"{root}/{path}"
+        if isdir(path):
+            for deep in listdir(path):
+                yield f"{path}/{deep}"
+        else:
+            yield path
+
+
+class ExtensionLoader:
+    """エクステンションを並行して読み込むためのクラスです。
+    各エクステンションは`__depends__`に書かれたエクステンションの読み込みが終わるまで待ってから読み込まれます。
+    何も書かれていないものは同時に読み込まれるので、`cog_load`でのテーブルの準備等が並行して行われます。"""
+
+    def __init__(self, bot: RT):
+        self.bot = bot
+
+    @staticmethod
+    def check_cycle(depends: dict[str, tuple[str, ...]]) -> None:
+        "依存関係が循環していないかを調べます。循環している場合は`ValueError`を発生させます。"
+        state: dict[str, bool] = {}
+        def visit(name: str, stack: tuple[str, ...]) -> None:
+            if state.get(name) is False:
+                raise ValueError("Circular extension dependency: %s" % " -> ".join(stack + (name,)))
+            if name in state:
+                return
+            state[name] = False
+            for depend in depends.get(name, ()):
+                visit(depend, stack + (name,))
+            state[name] = True
+        for name in depends:
+            visit(name, ())
+
+    async def _load(
+        self, path: str, depends: tuple[str, ...],
+        events: dict[str, Event]
+    ) -> None:
+        name = to_name(path)
+        try:
+            for depend in depends:
+                if depend in events:
+                    await events[depend].wait()
+            loading.set(name)
+            with self.bot.profiler.measure("extensions", name):
+                await self.bot._load(path)
+        finally:
+            events[name].set()
+
+    async def load(self, paths: Iterable[str]) -> None:
+        "渡されたパスのエクステンションを読み込みます。"
+        depends = {path: read_depends(path) for path in paths}
+        self.check_cycle({to_name(path): value for path, value in depends.items()})
+        events = {to_name(path): Event() for path in depends}
+        sys.meta_path.insert(0, timer := ImportTimer(self.bot.profiler))
+        try:
+            await gather(*(
+                self._load(path, value, events)
+                for path, value in depends.items()
+            ))
+        finally:
+            sys.meta_path.remove(timer)
@@ -196,13 +196,16 @@ class LogCore(Cog):
     def __init__(self, bot: RT):
         self.bot, self.data = bot, DataManager(bot.pool)
         self.bot.log = self
-        self.bot.rtevent.set(self.on_dispatch)
+        # 全てのイベントで呼ばれるので、イベント毎のタスクを増やさないように`inline`にする。
+        self.bot.rtevent.set(self.on_dispatch, inline=True)
 
     async def cog_load(self):
         await self.data.prepare_table()
 
     async def on_dispatch(self, ctx: Cog.EventContext):
         # RTイベントで`log`が`True`のContextが引数にある場合は、ログに流す。
+        if not ctx.log:
+            return
         assert ctx.target is not None
         await self.__call__(LogData.quick_make(
             ctx.feature, ctx.status, ctx.target, ctx.detail
@@ -0,0 +1,108 @@
+# RT - Member Cache
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, TypedDict, Any
+from collections.abc import Sequence
+
+from asyncio import Lock, Task, sleep
+from time import monotonic
+
+import discord
+
+if TYPE_CHECKING:
+    from .bot import RT
+
+
+__all__ = ("MemberCacheConfig", "MemberCache", "make_member_cache_kwargs")
+
+
+class MemberCacheConfig(TypedDict, total=False):
+    joined: bool
+    voice: bool
+    chunk_at_startup: bool
+    idle: float
+
+
+def make_member_cache_kwargs(config: MemberCacheConfig | None) -> dict[str, Any]:
+    """`data.toml`の`[member_cache]`の設定から、Botに渡すメンバーのキャッシュの設定を作ります。
+    設定がない場合は、discord.pyのデフォルトの全てのメンバーをキャッシュする設定のままにします。
+    `joined`はデフォルトで有効にします。無効にすると、参加したメンバーの退出や更新のイベントも来なくなるためです。"""
+    if config is None:
+        return {}
+    return {
+        "member_cache_flags": discord.MemberCacheFlags(
+            joined=config.get("joined", True), voice=config.get("voice", True)
+        ),
+        "chunk_guilds_at_startup": config.get("chunk_at_startup", False)
+    }
+
+
+class MemberCache:
+    """サーバーの全メンバーが必要な機能のために、必要になった時にサーバーのメンバーを取得(チャンク)するためのクラスです。
+    取得したメンバーは、`idle`秒使われなかったらキャッシュから消します。
+    キャッシュにないメンバーのイベントは来ないので、メンバーのイベントが常に必要なサーバーは`keep`を指定して取得してください。
+    起動時に全てのサーバーをチャンクする設定の場合は何もしません。"""
+
+    INTERVAL = 300.0
+    "使われていないサーバーのメンバーを消す処理をする間隔です。"
+
+    def __init__(self, bot: RT, config: MemberCacheConfig | None):
+        self.bot = bot
+        self.enabled = config is not None and not config.get("chunk_at_startup", False)
+        self.idle = (config or {}).get("idle", 1800.0)
+        self.used: dict[int, float] = {}
+        "チャンクしたサーバーのIDと最後に使われた時間です。"
+        self.kept: set[int] = set()
+        "メンバーをキャッシュから消さないサーバーのIDです。"
+        self._locks: dict[int, Lock] = {}
+        self._task: Task | None = None
+
+    def start(self) -> None:
+        "使われていないサーバーのメンバーを消す処理を始めます。"
+        if self.enabled and self._task is None:
+            self._task = self.bot.loop.create_task(self._evict_loop(), name="RT.MemberCache")
+
+    async def fetch(self, guild: discord.Guild, keep: bool = False) -> Sequence[discord.Member]:
+        """サーバーの全メンバーを取得します。チャンクされていない場合はチャンクします。
+        `keep`を`True`にした場合は、`.release`されるまでそのサーバーのメンバーをキャッシュから消しません。"""
+        if not self.enabled:
+            return guild.members
+        self.used[guild.id] = monotonic()
+        if keep:
+            self.kept.add(guild.id)
+        if not guild.chunked:
+            lock = self._locks.setdefault(guild.id, Lock())
+            async with lock:
+                if not guild.chunked:
+                    await guild.chunk(cache=True)
+            self._locks.pop(guild.id, None)
+        return guild.members
+
+    def release(self, guild_id: int) -> None:
+        "`keep`を指定して取得したサーバーのメンバーを、また使われなかったら消すようにします。"
+        self.kept.discard(guild_id)
+
+    def evict(self, guild: discord.Guild) -> None:
+        "サーバーのメンバーのキャッシュを、Bot自身とボイスチャンネルにいるメンバー以外消します。"
+        self.used.pop(guild.id, None)
+        # discord.pyにはキャッシュからメンバーを消す公開された方法がないため、内部のものを使う。
+        for member in list(guild._members.values()):
+            if member.id != self.bot.user.id and member.voice is None: # type: ignore
+                guild._remove_member(member)
+
+    async def _evict_loop(self) -> None:
+        while not self.bot.is_closed():
+            await sleep(self.INTERVAL)
+            now = monotonic()
+            for guild_id, used in list(self.used.items()):
+                if guild_id not in self.kept and now - used > self.idle:
+                    if (guild := self.bot.get_guild(guild_id)) is None: # allow-get
+                        self.used.pop(guild_id, None)
+                    else:
+                        self.evict(guild)
+
+    def close(self) -> None:
+        "お片付けをします。"
+        if self._task is not None:
+            self._task.cancel()
@@ -0,0 +1,170 @@
+# RT - Relay
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from collections.abc import AsyncIterator, Sequence
+
+from asyncio import Condition
+from contextlib import asynccontextmanager
+from tempfile import SpooledTemporaryFile
+from threading import Lock
+from io import RawIOBase, SEEK_SET, SEEK_CUR, SEEK_END
+
+from aiohttp import ClientError
+import discord
+
+if TYPE_CHECKING:
+    from .bot import RT
+
+
+__all__ = ("AttachmentRelay", "RelayedAttachment", "RelayedAttachments")
+
+
+class _Reader(RawIOBase):
+    "一つの一時ファイルを、読み込み位置を共有せずに複数の`discord.File`から読めるようにするためのものです。"
+
+    def __init__(self, attachment: RelayedAttachment):
+        self.attachment, self.position = attachment, 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        if whence == SEEK_CUR:
+            offset += self.position
+        elif whence == SEEK_END:
+            offset += self.attachment.size
+        self.position = max(offset, 0)
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        # aiohttpはエグゼキューターで読み込むことがあるので、ロックをかけて位置がずれないようにする。
+        with self.attachment.lock:
+            self.attachment.file.seek(self.position)
+            data = self.attachment.file.read(len(buffer))
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+class RelayedAttachment:
+    "一度だけダウンロードした添付ファイルです。"
+
+    def __init__(self, attachment: discord.Attachment, spool_size: int):
+        self.filename, self.description = attachment.filename, attachment.description
+        self.spoiler, self.size = attachment.is_spoiler(), 0
+        self.file = SpooledTemporaryFile(spool_size)
+        self.lock = Lock()
+
+    def write(self, data: bytes) -> None:
+        "ダウンロードしたデータを書き込みます。"
+        with self.lock:
+            self.file.write(data)
+        self.size += len(data)
+
+    def to_file(self, *, spoiler: bool = False) -> discord.File:
+        "送信用の`discord.File`を作ります。何回でも作れます。"
+        return discord.File(
+            _Reader(self), self.filename, description=self.description,
+            spoiler=spoiler or self.spoiler
+        )
+
+
+class RelayedAttachments(list[RelayedAttachment]):
+    """ダウンロードした添付ファイルのリストです。
+    大きすぎたりダウンロードに失敗したりして除かれた添付ファイルの数は`skipped`に入ります。"""
+
+    skipped = 0
+
+    @property
+    def complete(self) -> bool:
+        "全ての添付ファイルをダウンロードできたかどうかです。"
+        return not self.skipped
+
+    def to_files(
+        self, guild: discord.Guild | None = None, *, spoiler: bool = False
+    ) -> list[discord.File]:
+        """送信用の`discord.File`のリストを作ります。
+        サーバーが渡された場合は、そのサーバーに送れない大きさのものを除きます。"""
+        return [
+            attachment.to_file(spoiler=spoiler) for attachment in self
+            if guild is None or attachment.size <= guild.filesize_limit
+        ]
+
+
+class AttachmentRelay:
+    """添付ファイルを一度だけダウンロードして、複数の場所に送信するためのクラスです。
+    ダウンロードしたものは`SPOOL_SIZE`まではメモリに、それを超えたら一時ファイルに書き込みます。
+    一時ファイルへの書き込みはイベントループを止めないように、`RT.executors.normal`で行います。
+    また、同時にダウンロードする合計のバイト数は`budget`を超えないように待機します。"""
+
+    SPOOL_SIZE = 1 << 20
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, bot: RT, budget: int = 256 << 20):
+        self.bot, self.budget = bot, budget
+        self.in_flight = 0
+        self._condition = Condition()
+
+    async def _reserve(self, size: int) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight + size <= self.budget)
+            self.in_flight += size
+
+    async def _release(self, size: int) -> None:
+        async with self._condition:
+            self.in_flight -= size
+            self._condition.notify_all()
+
+    async def _download(self, attachment: discord.Attachment) -> RelayedAttachment:
+        relayed = RelayedAttachment(attachment, self.SPOOL_SIZE)
+        try:
+            async with self.bot.session.get(attachment.url) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                    if relayed.size + len(chunk) > self.SPOOL_SIZE:
+                        # 一時ファイルに書き込むことになる(または移し替える)ので、ブロックしないようにする。
+                        await self.bot.loop.run_in_executor(
+                            self.bot.executors.normal, relayed.write, chunk
+                        )
+                    else:
+                        relayed.write(chunk)
+        except BaseException:
+            relayed.file.close()
+            raise
+        return relayed
+
+    @asynccontextmanager
+    async def download(
+        self, attachments: Sequence[discord.Attachment], limit: int | None = None
+    ) -> AsyncIterator[RelayedAttachments]:
+        """添付ファイルをダウンロードします。`limit`より大きいものはダウンロードしません。
+        ダウンロードに失敗したものは除かれます。除かれたものがあるかは`RelayedAttachments.complete`でわかります。
+        `async with`で使い、抜けた時に一時ファイルを消します。"""
+        targets = [
+            attachment for attachment in attachments
+            if limit is None or attachment.size <= limit
+        ]
+        # 一つのメッセージだけで予算を超える場合は、予算の分だけ確保する。
+        size = min(sum(attachment.size for attachment in targets), self.budget)
+        relayed = RelayedAttachments()
+        await self._reserve(size)
+        try:
+            for attachment in targets:
+                try:
+                    relayed.append(await self._download(attachment))
+                except ClientError as e:
+                    self.bot.logger.warning("Failed to download attachment %s: %s", attachment.url, e)
+            relayed.skipped = len(attachments) - len(relayed)
+            yield relayed
+        finally:
+            for attachment in relayed:
+                attachment.file.close()
+            await self._release(size)
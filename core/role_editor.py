@@ -0,0 +1,142 @@
+# RT - Role Editor
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from collections.abc import Iterable
+
+from asyncio import Future, Task, shield, sleep, wait
+from time import monotonic
+
+import discord
+
+from .cacher import BoundedCacher
+
+if TYPE_CHECKING:
+    from .bot import RT
+
+
+__all__ = ("RoleEditor",)
+
+
+class _Edit:
+    "一人のメンバーに対する、まだ実行していないロールの付与と削除です。"
+
+    __slots__ = ("member", "add", "remove", "reason", "future")
+
+    def __init__(self, member: discord.Member, future: Future[None]):
+        self.member, self.future = member, future
+        self.add: set[int] = set()
+        self.remove: set[int] = set()
+        self.reason: str | None = None
+
+
+class RoleEditor:
+    """ロールの付与と削除をメンバー毎にまとめて、一回の`member.edit(roles=...)`で行うためのクラスです。
+    `.edit`で頼まれたものは`DELAY`秒待ってから、その間に頼まれたものと一緒に実行されます。
+    また、サーバー毎に`RATE`回/`PER`秒を超えないように実行を遅らせます。
+    同じメンバーへの実行は順番に行い、ゲートウェイからメンバーの更新が届くまでの間は、
+    前回の実行の結果のロールを元にして次の実行をします。更新が届いたらキャッシュにあるメンバーのロールを使います。
+    キャッシュにメンバーがおらず前回の結果もない場合は、渡されたメンバーのロールが古いかもしれないので、
+    ロール全体を上書きせずに、付与と削除をロール毎に行います。"""
+
+    DELAY = 0.25
+    RATE = 10
+    PER = 10.0
+    RECENT = 5.0
+    "前回の実行の結果のロールを使う秒数です。"
+
+    def __init__(self, bot: RT):
+        self.bot = bot
+        self.pending: dict[tuple[int, int], _Edit] = {}
+        self.applying: dict[tuple[int, int], Future[None]] = {}
+        self.recent: BoundedCacher[tuple[int, int], frozenset[int]] = \
+            self.bot.cachers.acquire_bounded(self.RECENT, max_size=10000, name="role_editor")
+        self.budgets: dict[int, tuple[float, float]] = {}
+        "サーバーIDと、残りの実行できる回数とそれを計算した時間です。"
+        self.tasks: set[Task] = set()
+        self.requests = 0
+        self.bot.add_listener(self._on_member_update, "on_member_update")
+
+    async def _on_member_update(self, _, after: discord.Member) -> None:
+        # ゲートウェイからの更新が届いたら、キャッシュにあるメンバーの方が新しいので前回の結果は使わない。
+        if (key := (after.guild.id, after.id)) in self.recent:
+            del self.recent[key]
+
+    def _start(self, key: tuple[int, int]) -> None:
+        task = self.bot.loop.create_task(self._apply(key), name="RT.RoleEditor.apply")
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def edit(
+        self, member: discord.Member, add: Iterable[discord.abc.Snowflake] = (),
+        remove: Iterable[discord.abc.Snowflake] = (), reason: str | None = None
+    ) -> None:
+        """ロールの付与と削除を頼み、実行されるまで待ちます。
+        同じロールの付与と削除が頼まれた場合は、後に頼まれた方になります。"""
+        key = (member.guild.id, member.id)
+        if (edit := self.pending.get(key)) is None:
+            edit = self.pending[key] = _Edit(member, self.bot.loop.create_future())
+            self.bot.loop.call_later(self.DELAY, self._start, key)
+        edit.member = member
+        for role in add:
+            edit.add.add(role.id)
+            edit.remove.discard(role.id)
+        for role in remove:
+            edit.remove.add(role.id)
+            edit.add.discard(role.id)
+        if reason is not None:
+            edit.reason = reason
+        # 同じメンバーへの他の頼みとまとめているので、キャンセルされてもまとめたものの実行は止めない。
+        await shield(edit.future)
+
+    async def _wait(self, guild_id: int) -> None:
+        # 一回分を予約して、足りない場合は足りるまで待つ。
+        now = monotonic()
+        tokens, updated = self.budgets.get(guild_id, (self.RATE, now))
+        tokens = min(self.RATE, tokens + (now - updated) * self.RATE / self.PER) - 1
+        self.budgets[guild_id] = (tokens, now)
+        if tokens < 0:
+            await sleep(-tokens * self.PER / self.RATE)
+
+    async def _apply_delta(self, edit: _Edit) -> None:
+        # ロールの付与と削除をロール毎に行う。メンバーのロールは古いかもしれないので、それを元に省いたりはしない。
+        for role_ids, method in (
+            (edit.add, edit.member.add_roles), (edit.remove, edit.member.remove_roles)
+        ):
+            for role_id in role_ids:
+                await self._wait(edit.member.guild.id)
+                self.requests += 1
+                await method(discord.Object(role_id), reason=edit.reason)
+
+    async def _apply(self, key: tuple[int, int]) -> None:
+        edit = self.pending.pop(key)
+        if (running := self.applying.get(key)) is not None:
+            await wait((running,))
+        self.applying[key] = edit.future
+        try:
+            # 前回の結果がない場合は、渡されたメンバーよりキャッシュにあるメンバーの方が新しいので、あればそちらのロールを使う。
+            cached = edit.member.guild.get_member(edit.member.id) # allow-get
+            if (current := self.recent.get(key)) is None and cached is not None:
+                current = frozenset(cached._roles)
+            if current is None:
+                await self._apply_delta(edit)
+            else:
+                roles = (current | edit.add) - edit.remove
+                if roles != current:
+                    await self._wait(key[0])
+                    self.requests += 1
+                    await (cached or edit.member).edit(
+                        roles=[discord.Object(role_id) for role_id in roles],
+                        reason=edit.reason
+                    )
+                    self.recent[key] = frozenset(roles)
+        except Exception as e:
+            if not edit.future.done():
+                edit.future.set_exception(e)
+        else:
+            if not edit.future.done():
+                edit.future.set_result(None)
+        finally:
+            if self.applying.get(key) is edit.future:
+                del self.applying[key]
@@ -0,0 +1,133 @@
+# RT - Role Index
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from collections.abc import Hashable, Iterable, Iterator
+
+import discord
+
+if TYPE_CHECKING:
+    from .bot import RT
+
+
+__all__ = ("RoleIndex", "RoleIndexes")
+
+
+class RoleIndex:
+    """一つのサーバーのロールのIDをビットの位置に対応させて、ロールの集まりを整数のビットマスクで扱うためのクラスです。
+    「どれかのロールを持っているか」や「ロールの付与と削除の差分」をビット演算だけでできるようにします。
+    メンバーのビットマスクは、メンバーが持つロールのIDの並びをキーにしてキャッシュします。
+    同じロールの組み合わせを持つメンバーは多いので、メンバー毎に持つよりも少なく済みます。
+    また、メッセージのメンバーのように毎回作られるオブジェクトでもキャッシュが効きます。"""
+
+    MAX_COMBINATIONS = 65536
+    "キャッシュするロールの組み合わせの最大数です。超えたらキャッシュを空にします。"
+
+    def __init__(self):
+        self.bits: dict[int, int] = {}
+        "ロールのIDとビットの位置です。"
+        self.ids: list[int] = []
+        "ビットの位置とロールのIDです。空いている位置は`0`です。"
+        self.free: list[int] = []
+        self.combinations: dict[bytes, int] = {}
+        self.configs: dict[Hashable, int] = {}
+        "機能の設定のロールのビットマスクのキャッシュです。"
+
+    def bit(self, role_id: int) -> int:
+        "ロールのビットの位置を返します。まだない場合は割り当てます。"
+        if (bit := self.bits.get(role_id)) is None:
+            if self.free:
+                bit = self.free.pop()
+                self.ids[bit] = role_id
+            else:
+                bit = len(self.ids)
+                self.ids.append(role_id)
+            self.bits[role_id] = bit
+        return bit
+
+    def mask(self, role_ids: Iterable[int]) -> int:
+        "ロールのIDからビットマスクを作ります。"
+        mask = 0
+        for role_id in role_ids:
+            mask |= 1 << self.bit(role_id)
+        return mask
+
+    def role_ids(self, mask: int) -> Iterator[int]:
+        "ビットマスクに含まれるロールのIDを返します。"
+        while mask:
+            low = mask & -mask
+            yield self.ids[low.bit_length() - 1]
+            mask ^= low
+
+    def member_mask(self, member: discord.Member) -> int:
+        "メンバーが持っているロールのビットマスクを返します。"
+        # discord.pyはメンバーのロールのIDを整数の配列で持っているので、そのバイト列をキーにする。
+        key = member._roles.tobytes()
+        if (mask := self.combinations.get(key)) is None:
+            if len(self.combinations) >= self.MAX_COMBINATIONS:
+                self.combinations.clear()
+            mask = self.combinations[key] = self.mask(member._roles)
+        return mask
+
+    def config_mask(self, key: Hashable, role_ids: Iterable[int]) -> int:
+        """機能の設定のロールのビットマスクを`key`毎にキャッシュして返します。`role_ids`はキャッシュがない時だけ使います。
+        設定を書き換えた時は`.forget`を呼んでください。ロールが削除された時は全て消します。"""
+        if (mask := self.configs.get(key)) is None:
+            mask = self.configs[key] = self.mask(role_ids)
+        return mask
+
+    def forget(self, key: Hashable) -> None:
+        "`.config_mask`のキャッシュを消します。"
+        self.configs.pop(key, None)
+
+    def has_any(
+        self, member: discord.Member, role_ids: Iterable[int],
+        key: Hashable | None = None
+    ) -> bool:
+        """メンバーが渡されたロールのどれかを持っているかどうかを返します。
+        `key`を渡した場合は、ロールのビットマスクを`.config_mask`でキャッシュします。"""
+        return bool(self.member_mask(member) & (
+            self.mask(role_ids) if key is None else self.config_mask(key, role_ids)
+        ))
+
+    def diff(self, before: discord.Member, after: discord.Member) -> tuple[int, int]:
+        "メンバーの更新前後で、付与されたロールと外されたロールのビットマスクを返します。"
+        before_mask, after_mask = self.member_mask(before), self.member_mask(after)
+        return after_mask & ~before_mask, before_mask & ~after_mask
+
+    def remove(self, role_id: int) -> None:
+        "削除されたロールのビットを空けます。"
+        if (bit := self.bits.pop(role_id, None)) is None:
+            return
+        self.ids[bit] = 0
+        self.free.append(bit)
+        # 空けたビットは他のロールに使われるので、そのビットを含むものは全て消す。
+        self.combinations.clear()
+        self.configs.clear()
+
+
+class RoleIndexes(dict[int, RoleIndex]):
+    "サーバー毎の`RoleIndex`です。サーバーのIDで取り出すと、ない場合は作られます。"
+
+    def __init__(self, bot: RT):
+        super().__init__()
+        self.bot = bot
+        self.bot.add_listener(self._on_role_delete, "on_guild_role_delete")
+        self.bot.add_listener(self._on_guild_remove, "on_guild_remove")
+
+    def __missing__(self, guild_id: int) -> RoleIndex:
+        self[guild_id] = index = RoleIndex()
+        return index
+
+    def forget(self, guild_id: int, key: Hashable) -> None:
+        "サーバーの`RoleIndex.config_mask`のキャッシュを消します。"
+        if guild_id in self:
+            self[guild_id].forget(key)
+
+    async def _on_role_delete(self, role: discord.Role) -> None:
+        if role.guild.id in self:
+            self[role.guild.id].remove(role.id)
+
+    async def _on_guild_remove(self, guild: discord.Guild) -> None:
+        self.pop(guild.id, None)
@@ -22,7 +22,13 @@ __all__ = ("EventContext", "OnErrorContext", "RTEvent")
 
 
 class EventContext:
-    "イベントデータを格納する`Context`のベースです。"
+    """イベントデータを格納する`Context`のベースです。
+    `subject`や`detail`等の文字列は、`detail`が読まれるまで`t`を通しません。"""
+
+    __slots__ = (
+        "bot", "keys", "event", "log", "status", "target", "feature",
+        "_subject", "_detail", "_extend_text", "_rendered"
+    )
 
     event: str
 
@@ -40,31 +46,39 @@ class EventContext:
             self.keys.append(key)
         if not isinstance(status, str):
             status = "ERROR"
-        self.log, self.status, self.target = log, status, target
-
-        # 文字列はもし辞書の場合は`t`を通す。
-        if isinstance(subject, dict):
-            subject = t(subject, target, client=bot)
-        if isinstance(detail, dict):
-            detail = t(detail, target, client=bot)
-        self.detail = "{}{}".format(f"{subject}\n" if subject else "", detail)
-
-        # 拡張テキストがあるのなら全部追記する。
-        if extend_text is not None:
-            if isinstance(extend_text, dict):
-                extend_text = (extend_text,) # type: ignore
-            for text in filter(lambda t: t is not None, extend_text): # type: ignore
-                self.detail = "{}\n{}".format(
-                    self.detail, text if isinstance(text, str)
-                        else t(text, target, client=bot) # type: ignore
-                )
+        self.bot, self.log, self.status, self.target = bot, log, status, target
+        self._subject, self._detail, self._extend_text = subject, detail, extend_text
+        self._rendered: str | None = None
         self.feature = feature
 
+    def _translate(self, text: str | Text) -> str:
+        return text if isinstance(text, str) else t(text, self.target, client=self.bot)
+
+    @property
+    def detail(self) -> str:
+        "件名と詳細と拡張テキストを連結した文字列です。初めて読まれた時に`t`を通して作られます。"
+        if self._rendered is None:
+            subject = self._translate(self._subject)
+            detail = "{}{}".format(f"{subject}\n" if subject else "", self._translate(self._detail))
+            # 拡張テキストがあるのなら全部追記する。
+            if (extend_text := self._extend_text) is not None:
+                if isinstance(extend_text, dict):
+                    extend_text = (extend_text,) # type: ignore
+                for text in filter(lambda t: t is not None, extend_text): # type: ignore
+                    detail = "{}\n{}".format(detail, self._translate(text)) # type: ignore
+            self._rendered = detail
+        return self._rendered
+
+    @detail.setter
+    def detail(self, detail: str) -> None:
+        self._rendered = detail
+
     def to_dict(self) -> dict[str, Any]:
         "格納されているデータを辞書にします。"
         return {
-            key: value for key, value in self.__dict__.items()
-            if key in self.keys or key in ("event", "status", "detail", "target", "feature")
+            key: getattr(self, key) for key in (
+                *self.keys, "event", "status", "detail", "target", "feature"
+            ) if hasattr(self, key)
         }
 
     def dumps(self) -> str:
@@ -93,13 +107,18 @@ class RTEvent(Cog):
         self.bot = bot
         self.listeners: defaultdict[str, list[EventFunction]] = \
             defaultdict(list)
-        self.set(self.on_error)
+        self.set(self.on_error, inline=True)
 
     async def on_error(self, ctx: OnErrorContext) -> None:
         self.bot.logger.warning("Ignoring error when run event:\n%s", ctx.make_full_traceback())
 
-    def set(self, function: EventFunction, event_name: Optional[str] = None) -> None:
-        "イベントを設定します。"
+    def set(
+        self, function: EventFunction, event_name: Optional[str] = None,
+        inline: bool = False
+    ) -> None:
+        """イベントを設定します。
+        `inline`を`True`にしたコルーチン関数は、イベント毎にタスクを作らずに、他の`inline`なものとまとめて一つのタスクで順番に実行されます。
+        同じイベントの後の`inline`なものを待たせるので、全てのイベントで呼ばれるもの等の、数が多くて重くないものに使ってください。"""
         event_name = cast(str, event_name or getattr(function, "__name__"))
         is_coro = False
         if iscoroutinefunction(function):
@@ -120,6 +139,7 @@ class RTEvent(Cog):
                     self.dispatch("on_error", OnErrorContext(self.bot, error=e, function=original))
             function = new
         setattr(function, "__is_coroutine__", is_coro)
+        setattr(function, "__is_inline__", inline)
         setattr(function, "__event_name__", event_name)
         self.listeners[event_name].append(function)
 
@@ -134,15 +154,30 @@ class RTEvent(Cog):
                     break
             else: raise KeyError("イベントが見つかりませんでした。: %s" % target)
 
+    @staticmethod
+    async def _run_inline(coros: list[Coroutine]) -> None:
+        for coro in coros:
+            await coro
+
     def dispatch(self, event: str, context: EventContext) -> None:
         "イベントを実行します。"
         context.event = event
+        functions = self.listeners.get(event, [])
         if event not in ("on_dispatch", "on_error"):
-            self.dispatch("on_dispatch", context)
-        for function in self.listeners[event]:
+            functions = self.listeners.get("on_dispatch", []) + functions
+        inline = []
+        for function in functions:
             coro = function(context)
             if getattr(function, "__is_coroutine__"):
-                create_task(coro, name=f"Run RTEvent: {event}")
+                if getattr(function, "__is_inline__"):
+                    inline.append(coro)
+                else:
+                    create_task(coro, name=f"Run RTEvent: {event}")
+        if inline:
+            create_task(
+                inline[0] if len(inline) == 1 else self._run_inline(inline),
+                name=f"Run inline RTEvent: {event}"
+            )
 
     def get_context(self, args: Sequence[EventContext | Any]) -> Optional[EventContext]:
         "引数のシーケンスからEventContextを探します。"
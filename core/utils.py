@@ -17,6 +17,8 @@ from discord.ext.fslash import _get as get_kwarg, Context
 
 from rtlib.common import set_handler
 
+from .catalog import CatalogText
+
 if TYPE_CHECKING:
     from .types_ import Text, CmdGrp
     from .bot import RT
@@ -38,6 +40,8 @@ def get_inner_text(data: dict[str, Text], key: str, language: str) -> str:
 
 def gettext(text: Text, language: str) -> str:
     "渡されたTextから指定された言語のものを取り出します。\nもし見つからなかった場合は英語、日本語、それ以外のどれかの順で代わりのものを返します。"
+    if isinstance(text, CatalogText):
+        return text.get_text(language)
     last = "Translations not found..."
     for key, value in text.items():
         if key == language:
@@ -0,0 +1,65 @@
+# RT - Warm Up
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+from collections.abc import AsyncIterator, Callable, Sequence
+
+from aiomysql import Connection, SSCursor
+
+from rtlib.common.database import cursor
+
+from .join_pipeline import make_placeholders
+
+if TYPE_CHECKING:
+    from .bot import RT
+
+
+__all__ = ("WarmUp", "stream", "shard_condition")
+
+
+def shard_condition(bot: RT, column: str = "GuildId") -> tuple[str, tuple[int, ...]]:
+    """シャードが担当するサーバーの行だけを取り出すための`WHERE`の条件とその引数を作ります。
+    シャードが使われていない場合やシャードの数がまだわからない場合は空の条件を返します。"""
+    if not bot.is_sharded() or not getattr(bot, "shard_count", None):
+        return "", ()
+    shard_ids: Sequence[int] = getattr(bot, "shard_ids")
+    return "MOD({} >> 22, %s) IN ({})".format(column, make_placeholders(len(shard_ids))), \
+        (getattr(bot, "shard_count"), *shard_ids)
+
+
+async def stream(
+    connection: Connection, sql: str, args: Sequence[Any] = (),
+    size: int = 1000
+) -> AsyncIterator[tuple[Any, ...]]:
+    """渡された接続でサーバーサイドカーソルを使って、`size`行ずつ取り出しながら一行ずつ返します。
+    全ての行を一度にメモリに載せないようにするためのものです。"""
+    async with connection.cursor(SSCursor) as server_cursor:
+        await server_cursor.execute(sql, args)
+        while rows := await server_cursor.fetchmany(size):
+            for row in rows:
+                yield row
+
+
+class WarmUp:
+    """サーバー毎の設定のテーブルから、このシャードが担当するサーバーの行だけをキャッシュに読み込むためのクラスです。
+    シャードの数は起動中に変わらないので、担当外のサーバーがこのプロセスで見えるようになることはありません。"""
+
+    def __init__(
+        self, bot: RT, table: str, callback: Callable[[tuple[Any, ...]], Any],
+        columns: str = "*", column: str = "GuildId"
+    ):
+        self.bot, self.table, self.callback = bot, table, callback
+        self.columns, self.column = columns, column
+
+    async def load(self) -> int:
+        """このシャードが担当するサーバーの行を読み込みます。読み込んだ行の数を返します。
+        `DatabaseManager`のメソッドの中から呼んでください。新しく接続を取らずに、そのメソッドの接続を使います。"""
+        condition, args = shard_condition(self.bot, self.column)
+        count = 0
+        async for row in stream(cursor.connection, "SELECT {} FROM {}{};".format(
+            self.columns, self.table, f" WHERE {condition}" if condition else ""
+        ), args):
+            self.callback(row)
+            count += 1
+        return count
@@ -3,12 +3,13 @@
 from typing import TypedDict, Literal, List
 
 from sys import argv
+from os import environ
 
 from toml import load
 
 
 __all__ = (
-    "SECRET", "DATA", "CANARY", "get_category", "HOST_PORT", "URL", "API_URL", "SHARD",
+    "SECRET", "DATA", "CANARY", "get_category", "HOST_PORT", "URL", "API_URL", "SHARD", "CHECK_GET",
     "TEST", "PREFIXES", "TOPIC_PREFIX", "ADMINS", "Colors", "EMOJIS", "ONLY_PRODUCT",
     "SUPPORT_SERVER", "PERMISSION_TEXTS", "SETTING_NOTFOUND", "ALREADY_NO_SETTING",
     "TOO_LARGE_NUMBER", "TOO_SMALL_NUMBER", "TOO_SMALL_OR_LARGE_NUMBER", "NOT_PAID",
@@ -37,6 +38,10 @@ class NormalData(TypedDict):
     opus: str
 with open("data.toml", "r") as f:
     DATA: NormalData = load(f) # type: ignore
+if "RT_SHARD_IDS" in environ:
+    # `cluster.py`から起動された場合は、ランチャーが割り当てたシャードを使う。
+    DATA["shard_ids"] = list(map(int, environ["RT_SHARD_IDS"].split(",")))
+    DATA["shard_count"] = int(environ["RT_SHARD_COUNT"])
 
 
 HOST_PORT = "{}{}".format(
@@ -58,6 +63,8 @@ def get_category(category: str, language: str) -> str:
 TEST = argv[-1] != "production"
 CANARY = "canary" in argv
 SHARD = DATA["shard_ids"] != "off"
+CHECK_GET = "check_get" in argv
+"`get_...`の非推奨の警告を実行時に出すかどうかです。"
 PREFIXES: tuple[str, ...]
 if TEST:
     if CANARY:
@@ -1,28 +1,33 @@
 # RT by Rext
 
-from asyncio import run
+"""RTを起動します。
+プロセスプールの子プロセスはこのファイルを`__mp_main__`として読み込むので、
+Botのモジュールの読み込みと起動は直接実行された時だけ行います。"""
 
-from discord import Intents, Status, Game, AllowedMentions
 
-from core.bot import RT
-from data import SECRET
+def main() -> None:
+    from discord import Intents, Status, Game, AllowedMentions
 
-try: from uvloop import install
-except ModuleNotFoundError: ...
-else: install()
+    from core.bot import RT
+    from data import SECRET
 
+    try: from uvloop import install
+    except ModuleNotFoundError: ...
+    else: install()
 
-intents = Intents.default()
-intents.message_content = True
-intents.members = True
-bot = RT(
-    allowed_mentions=AllowedMentions(everyone=False), intents=intents,
-    status=Status.dnd, activity=Game("booting")
-)
-bot.logger.info("Now loading...")
+    intents = Intents.default()
+    intents.message_content = True
+    intents.members = True
+    bot = RT(
+        allowed_mentions=AllowedMentions(everyone=False), intents=intents,
+        status=Status.dnd, activity=Game("booting")
+    )
+    bot.logger.info("Now loading...")
 
-
-if __name__ == "__main__":
     try: bot.run(SECRET["token"], log_handler=None)
     except KeyboardInterrupt: ...
-    finally: bot.process_after_queue()
\ No newline at end of file
+    finally: bot.process_after_queue()
+
+
+if __name__ == "__main__":
+    main()
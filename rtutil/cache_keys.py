@@ -0,0 +1,182 @@
+# RT Util - Cache Keys
+
+"""`Cacher`のキーにdiscord.pyのオブジェクトを使っている場所を、ソースコードをASTで解析して探すためのものです。
+オブジェクトをキーにすると、キャッシュの寿命の間メンバーやサーバー等が解放されなくなります。
+代わりにIDをキーにするか、`CacherPool.acquire_by_id`を使ってください。
+型注釈の`Cacher[<キー>, ...]`の他に、`acquire`の結果等のキャッシュに`cache[member] = ...`のように、
+型注釈が`discord.Member`等の変数や`.author`等の属性をキーにして入れている場所も探します。
+`python3 -m rtutil.cache_keys [パス ...]`で実行でき、見つかった場合は終了コードが1になります。
+正当な理由があって使う場合は、その行に`# allow-model-key`と書いてください。"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+from collections.abc import Iterator, Iterable
+
+from pathlib import Path
+import ast
+import sys
+
+
+__all__ = (
+    "MODELS", "MODEL_ATTRIBUTES", "ALLOW_COMMENT", "CACHERS", "ACQUIRES",
+    "ModelKey", "find_in_source", "find"
+)
+
+
+MODELS = frozenset((
+    "Member", "User", "ClientUser", "Guild", "Role", "Message", "Emoji", "Sticker",
+    "TextChannel", "VoiceChannel", "StageChannel", "CategoryChannel", "ForumChannel",
+    "Thread", "DMChannel", "GroupChannel", "Interaction", "GuildChannel", "Messageable"
+))
+"キャッシュのキーにしてはいけないdiscord.pyのクラスの名前です。"
+ALLOW_COMMENT = "# allow-model-key"
+CACHERS = frozenset(("Cacher", "BoundedCacher"))
+"キーの型を調べるキャッシュのクラスの名前です。"
+ACQUIRES = frozenset(("acquire", "acquire_bounded"))
+"`BoundedCacher`を返す`CacherPool`のメソッドの名前です。"
+MODEL_ATTRIBUTES = frozenset((
+    "author", "member", "user", "owner", "guild", "channel", "message", "role", "me"
+))
+"型注釈がなくても、discord.pyのオブジェクトだとみなす属性の名前です。"
+
+
+class ModelKey(NamedTuple):
+    "オブジェクトをキーにしている場所です。"
+
+    path: str
+    line: int
+    name: str
+
+    def __str__(self) -> str:
+        return f"{self.path}:{self.line}: {self.name}"
+
+
+def _find_models(node: ast.expr) -> Iterator[str]:
+    # `tuple[int, discord.Member]`のような中身も調べる。
+    for child in ast.walk(node):
+        if isinstance(child, ast.Attribute) and child.attr in MODELS:
+            yield child.attr
+        elif isinstance(child, ast.Name) and child.id in MODELS:
+            yield child.id
+
+
+def _is_cacher(node: ast.expr) -> bool:
+    return (isinstance(node, ast.Name) and node.id in CACHERS) \
+        or (isinstance(node, ast.Attribute) and node.attr in CACHERS)
+
+
+def _last_name(node: ast.expr) -> str | None:
+    # `self.caches.settings`なら`settings`を返す。
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+def _find_cachers(tree: ast.AST) -> set[str]:
+    # `acquire`の結果や`Cacher`の型注釈が付いた変数と属性の名前を集める。
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.AnnAssign) and any(
+            _is_cacher(child) for child in ast.walk(node.annotation)
+        ):
+            names.add(_last_name(node.target))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+            value = node.value
+            if isinstance(value, ast.Call) and (
+                _is_cacher(value.func) or (
+                    isinstance(value.func, ast.Attribute) and value.func.attr in ACQUIRES
+                )
+            ):
+                for target in node.targets if isinstance(node, ast.Assign) else (node.target,):
+                    names.add(_last_name(target))
+    names.discard(None)
+    return names
+
+
+def _walk_scope(scope: ast.AST) -> Iterator[ast.AST]:
+    # 中の関数は別に調べるので、その中には入らない。
+    nodes = list(ast.iter_child_nodes(scope))
+    while nodes:
+        yield (node := nodes.pop())
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            nodes.extend(ast.iter_child_nodes(node))
+
+
+def _find_model_names(scope: ast.AST) -> dict[str, str]:
+    # 関数の引数や変数で、型注釈がdiscord.pyのオブジェクトのものを集める。
+    names = {}
+    if isinstance(scope, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        arguments = scope.args
+        for argument in (
+            *arguments.posonlyargs, *arguments.args, *arguments.kwonlyargs,
+            arguments.vararg, arguments.kwarg
+        ):
+            if argument is not None and argument.annotation is not None:
+                for name in _find_models(argument.annotation):
+                    names[argument.arg] = name
+    for node in _walk_scope(scope):
+        if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            for name in _find_models(node.annotation):
+                names[node.target.id] = name
+    return names
+
+
+def _find_key_models(key: ast.expr, names: dict[str, str]) -> Iterator[str]:
+    for element in key.elts if isinstance(key, ast.Tuple) else (key,):
+        if isinstance(element, ast.Name) and element.id in names:
+            yield names[element.id]
+        elif isinstance(element, ast.Attribute) and element.attr in MODEL_ATTRIBUTES:
+            yield element.attr
+
+
+def _find_stores(scope: ast.AST, cachers: set[str]) -> Iterator[tuple[int, str]]:
+    # `cache[key] = ...`と`cache.__setitem__(key, ...)`のキーを調べる。
+    names = _find_model_names(scope)
+    for node in _walk_scope(scope):
+        if isinstance(node, ast.Subscript) and isinstance(node.ctx, ast.Store):
+            target, key = node.value, node.slice
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) \
+                and node.func.attr == "__setitem__" and node.args:
+            target, key = node.func.value, node.args[0]
+        else:
+            continue
+        if _last_name(target) in cachers:
+            for name in _find_key_models(key, names):
+                yield node.lineno, name
+
+
+def find_in_source(source: str, path: str = "<string>") -> Iterator[ModelKey]:
+    """渡されたソースコードから`Cacher[<キー>, ...]`のキーにオブジェクトを使っている場所と、
+    キャッシュにオブジェクトをキーにして値を入れている場所を探します。"""
+    lines, tree = source.splitlines(), ast.parse(source, path)
+    found: set[tuple[int, str]] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Tuple) \
+                and node.slice.elts and _is_cacher(node.value):
+            for name in _find_models(node.slice.elts[0]):
+                found.add((node.lineno, name))
+    cachers = _find_cachers(tree)
+    for scope in ast.walk(tree):
+        if isinstance(scope, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef)):
+            found.update(_find_stores(scope, cachers))
+    for line, name in sorted(found):
+        if ALLOW_COMMENT not in lines[line - 1]:
+            yield ModelKey(path, line, name)
+
+
+def find(paths: Iterable[str | Path]) -> Iterator[ModelKey]:
+    "渡されたパスにあるPythonのファイルからオブジェクトをキーにしている場所を探します。"
+    for path in map(Path, paths):
+        for file in sorted(path.rglob("*.py")) if path.is_dir() else (path,):
+            yield from find_in_source(file.read_text(encoding="utf-8"), file.as_posix())
+
+
+if __name__ == "__main__":
+    found = False
+    for key in find(sys.argv[1:] or ("core", "cogs", "rtutil")):
+        print(key)
+        found = True
+    sys.exit(int(found))
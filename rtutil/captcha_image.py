@@ -0,0 +1,31 @@
+# RT Util - Captcha Image
+
+"""Captcha用の画像をプロセスプールで生成するための関数です。
+子プロセスではこのモジュールだけが読み込まれるように、`core`や`data`等のBotのモジュールは読み込まないでください。"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from random import choice
+from string import ascii_letters, digits
+
+if TYPE_CHECKING:
+    from captcha.image import ImageCaptcha
+
+
+__all__ = ("LENGTH", "generate_image")
+
+
+LENGTH = 5
+
+
+_generator: ImageCaptcha | None = None
+def generate_image(length: int = LENGTH) -> tuple[str, bytes]:
+    "Captcha用の画像と、その答えを生成します。"
+    global _generator
+    if _generator is None:
+        from captcha.image import ImageCaptcha
+        _generator = ImageCaptcha()
+    characters = "".join(choice(ascii_letters + digits) for _ in range(length))
+    return characters, _generator.generate(characters).getvalue()
@@ -0,0 +1,140 @@
+# RT Util - Cluster
+
+"""シャードを複数のプロセスに分けて動かす時に、プロセス間でやり取りをするためのものです。
+ランチャー(`cluster.py`)が`ControlServer`をUnixソケットで立てて、各プロセスは`ControlClient`で繋ぎます。
+メッセージは改行区切りのJSONで、あるプロセスから送られたものは他の全てのプロセスに中継されます。"""
+
+from __future__ import annotations
+
+from typing import Any
+from collections.abc import Callable
+
+from asyncio import StreamReader, StreamWriter, Task, open_unix_connection, start_unix_server, \
+    get_running_loop, sleep
+from logging import getLogger
+from os import environ, remove
+from os.path import exists
+
+from orjson import dumps, loads
+
+
+__all__ = (
+    "ENV_SHARD_IDS", "ENV_SHARD_COUNT", "ENV_CLUSTER_ID", "ENV_SOCKET",
+    "partition", "ControlServer", "ControlClient"
+)
+
+
+ENV_SHARD_IDS = "RT_SHARD_IDS"
+ENV_SHARD_COUNT = "RT_SHARD_COUNT"
+ENV_CLUSTER_ID = "RT_CLUSTER_ID"
+ENV_SOCKET = "RT_CONTROL_SOCKET"
+logger = getLogger("rt.cluster")
+
+
+def partition(shard_count: int, clusters: int) -> list[list[int]]:
+    "シャードIDを`clusters`個のプロセスにできるだけ均等に分けます。"
+    clusters = max(min(clusters, shard_count), 1)
+    size, rest = divmod(shard_count, clusters)
+    result, start = [], 0
+    for i in range(clusters):
+        end = start + size + (i < rest)
+        result.append(list(range(start, end)))
+        start = end
+    return result
+
+
+def _encode(event: str, data: Any, from_: int) -> bytes:
+    return dumps({"event": event, "data": data, "from": from_}) + b"\n"
+
+
+class ControlServer:
+    "ランチャー側のメッセージの中継サーバーです。"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.writers: set[StreamWriter] = set()
+
+    async def start(self) -> None:
+        "サーバーを起動します。"
+        if exists(self.path):
+            remove(self.path)
+        self.server = await start_unix_server(self._handle, self.path)
+
+    async def _handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        self.writers.add(writer)
+        try:
+            while line := await reader.readline():
+                self._relay(line, writer)
+        except ConnectionError:
+            ...
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    def _relay(self, line: bytes, source: StreamWriter | None = None) -> None:
+        for writer in list(self.writers):
+            if writer is not source:
+                writer.write(line)
+
+    def broadcast(self, event: str, data: Any = None) -> None:
+        "全てのプロセスにメッセージを送ります。"
+        self._relay(_encode(event, data, -1))
+
+    async def close(self) -> None:
+        "サーバーを止めます。"
+        self.server.close()
+        for writer in list(self.writers):
+            writer.close()
+        await self.server.wait_closed()
+        if exists(self.path):
+            remove(self.path)
+
+
+class ControlClient:
+    """各プロセス側のクライアントです。
+    ランチャーから起動されていない場合は、`.broadcast`をしても何もしません。
+    受け取ったメッセージは`on_message`に`(イベント名, データ)`で渡されます。"""
+
+    RECONNECT_INTERVAL = 5.0
+
+    def __init__(self, on_message: Callable[[str, Any], Any]):
+        self.on_message = on_message
+        self.path = environ.get(ENV_SOCKET)
+        self.id = int(environ.get(ENV_CLUSTER_ID, 0))
+        self._writer: StreamWriter | None = None
+        self._task: Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        "ランチャーから起動されているかどうかです。"
+        return self.path is not None
+
+    def start(self) -> None:
+        "接続を始めます。"
+        if self.enabled and self._task is None:
+            self._task = get_running_loop().create_task(self._run(), name="RT.ControlClient")
+
+    async def _run(self) -> None:
+        assert self.path is not None
+        while True:
+            try:
+                reader, self._writer = await open_unix_connection(self.path)
+                while line := await reader.readline():
+                    message = loads(line)
+                    self.on_message(message["event"], message["data"])
+            except (OSError, ValueError) as e:
+                logger.warning("Control connection was lost: %s", e)
+            self._writer = None
+            await sleep(self.RECONNECT_INTERVAL)
+
+    def broadcast(self, event: str, data: Any = None) -> None:
+        "他の全てのプロセスにメッセージを送ります。"
+        if self._writer is not None:
+            self._writer.write(_encode(event, data, self.id))
+
+    def close(self) -> None:
+        "接続を閉じます。"
+        if self._task is not None:
+            self._task.cancel()
+        if self._writer is not None:
+            self._writer.close()
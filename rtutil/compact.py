@@ -0,0 +1,188 @@
+# RT Util - Compact
+
+from __future__ import annotations
+
+from typing import TypeVar, overload
+from collections.abc import Iterable, Iterator
+
+from bisect import bisect_left, insort
+from functools import reduce
+from operator import xor
+from array import array
+
+
+__all__ = ("IdSet", "IdMap")
+
+
+class IdSet:
+    """DiscordのIDのような64bitの整数を、ソート済みの`array('Q')`に入れて省メモリで保持する集合です。
+    検索は二分探索で行います。追加と削除は配列の挿入になるので、頻繁に書き込むものには向きません。
+    また、中身のIDの排他的論理和を`checksum`として持っていて、データベースとの差分確認に使えます。"""
+
+    __slots__ = ("_ids", "checksum")
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self.replace(ids)
+
+    def replace(self, ids: Iterable[int]) -> None:
+        "中身を渡されたIDで置き換えます。"
+        self._ids = array("Q", sorted(set(ids)))
+        self.checksum: int = reduce(xor, self._ids, 0)
+
+    def __contains__(self, id_: int) -> bool:
+        i = bisect_left(self._ids, id_)
+        return i != len(self._ids) and self._ids[i] == id_
+
+    def add(self, id_: int) -> None:
+        "IDを追加します。"
+        if id_ not in self:
+            insort(self._ids, id_)
+            self.checksum ^= id_
+
+    def discard(self, id_: int) -> None:
+        "IDを削除します。存在しない場合は何もしません。"
+        i = bisect_left(self._ids, id_)
+        if i != len(self._ids) and self._ids[i] == id_:
+            del self._ids[i]
+            self.checksum ^= id_
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __repr__(self) -> str:
+        return f"<IdSet length={len(self)} checksum={self.checksum}>"
+
+
+_DELETED = object()
+DefaultT = TypeVar("DefaultT")
+class IdMap:
+    """DiscordのIDのような64bitの整数をキーに、文字列を値にした省メモリな辞書です。
+    キーはソート済みの`array('Q')`に、値は重複を除いた値の表の添字として`array('I')`に入れます。
+    そのため、言語コードのように値の種類が少ないものほど省メモリになります。
+    書き込みは一旦小さな辞書に貯めて、`MERGE_THRESHOLD`個か配列の長さの八分の一を超えたら配列にまとめて反映します。"""
+
+    __slots__ = ("_ids", "_codes", "_values", "_table", "_delta")
+
+    MERGE_THRESHOLD = 4096
+    "書き込みを貯めておく最大の数です。"
+
+    def __init__(self, items: Iterable[tuple[int, str]] = ()):
+        self.replace(items)
+
+    def _code(self, value: str) -> int:
+        if (code := self._table.get(value)) is None:
+            code = self._table[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def replace(self, items: Iterable[tuple[int, str]]) -> None:
+        "中身を渡されたキーと値の組で置き換えます。"
+        self._ids, self._codes = array("Q"), array("I")
+        self._values: list[str] = []
+        self._table: dict[str, int] = {}
+        self._delta: dict[int, object] = {}
+        last = None
+        for id_, value in sorted(items):
+            if id_ == last:
+                self._codes[-1] = self._code(value)
+            else:
+                self._ids.append(id_)
+                self._codes.append(self._code(value))
+                last = id_
+
+    def merge(self) -> None:
+        "貯めておいた書き込みを配列に反映します。"
+        if not self._delta:
+            return
+        ids, codes = array("Q"), array("I")
+        old_ids, old_codes, i = self._ids, self._codes, 0
+        for id_, value in sorted(self._delta.items()):
+            j = bisect_left(old_ids, id_, i)
+            ids.extend(old_ids[i:j])
+            codes.extend(old_codes[i:j])
+            if j != len(old_ids) and old_ids[j] == id_:
+                j += 1
+            if value is not _DELETED:
+                ids.append(id_)
+                codes.append(self._code(value)) # type: ignore
+            i = j
+        ids.extend(old_ids[i:])
+        codes.extend(old_codes[i:])
+        self._ids, self._codes = ids, codes
+        self._delta.clear()
+
+    def _set(self, id_: int, value: object) -> None:
+        self._delta[id_] = value
+        if len(self._delta) > max(self.MERGE_THRESHOLD, len(self._ids) >> 3):
+            self.merge()
+
+    def update(self, items: Iterable[tuple[int, str]]) -> None:
+        "渡されたキーと値の組を書き込みます。"
+        if not self._ids and not self._delta:
+            self.replace(items)
+        else:
+            for id_, value in items:
+                self._delta[id_] = value
+            self.merge()
+
+    @overload
+    def get(self, id_: int) -> str | None: ...
+    @overload
+    def get(self, id_: int, default: DefaultT) -> str | DefaultT: ...
+    def get(self, id_, default=None):
+        "値を取得します。ない場合は`default`を返します。"
+        if (value := self._delta.get(id_)) is not None:
+            return default if value is _DELETED else value
+        i = bisect_left(self._ids, id_)
+        if i != len(self._ids) and self._ids[i] == id_:
+            return self._values[self._codes[i]]
+        return default
+
+    def __getitem__(self, id_: int) -> str:
+        if (value := self.get(id_, _DELETED)) is _DELETED:
+            raise KeyError(id_)
+        return value # type: ignore
+
+    def __setitem__(self, id_: int, value: str) -> None:
+        self._set(id_, value)
+
+    def __delitem__(self, id_: int) -> None:
+        if id_ not in self:
+            raise KeyError(id_)
+        self._set(id_, _DELETED)
+
+    def pop(self, id_: int, default: DefaultT = None) -> str | DefaultT:
+        "値を取り出して削除します。ない場合は`default`を返します。"
+        if (value := self.get(id_, _DELETED)) is _DELETED:
+            return default
+        self._set(id_, _DELETED)
+        return value # type: ignore
+
+    def __contains__(self, id_: int) -> bool:
+        return self.get(id_, _DELETED) is not _DELETED
+
+    def __len__(self) -> int:
+        self.merge()
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[int]:
+        # 反映後の配列は書き換えられずに置き換えられるので、繰り返し中に削除しても問題ない。
+        self.merge()
+        return iter(self._ids)
+
+    def keys(self) -> Iterator[int]:
+        return iter(self)
+
+    def values(self) -> Iterator[str]:
+        self.merge()
+        return (self._values[code] for code in self._codes)
+
+    def items(self) -> Iterator[tuple[int, str]]:
+        self.merge()
+        return zip(self._ids, (self._values[code] for code in self._codes))
+
+    def __repr__(self) -> str:
+        return f"<IdMap length={len(self)} values={len(self._values)}>"
@@ -0,0 +1,68 @@
+# RT Util - Deprecation
+
+"""`get_...`の非推奨な呼び出しを、ソースコードをASTで解析して静的に探すためのものです。
+実行時に毎回フレームを調べるのは重たいので、代わりにこれを使います。
+`python3 -m rtutil.deprecation [パス ...]`で実行でき、見つかった場合は終了コードが1になります。
+正当な理由があって使う場合は、その行に`# allow-get`と書いてください。"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+from collections.abc import Iterator, Iterable
+
+from pathlib import Path
+import ast
+import sys
+
+
+__all__ = ("DEPRECATED", "ALLOW_COMMENT", "DeprecatedCall", "find_in_source", "find")
+
+
+DEPRECATED = frozenset((
+    "get_channel", "get_guild", "get_user", "get_emoji", "get_sticker",
+    "get_stage_instance", "get_partial_messageable", "get_all_channels",
+    "get_all_members", "get_member", "get_member_named", "get_thread",
+    "get_channel_or_thread"
+))
+"非推奨となっている、シャードが見ている範囲のキャッシュからしか取得できないメソッドの名前です。"
+ALLOW_COMMENT = "# allow-get"
+IGNORE_FILES = ("core/bot.py",)
+"`search_...`等の実装のために`get_...`を使っているファイルです。"
+
+
+class DeprecatedCall(NamedTuple):
+    "非推奨な呼び出しの場所です。"
+
+    path: str
+    line: int
+    name: str
+
+    def __str__(self) -> str:
+        return f"{self.path}:{self.line}: {self.name}"
+
+
+def find_in_source(source: str, path: str = "<string>") -> Iterator[DeprecatedCall]:
+    "渡されたソースコードから非推奨な呼び出しを探します。"
+    lines = source.splitlines()
+    for node in ast.walk(ast.parse(source, path)):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) \
+                and node.func.attr in DEPRECATED \
+                and ALLOW_COMMENT not in lines[node.lineno - 1]:
+            yield DeprecatedCall(path, node.lineno, node.func.attr)
+
+
+def find(paths: Iterable[str | Path]) -> Iterator[DeprecatedCall]:
+    "渡されたパスにあるPythonのファイルから非推奨な呼び出しを探します。"
+    for path in map(Path, paths):
+        for file in sorted(path.rglob("*.py")) if path.is_dir() else (path,):
+            if file.as_posix().endswith(IGNORE_FILES):
+                continue
+            yield from find_in_source(file.read_text(encoding="utf-8"), file.as_posix())
+
+
+if __name__ == "__main__":
+    found = False
+    for call in find(sys.argv[1:] or ("core", "cogs", "rtutil")):
+        print(call)
+        found = True
+    sys.exit(int(found))
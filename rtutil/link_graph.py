@@ -0,0 +1,67 @@
+# RT Util - Link Graph
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from collections import defaultdict
+
+
+__all__ = ("LinkGraph",)
+
+
+class LinkGraph:
+    """ロールリンクのグラフです。ループが起きないかを調べるのに使います。
+    Pearce-Kellyの方法でトポロジカル順序を保ち、リンクを追加する時は順序が崩れる範囲だけを調べます。
+    リンクの削除では順序は崩れないので、辺を消すだけです。"""
+
+    def __init__(self, edges: Iterable[tuple[int, int]] = ()):
+        self.order: dict[int, int] = {}
+        self.outs: defaultdict[int, set[int]] = defaultdict(set)
+        self.ins: defaultdict[int, set[int]] = defaultdict(set)
+        for before, after in edges:
+            self.add(before, after)
+
+    def _node(self, role_id: int) -> int:
+        if role_id not in self.order:
+            self.order[role_id] = len(self.order)
+        return self.order[role_id]
+
+    def _collect(
+        self, start: int, edges: defaultdict[int, set[int]],
+        low: int, high: int, target: int | None = None
+    ) -> list[int] | None:
+        # 順序が`low`から`high`の間のノードだけを辿る。`target`に辿り着いたら`None`を返す。
+        seen, stack, result = {start}, [start], []
+        while stack:
+            result.append(node := stack.pop())
+            for next_ in edges.get(node, ()):
+                if next_ == target:
+                    return None
+                if next_ not in seen and low < self.order[next_] < high:
+                    seen.add(next_)
+                    stack.append(next_)
+        return result
+
+    def add(self, before: int, after: int) -> bool:
+        "リンクを追加します。ループが起きる場合は追加せずに`False`を返します。"
+        if before == after:
+            return False
+        upper, lower = self._node(before), self._node(after)
+        if lower < upper:
+            # `after`から辿れるものと`before`へ辿れるものだけを調べて、順序を入れ替える。
+            if (forward := self._collect(after, self.outs, -1, upper, before)) is None:
+                return False
+            backward = self._collect(before, self.ins, lower, len(self.order)) or []
+            nodes = sorted(backward, key=self.order.__getitem__) \
+                + sorted(forward, key=self.order.__getitem__)
+            for node, index in zip(nodes, sorted(self.order[node] for node in nodes)):
+                self.order[node] = index
+        self.outs[before].add(after)
+        self.ins[after].add(before)
+        return True
+
+    def remove(self, before: int, after: int) -> None:
+        "リンクを削除します。"
+        self.outs[before].discard(after)
+        self.ins[after].discard(before)
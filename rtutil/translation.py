@@ -0,0 +1,93 @@
+# RT Util - Translation
+
+"""翻訳のバックエンドと、翻訳結果のキャッシュと同時の同じ翻訳をまとめるための`Coalescer`です。
+Botに依存しないので、キャッシュとエグゼキューターは外から渡してください。"""
+
+from __future__ import annotations
+
+from typing import Protocol
+
+from abc import ABC, abstractmethod
+from asyncio import Task, get_running_loop, shield
+from concurrent.futures import Executor
+from hashlib import blake2b
+
+
+__all__ = ("Backend", "GoogleBackend", "EchoBackend", "Coalescer", "Key")
+
+
+Key = tuple[str, str, bytes]
+"翻訳結果のキャッシュのキーです。`(翻訳元, 翻訳先, 文章のハッシュ)`です。"
+
+
+class Caches(Protocol):
+    "`Coalescer`で使うキャッシュです。`BoundedCacher`や辞書が使えます。"
+
+    def get(self, key: Key, default: None = None) -> str | None: ...
+    def __setitem__(self, key: Key, value: str) -> None: ...
+
+
+class Backend(ABC):
+    "翻訳を行うクラスのベースです。`.translate`はエグゼキューターで実行されます。"
+
+    @abstractmethod
+    def translate(self, target: str, content: str) -> str:
+        "渡された文章を翻訳します。"
+
+
+class GoogleBackend(Backend):
+    "Google翻訳を使うバックエンドです。"
+
+    def translate(self, target: str, content: str) -> str:
+        from deep_translator import GoogleTranslator
+        return GoogleTranslator(target=target).translate(content)
+
+
+class EchoBackend(Backend):
+    "翻訳をせずに言語コードを付けて返すだけのバックエンドです。動作確認用です。"
+
+    def __init__(self):
+        self.calls = 0
+
+    def translate(self, target: str, content: str) -> str:
+        self.calls += 1
+        return f"[{target}] {content}"
+
+
+class Coalescer:
+    """翻訳結果のキャッシュと、同じ翻訳の同時の実行をまとめるためのクラスです。
+    翻訳結果は`(翻訳元, 翻訳先, 文章のハッシュ)`をキーにしてキャッシュします。
+    キャッシュにない翻訳は、同じキーの翻訳が実行中ならその結果を待ち、そうでなければすぐにエグゼキューターで翻訳します。
+    バックエンドは一度に一つの文章しか翻訳できないので、時間を置いて溜めることはしません。
+    待っている人の誰かがキャンセルされても、実行中の翻訳は他の人のために続けます。"""
+
+    SOURCE = "auto"
+
+    def __init__(self, backend: Backend, caches: Caches, executor: Executor | None = None):
+        self.backend, self.caches, self.executor = backend, caches, executor
+        self.pending: dict[Key, Task[str]] = {}
+        self.upstream_calls = 0
+
+    @staticmethod
+    def make_key(target: str, content: str) -> Key:
+        return (Coalescer.SOURCE, target, blake2b(content.encode(), digest_size=16).digest())
+
+    async def translate(self, target: str, content: str) -> str:
+        "翻訳をします。"
+        key = self.make_key(target, content)
+        if (cached := self.caches.get(key)) is not None:
+            return cached
+        if (task := self.pending.get(key)) is None:
+            task = self.pending[key] = get_running_loop().create_task(
+                self._translate(key, target, content), name="RT.Translator.translate"
+            )
+            task.add_done_callback(lambda _: self.pending.pop(key, None))
+        return await shield(task)
+
+    async def _translate(self, key: Key, target: str, content: str) -> str:
+        self.upstream_calls += 1
+        result = await get_running_loop().run_in_executor(
+            self.executor, self.backend.translate, target, content
+        )
+        self.caches[key] = result
+        return result
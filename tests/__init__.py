@@ -0,0 +1 @@
+# RT - Tests
@@ -0,0 +1,60 @@
+# RT - Tests - Config
+
+"""テストの設定です。
+`core`は読み込むと`data`経由で`secret.toml`等の設定ファイルを読み込むので、
+`core/__init__.py`は`from core import Cog`のように中身が使われるまで実行しないようにしておきます。
+そのため、`core.cacher`等のサブモジュールだけを使うテストではDiscord等を読み込みません。
+また、`data`はテンプレートの設定ファイルで読み込み、`rtlib`が入っていない場合は`tests/stubs`のものを使います。"""
+
+from typing import Any
+
+from tempfile import TemporaryDirectory
+from types import ModuleType
+from pathlib import Path
+from shutil import copy
+import sys
+import os
+
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:
+    import rtlib.common.database # noqa: F401
+except ImportError:
+    for name in [name for name in sys.modules if name.split(".")[0] == "rtlib"]:
+        del sys.modules[name]
+    sys.path.append(str(ROOT / "tests" / "stubs"))
+
+if "data" not in sys.modules:
+    with TemporaryDirectory() as directory:
+        copy(ROOT / "secret.template.toml", Path(directory) / "secret.toml")
+        copy(ROOT / "data.template.toml", Path(directory) / "data.toml")
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            import data # noqa: F401
+        finally:
+            os.chdir(cwd)
+
+
+def _load_core(name: str) -> Any:
+    # `core/__init__.py`を実行して、`core`の中身を本物にする。
+    # サブモジュールの場合は、`from core import cacher`等で普通に読み込まれるようにする。
+    if name.startswith("__") or (ROOT / "core" / f"{name}.py").exists() \
+            or (ROOT / "core" / name).is_dir():
+        raise AttributeError(name)
+    del core.__getattr__
+    path = ROOT / "core" / "__init__.py"
+    exec(compile(path.read_text(), str(path), "exec"), core.__dict__)
+    return getattr(core, name)
+
+
+if "core" not in sys.modules:
+    core = ModuleType("core")
+    core.__path__ = [str(ROOT / "core")]
+    core.__package__ = "core"
+    core.__file__ = str(ROOT / "core" / "__init__.py")
+    setattr(core, "__getattr__", _load_core)
+    sys.modules["core"] = core
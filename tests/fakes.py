@@ -0,0 +1,162 @@
+# RT - Tests - Fakes
+
+"""テストで使う偽物です。
+`FakePool`はaiomysqlのプールの代わりで、実行されたSQLを記録して、`handler`が返した行を結果にします。
+`FakeGateway`はDiscordのHTTPとゲートウェイの代わりで、ログインとシャードの接続とコマンドの同期だけができます。"""
+
+from __future__ import annotations
+
+from typing import Any
+from collections.abc import Callable, Iterable
+
+from asyncio import Event
+from importlib import import_module
+from types import ModuleType
+
+from aiohttp import WSMsgType, web
+from orjson import dumps
+
+
+__all__ = ("FakePool", "FakeConnection", "FakeCursor", "FakeGateway", "import_cog")
+
+
+Handler = Callable[[str, tuple[Any, ...]], Iterable[tuple[Any, ...]]]
+
+
+def import_cog(name: str) -> ModuleType:
+    """`cogs`のエクステンションを読み込みます。例：`import_cog("server-management.requiresend")`
+    `Cog.HelpCommand`等はBotの起動時に読み込まれるエクステンションで設定されるので、先に読み込んでおきます。"""
+    import_module("core.rtevent")
+    import_module("core.help")
+    return import_module(f"cogs.{name}")
+
+
+class FakeCursor:
+    def __init__(self, connection: FakeConnection):
+        self.connection = connection
+        self.rows: list[tuple[Any, ...]] = []
+
+    async def execute(self, sql: str, args: Any = None) -> int:
+        self.connection.pool.queries.append((sql, args))
+        self.rows = list(self.connection.pool.handler(sql, tuple(args or ())))
+        return len(self.rows)
+
+    async def executemany(self, sql: str, args: Iterable[Any]) -> int:
+        self.connection.pool.queries.append((sql, args := list(args)))
+        return len(args)
+
+    async def fetchone(self) -> tuple[Any, ...] | None:
+        return self.rows.pop(0) if self.rows else None
+
+    async def fetchmany(self, size: int = 1) -> list[tuple[Any, ...]]:
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    async def fetchall(self) -> list[tuple[Any, ...]]:
+        rows, self.rows = self.rows, []
+        return rows
+
+    async def __aenter__(self) -> FakeCursor:
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        ...
+
+
+class FakeConnection:
+    def __init__(self, pool: FakePool):
+        self.pool = pool
+
+    def cursor(self, *_: Any) -> FakeCursor:
+        return FakeCursor(self)
+
+    async def __aenter__(self) -> FakeConnection:
+        self.pool.acquired += 1
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        ...
+
+
+class FakePool:
+    "aiomysqlのプールの代わりです。`queries`に`(SQL, 引数)`を記録します。"
+
+    def __init__(self, handler: Handler | None = None):
+        self.handler: Handler = handler or (lambda sql, args: ())
+        self.queries: list[tuple[str, Any]] = []
+        self.acquired = 0
+
+    def acquire(self) -> FakeConnection:
+        return FakeConnection(self)
+
+    def count(self, keyword: str = "") -> int:
+        "`keyword`を含むSQLの実行回数を返します。"
+        return sum(keyword in sql for sql, _ in self.queries)
+
+
+USER = {"id": "1", "username": "RT", "discriminator": "0", "avatar": None, "bot": True}
+APPLICATION = {
+    "id": "1", "name": "RT", "icon": None, "description": "", "bot_public": True,
+    "bot_require_code_grant": False, "verify_key": "", "flags": 0, "owner": USER
+}
+
+
+class FakeGateway:
+    """シャードの`IDENTIFY`を受け付けて`READY`を返すだけの、DiscordのHTTPとゲートウェイの代わりです。
+    シャードの数を指定した場合は`/gateway/bot`は使われないので、ログインに使うものだけを返します。
+    スラッシュコマンドの同期は、送られてきたコマンドを`synced`に記録します。"""
+
+    def __init__(self):
+        self.identified: list[tuple[int, int]] = []
+        self.synced: list[list[dict[str, Any]]] = []
+        self.changed = Event()
+        self.app = web.Application()
+        self.app.router.add_get("/api/v10/users/@me", self.json(USER))
+        self.app.router.add_get("/api/v10/oauth2/applications/@me", self.json(APPLICATION))
+        self.app.router.add_put("/api/v10/applications/{id}/commands", self.sync)
+        self.app.router.add_get("/gateway", self.websocket)
+
+    @staticmethod
+    def response(data: Any) -> web.Response:
+        # discord.pyは`Content-Type`が`application/json`と完全に一致する場合だけJSONとして読み込む。
+        return web.Response(body=dumps(data), content_type="application/json")
+
+    def json(self, data: Any) -> Callable[[web.Request], Any]:
+        async def handler(_: web.Request) -> web.Response:
+            return self.response(data)
+        return handler
+
+    async def start(self) -> str:
+        await (runner := web.AppRunner(self.app)).setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        self.runner, self.url = runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+        return self.url
+
+    async def sync(self, request: web.Request) -> web.Response:
+        self.synced.append(commands := await request.json())
+        return self.response([
+            command | {"id": str(index), "application_id": request.match_info["id"], "version": "1"}
+            for index, command in enumerate(commands, 1)
+        ])
+
+    async def websocket(self, request: web.Request) -> web.WebSocketResponse:
+        await (ws := web.WebSocketResponse()).prepare(request)
+        await ws.send_json({"op": 10, "d": {"heartbeat_interval": 45000}})
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                break
+            if (payload := message.json())["op"] == 2:
+                shard = tuple(payload["d"]["shard"])
+                self.identified.append(shard)
+                self.changed.set()
+                await ws.send_json({"op": 0, "s": 1, "t": "READY", "d": {
+                    "v": 10, "user": USER, "guilds": [], "session_id": "session",
+                    "resume_gateway_url": self.url.replace("http", "ws") + "/gateway",
+                    "shard": list(shard), "application": {"id": "1", "flags": 0}
+                }})
+        return ws
+
+    async def wait_identified(self, count: int) -> None:
+        while len(self.identified) < count:
+            self.changed.clear()
+            await self.changed.wait()
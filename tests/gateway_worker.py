@@ -0,0 +1,58 @@
+# RT - Tests - Gateway Worker
+
+"""`tests/test_cluster.py`等で、`FAKE_DISCORD`のURLのDiscordの代わりに繋ぐBotを起動するものです。
+引数がない場合は`cluster.py`から起動されたプロセスの代わりで、`cluster.py`と同じ環境変数でシャードを受け取ります。
+`sync_tree`を渡した場合はログインだけをして、`RT.sync_tree`を二回実行した結果をJSONで出力します。
+その時に`extra`も渡すと、コマンドを一つ追加してから同期します。
+Botの準備とバックエンドへの接続は省きます。"""
+
+from asyncio import run
+from os import environ
+import sys
+
+from tests import conftest # noqa: F401
+
+from yarl import URL
+from orjson import dumps
+import discord
+
+from core.bot import RT
+
+
+class GatewayRT(RT):
+    async def setup_hook(self):
+        ...
+
+    async def on_connect(self):
+        ...
+
+    async def before_identify_hook(self, shard_id, *, initial=False):
+        ...
+
+
+async def extra(interaction: discord.Interaction):
+    ...
+
+
+async def sync_tree(add: bool) -> None:
+    # `setup_hook`で準備するものを使うので、`RT.close`は使わずにHTTPだけを閉じる。
+    bot = GatewayRT(intents=discord.Intents.none())
+    await bot.login("token")
+    if add:
+        bot.tree.add_command(discord.app_commands.Command(
+            name="extra", description="Extra command", callback=extra
+        ))
+    try:
+        print(dumps([await bot.sync_tree(), await bot.sync_tree()]).decode())
+    finally:
+        await bot.http.close()
+
+
+if __name__ == "__main__":
+    discord.http.Route.BASE = environ["FAKE_DISCORD"] + "/api/v10"
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = \
+        URL(environ["FAKE_DISCORD"].replace("http", "ws", 1) + "/gateway")
+    if sys.argv[1:2] == ["sync_tree"]:
+        run(sync_tree("extra" in sys.argv[2:]))
+    else:
+        GatewayRT(intents=discord.Intents.none()).run("token", log_handler=None)
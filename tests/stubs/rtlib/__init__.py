@@ -0,0 +1,4 @@
+# RT - Tests - Stubs - rtlib
+
+"""`rtlib`が入っていない環境でテストを動かすための最低限の代わりです。
+`rtlib`が読み込める場合は使われません。(`tests/conftest.py`を参照)"""
@@ -0,0 +1,7 @@
+# RT - Tests - Stubs - rtlib.common
+
+from logging import Logger
+
+
+def set_handler(logger: Logger) -> None:
+    "何もしません。"
@@ -0,0 +1,65 @@
+# RT - Tests - Stubs - Database
+
+"""`rtlib.common.database`の代わりです。
+`DatabaseManager`を継承したクラスのコルーチン関数は、`cursor`が渡されなかった場合は`pool`から接続を取って、
+その接続のカーソルを`cursor`として使えるようにしてから呼ばれます。"""
+
+from typing import Any
+from collections.abc import AsyncIterator, Callable
+
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+
+
+__all__ = ("DatabaseManager", "cursor")
+
+
+_cursor: ContextVar[Any] = ContextVar("cursor")
+
+
+class _Cursor:
+    # `cursor`の中身は今実行しているメソッドのカーソルにする。
+    def __getattr__(self, name: str) -> Any:
+        return getattr(_cursor.get(), name)
+
+
+cursor: Any = _Cursor()
+
+
+def _wrap(func: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(func)
+    async def new(self: Any, *args: Any, **kwargs: Any) -> Any:
+        if (given := kwargs.get("cursor")) is not None:
+            # `cursor=cursor`のように`cursor`自体が渡された場合は、今のカーソルを使う。
+            token = _cursor.set(_cursor.get() if given is cursor else given)
+            try:
+                return await func(self, *args, **kwargs)
+            finally:
+                _cursor.reset(token)
+        async with self.pool.acquire() as connection:
+            async with connection.cursor() as new_cursor:
+                token = _cursor.set(new_cursor)
+                try:
+                    return await func(self, *args, **kwargs)
+                finally:
+                    _cursor.reset(token)
+    return new
+
+
+class DatabaseManager:
+    pool: Any
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        for name, value in list(vars(cls).items()):
+            if iscoroutinefunction(value):
+                setattr(cls, name, _wrap(value))
+
+    @staticmethod
+    async def fetchstep(
+        cursor: Any, sql: str, args: Any = None, **_: Any
+    ) -> AsyncIterator[Any]:
+        await cursor.execute(sql, args)
+        for row in await cursor.fetchall():
+            yield row
@@ -0,0 +1,12 @@
+# RT - Tests - Stubs - JSON
+
+from typing import Any
+
+from orjson import dumps as _dumps, loads
+
+
+__all__ = ("dumps", "loads")
+
+
+def dumps(obj: Any, *args: Any, **kwargs: Any) -> str:
+    return _dumps(obj, *args, **kwargs).decode()
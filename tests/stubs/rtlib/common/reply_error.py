@@ -0,0 +1,16 @@
+# RT - Tests - Stubs - Reply Error
+
+from typing import Any
+
+
+__all__ = ("ReplyError", "BadRequest")
+
+
+class ReplyError(Exception):
+    def __init__(self, text: Any, *args: Any, **kwargs: Any):
+        self.text = text
+        super().__init__(text, *args)
+
+
+class BadRequest(ReplyError):
+    ...
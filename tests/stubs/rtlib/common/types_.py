@@ -0,0 +1,10 @@
+# RT - Tests - Stubs - Types
+
+from typing import Any
+from collections.abc import Callable, Coroutine
+
+
+__all__ = ("CoroutineFunction",)
+
+
+CoroutineFunction = Callable[..., Coroutine[Any, Any, Any]]
@@ -0,0 +1,35 @@
+# RT - Tests - Stubs - Utils
+
+from typing import Any
+from collections.abc import Iterable, Iterator
+
+from traceback import format_exception
+
+
+__all__ = (
+    "code_block", "make_error_message", "make_simple_error_text",
+    "text_format", "map_length"
+)
+
+
+def code_block(code: str, type_: str = "") -> str:
+    return f"```{type_}\n{code}\n```"
+
+
+def make_error_message(error: BaseException) -> str:
+    return "".join(format_exception(type(error), error, error.__traceback__))
+
+
+def make_simple_error_text(error: BaseException) -> str:
+    return f"{error.__class__.__name__}: {error}"
+
+
+def text_format(text: Any, **kwargs: Any) -> Any:
+    if isinstance(text, dict):
+        return {key: value.format(**kwargs) for key, value in text.items()}
+    return text.format(**kwargs)
+
+
+def map_length(iterable: Iterable[Any]) -> Iterator[tuple[Any, int]]:
+    for value in iterable:
+        yield value, len(value)
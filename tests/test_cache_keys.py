@@ -0,0 +1,102 @@
+# RT - Tests - Cache Keys
+
+from gc import collect
+from tracemalloc import start, stop, take_snapshot
+from weakref import ref
+
+from core.cacher import CacherPool
+from rtutil.cache_keys import find, find_in_source
+
+
+def names(source: str) -> list[tuple[int, str]]:
+    return [(key.line, key.name) for key in find_in_source(source)]
+
+
+def test_annotated_key():
+    assert names(
+        "caches: BoundedCacher[discord.Member, int]\n"
+        "ok: BoundedCacher[int, discord.Member]\n"
+    ) == [(1, "Member")]
+
+
+def test_store_into_acquired_cacher():
+    # 型注釈のない`acquire`の結果に、オブジェクトをキーにして入れているもの。
+    assert names(
+        "class Cog:\n"
+        "    def __init__(self, bot):\n"
+        "        self.sent = bot.cachers.acquire(60.0)\n"
+        "        self.by_id = bot.cachers.acquire_by_id(60.0)\n"
+        "    async def on_message(self, message: discord.Message):\n"
+        "        self.sent[message.author] = True\n"
+        "        self.sent[(message.guild.id, message.channel)] = True\n"
+        "        self.sent.__setitem__(message, True)\n"
+        "        self.sent[message.id] = True\n"
+        "        self.by_id[message.author] = True\n"
+    ) == [(6, "author"), (7, "channel"), (8, "Message")]
+
+
+def test_store_into_dataclass_field():
+    assert names(
+        "@dataclass\n"
+        "class Caches:\n"
+        "    settings: BoundedCacher[int, str]\n"
+        "def update(caches, member: discord.Member, data):\n"
+        "    member_id: int = member.id\n"
+        "    caches.settings[member_id] = data\n"
+        "    caches.settings[member] = data\n"
+        "    data[member] = caches\n"
+    ) == [(7, "Member")]
+
+
+def test_annotation_is_scoped_to_function():
+    assert names(
+        "cache = CacherPool().acquire(60.0)\n"
+        "def a(user: discord.User):\n"
+        "    cache[user] = 1\n"
+        "def b(user: int):\n"
+        "    cache[user] = 1 # allow-model-key\n"
+        "    cache[user.id] = 1\n"
+    ) == [(3, "User")]
+
+
+def test_tree_is_clean():
+    assert list(find(("core", "cogs", "rtutil"))) == []
+
+
+class Member:
+    "メンバーの代わりです。一人あたりのメモリを本物に近づけるために、適当なデータを持たせます。"
+
+    __slots__ = ("id", "data", "__weakref__")
+
+    def __init__(self, id_: int):
+        self.id, self.data = id_, bytearray(512)
+
+
+def churn(cache, count: int = 100_000) -> tuple[int, int]:
+    """メンバーの参加と退出を`count`回繰り返して、キャッシュに残った生きているメンバーの数と、
+    増えたメモリのバイト数を返します。メンバーは退出するとキャッシュ以外からは参照されなくなります。"""
+    references = []
+    collect()
+    start()
+    before = take_snapshot()
+    for id_ in range(count):
+        member = Member(id_)
+        cache[member] = id_ % 7
+        references.append(ref(member))
+        del member
+    collect()
+    after = take_snapshot()
+    stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return sum(reference() is not None for reference in references), size
+
+
+def test_id_cacher_does_not_keep_members():
+    pool = CacherPool()
+    alive, size = churn(by_id := pool.acquire_by_id(3600.0))
+    assert alive == 0 and len(by_id) == 100_000
+    leaked, leaked_size = churn(plain := pool.acquire(3600.0))
+    assert leaked == 100_000 and len(plain) == 100_000
+    # オブジェクトをキーにすると、メンバーのデータの分だけメモリが増える。
+    # 弱参照のリスト等はどちらも同じなので、差はほぼメンバーの分になる。
+    assert leaked_size - size > 100_000 * 512
@@ -0,0 +1,165 @@
+# RT - Tests - Cacher
+
+from collections import Counter, OrderedDict
+from random import Random
+
+from pytest import MonkeyPatch, mark
+
+from core import cacher
+from core.cacher import BoundedCacher, CacherPool
+
+
+class Clock:
+    "`core.cacher.time`の代わりに使う、手で進める時計です。"
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make(monkeypatch: MonkeyPatch, *args, **kwargs) -> tuple[Clock, BoundedCacher]:
+    monkeypatch.setattr(cacher, "time", clock := Clock())
+    return clock, BoundedCacher(*args, **kwargs)
+
+
+def test_lru_eviction(monkeypatch: MonkeyPatch):
+    dead = []
+    _, cache = make(monkeypatch, 60.0, on_dead=lambda *x: dead.append(x), max_size=2)
+    cache["a"], cache["b"] = 1, 2
+    assert cache["a"] == 1
+    cache["c"] = 3
+    assert "b" not in cache
+    assert cache.keys() == ["a", "c"]
+    assert dead == [("b", 2)]
+    assert cache.evictions == 1
+
+
+def test_expired_entry_is_swept_before_eviction(monkeypatch: MonkeyPatch):
+    clock, cache = make(monkeypatch, 60.0, max_size=2)
+    cache["old"] = 0
+    clock.now += 30
+    cache["live"] = 1
+    clock.now += 40
+    # `old`は期限切れだが掃除はされていない。ここで`live`を消してはいけない。
+    cache["new"] = 2
+    assert cache.get("live") == 1
+    assert cache.get("new") == 2
+    assert cache.evictions == 0
+    assert cache.expirations == 1
+
+
+def test_expired_entry_is_not_returned(monkeypatch: MonkeyPatch):
+    clock, cache = make(monkeypatch, 10.0, list)
+    cache["a"].append(1)
+    assert cache["a"] == [1]
+    clock.now += 11
+    assert "a" not in cache
+    assert cache["a"] == []
+
+
+def test_merged_deadline_survives_clean(monkeypatch: MonkeyPatch):
+    clock, cache = make(monkeypatch, 10.0)
+    cache["a"] = 1
+    cache.get_raw("a").merge_deadline(20.0)
+    clock.now += 15
+    cache.clean()
+    assert cache.get("a") == 1
+    clock.now += 20
+    cache.clean()
+    assert len(cache) == 0
+
+
+class Model:
+    "`BoundedCacher`と比べるための、全部を毎回調べる遅いけれど単純な実装です。"
+
+    def __init__(self, lifetime: float, max_size: int | None):
+        self.lifetime, self.max_size = lifetime, max_size
+        self.data: OrderedDict[int, list] = OrderedDict()
+        self.dead: list[tuple[int, int]] = []
+
+    def clean(self, now: float) -> None:
+        for key, (value, deadline) in list(self.data.items()):
+            if deadline <= now:
+                del self.data[key]
+                self.dead.append((key, value))
+
+    def set(self, now: float, key: int, value: int) -> None:
+        if key in self.data:
+            self.data[key] = [value, now + self.lifetime]
+            self.data.move_to_end(key)
+            return
+        self.data[key] = [value, now + self.lifetime]
+        if self.max_size is not None and len(self.data) > self.max_size:
+            self.clean(now)
+            if len(self.data) > self.max_size:
+                old_key, (old, _) = self.data.popitem(last=False)
+                self.dead.append((old_key, old))
+
+    def get(self, now: float, key: int) -> int | None:
+        if key not in self.data:
+            return None
+        value, deadline = self.data[key]
+        if deadline <= now:
+            del self.data[key]
+            self.dead.append((key, value))
+            return None
+        self.data.move_to_end(key)
+        return value
+
+    def items(self, now: float) -> list[tuple[int, int]]:
+        self.clean(now)
+        return [(key, value) for key, (value, _) in self.data.items()]
+
+
+@mark.parametrize("seed", range(30))
+@mark.parametrize("max_size", (None, 1, 8))
+def test_matches_reference_model(monkeypatch: MonkeyPatch, seed: int, max_size: int | None):
+    random = Random(seed)
+    dead = []
+    clock, cache = make(
+        monkeypatch, 10.0, on_dead=lambda *x: dead.append(x), max_size=max_size
+    )
+    model = Model(10.0, max_size)
+    for _ in range(500):
+        key, operation = random.randrange(12), random.random()
+        if operation < 0.35:
+            value = random.randrange(1000)
+            cache[key] = value
+            model.set(clock.now, key, value)
+        elif operation < 0.6:
+            assert cache.get(key) == model.get(clock.now, key)
+        elif operation < 0.7:
+            if key in model.data:
+                del cache[key], model.data[key]
+        elif operation < 0.8:
+            # 先に取り出して期限切れを消しておき、両方の`KeyError`の条件を揃える。
+            assert (value := cache.get(key)) == model.get(clock.now, key)
+            if value is not None:
+                seconds = random.randrange(1, 20)
+                cache.merge_deadline(key, seconds)
+                model.data[key][1] += seconds
+        elif operation < 0.9:
+            clock.now += random.randrange(0, 6)
+        elif operation < 0.95:
+            cache.clean()
+            model.clean(clock.now)
+        else:
+            assert cache.items() == model.items(clock.now)
+        if max_size is not None:
+            assert len(cache.data) <= max_size
+    assert cache.items() == model.items(clock.now)
+    assert Counter(dead) == Counter(model.dead)
+
+
+def test_pool_sweeps_acquired_cachers(monkeypatch: MonkeyPatch):
+    monkeypatch.setattr(cacher, "time", clock := Clock())
+    pool = CacherPool()
+    plain, by_id = pool.acquire(10.0), pool.acquire_by_id(20.0)
+    assert isinstance(plain, BoundedCacher)
+    plain["a"], by_id[1] = 1, 2
+    clock.now += 15
+    pool.sweep()
+    assert len(plain.data) == 0 and len(by_id) == 1
+    assert pool.cachers == [plain, by_id.cacher]
@@ -0,0 +1,98 @@
+# RT - Tests - Catalog
+
+from types import SimpleNamespace
+from asyncio import run
+
+from pytest import mark
+
+from core.catalog import CatalogText, catalog
+from core.utils import gettext
+from core import Cog, t
+
+from tests.fakes import import_cog
+
+
+# `catalog`にする前に、呼び出し元に直接書かれていた文字列です。
+BEFORE = {
+    "SHOW_HELP": ({"ja": "ヘルプを見る。", "en": "Show help"}, {}),
+    "SUPPORT_SERVER_LABEL": ({"ja": "サポートサーバー", "en": "Support Server"}, {}),
+    "BAD_ARGUMENT": ({
+        "ja": "引数がおかしいです。\nCode:`{code}`",
+        "en": "The argument format is incorrect.\nCode:`{code}`"
+    }, {"code": "error"}),
+    "MISSING_ARGUMENT": ({"ja": "引数が足りません。", "en": "Argument is missing."}, {}),
+    "ON_COOLDOWN": ({
+        "ja": "クールダウン中です。\n{seconds:.2f}秒お待ちください。",
+        "en": "It is currently on cool down.\nPlease wait for {seconds:.2f}s."
+    }, {"seconds": 1.234}),
+    "PERHAPS": ({"ja": "もしかして：", "en": "Perhaps: "}, {}),
+    "COMMAND_NOT_FOUND": ({
+        "ja": "コマンドが見つかりませんでした。{suggetion}",
+        "en": "That command is not found.{suggetion}"
+    }, {"suggetion": "\nPerhaps: `help`"}),
+    "UNKNOWN_STATUS": ({"ja": "エラー", "en": "Error"}, {})
+}
+STATUS_MESSAGES = {
+    400: {"ja": "おかしいリクエスト", "en": "Bad Request"},
+    403: {"ja": "権限エラー", "en": "Forbidden"},
+    404: {"ja": "見つからないエラー", "en": "NotFound"},
+    423: {"ja": "鍵がかかっています", "en": "Locked"},
+    429: {"ja": "リクエスト過多", "en": "Too Many Requests"},
+    500: {"ja": "内部エラー", "en": "Internal Server Error"}
+}
+WRONG_WAY = {"ja": "使い方が違います。", "en": "This is wrong way to use this command."}
+WRONG_WAY_INDEX = {"ja": "使用方法が違います。", "en": "It is wrong way to use this command."}
+# `(ユーザーの言語, サーバーの言語)`です。対応していない言語と、設定がない場合も含めます。
+LANGUAGES = (("ja", None), ("en", "ja"), (None, "ja"), (None, None), ("ko", None))
+
+
+def make_context(user: str | None, guild: str | None) -> SimpleNamespace:
+    "`t`が言語を調べるのに使う部分だけのコンテキストです。"
+    client = SimpleNamespace(language=SimpleNamespace(
+        user={1: user} if user else {}, guild={2: guild} if guild else {}
+    ))
+    replies = []
+    async def reply(content):
+        replies.append(content)
+    return SimpleNamespace(
+        message=SimpleNamespace(_state=SimpleNamespace(_get_client=lambda: client)),
+        author=SimpleNamespace(id=1), guild=SimpleNamespace(id=2),
+        invoked_subcommand=None, reply=reply, replies=replies
+    )
+
+
+def expected(text: dict, user: str | None, guild: str | None, **kwargs) -> str:
+    return gettext(text, user or guild or "en").format(**kwargs)
+
+
+@mark.parametrize("user,guild", LANGUAGES)
+def test_error_handler_texts_are_unchanged(user: str | None, guild: str | None):
+    general = import_cog("rt.general")
+    ctx = make_context(user, guild)
+    for name, (text, kwargs) in BEFORE.items():
+        assert isinstance(converted := getattr(general, name), CatalogText)
+        assert dict(converted) == text
+        assert t(converted, ctx, **kwargs) == expected(text, user, guild, **kwargs)
+    for status, text in STATUS_MESSAGES.items():
+        assert t(general.General.STATUS_MESSAGES[status], ctx) == expected(text, user, guild)
+    assert general.General.BAD_ARGUMENT(ctx, "error") \
+        == expected(BEFORE["BAD_ARGUMENT"][0], user, guild, code="error")
+    # 足りない引数がある場合に、`ignore_key_error`でそのまま返すのも同じ。
+    assert t(general.COMMAND_NOT_FOUND, ctx, ignore_key_error=True) \
+        == gettext(BEFORE["COMMAND_NOT_FOUND"][0], user or guild or "en")
+
+
+@mark.parametrize("user,guild", LANGUAGES)
+def test_wrong_way_texts_are_unchanged(user: str | None, guild: str | None):
+    ctx = make_context(user, guild)
+    assert Cog.ERRORS["WRONG_WAY"](ctx) == expected(WRONG_WAY, user, guild)
+    run(Cog.group_index(None, ctx)) # type: ignore
+    assert ctx.replies == [expected(WRONG_WAY_INDEX, user, guild)]
+
+
+def test_catalog_matches_gettext_for_partial_texts():
+    for text in ({"ja": "日本語"}, {"en": "English"}, {"ko": "한국어"}, {}):
+        converted = catalog(text)
+        assert converted is catalog(dict(text))
+        for language in ("ja", "en", "ko", None):
+            assert gettext(converted, language) == gettext(text, language) # type: ignore
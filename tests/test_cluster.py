@@ -0,0 +1,83 @@
+# RT - Tests - Cluster
+
+from asyncio import create_subprocess_exec, run, sleep, wait_for
+from asyncio.subprocess import DEVNULL
+from pathlib import Path
+from os import environ
+import sys
+
+from pytest import MonkeyPatch
+
+from rtutil.cluster import ENV_SHARD_IDS, ENV_SHARD_COUNT, ENV_CLUSTER_ID, ENV_SOCKET, \
+    ControlClient, ControlServer, partition
+
+from tests.fakes import FakeGateway
+
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_partition():
+    assert partition(4, 2) == [[0, 1], [2, 3]]
+    assert partition(5, 3) == [[0, 1], [2, 3], [4]]
+    assert partition(2, 5) == [[0], [1]]
+
+
+def test_broadcast_reaches_every_client(monkeypatch: MonkeyPatch, tmp_path):
+    monkeypatch.setitem(environ, ENV_SOCKET, str(tmp_path / "control.sock"))
+
+    async def main():
+        await (server := ControlServer(environ[ENV_SOCKET])).start()
+        received, clients = [], []
+        for cluster_id in range(2):
+            monkeypatch.setitem(environ, ENV_CLUSTER_ID, str(cluster_id))
+            clients.append(ControlClient(
+                lambda event, data, id_=cluster_id: received.append((id_, event, data))
+            ))
+            clients[-1].start()
+        while len(server.writers) < 2:
+            await sleep(0.01)
+        server.broadcast("command", {"name": "reload", "args": ["cogs.rt.general"]})
+        clients[0].broadcast("invalidate", ["prefix", 1, None])
+        while len(received) < 3:
+            await sleep(0.01)
+        for client in clients:
+            client.close()
+        await server.close()
+        return received
+    assert sorted(run(main())) == [
+        (0, "command", {"name": "reload", "args": ["cogs.rt.general"]}),
+        (1, "command", {"name": "reload", "args": ["cogs.rt.general"]}),
+        (1, "invalidate", ["prefix", 1, None])
+    ]
+
+
+async def start_cluster(url: str, cluster_id: int, shard_ids: list[int], shard_count: int):
+    "`cluster.py`と同じ環境変数でシャードを渡して、`tests/gateway_worker.py`を起動します。"
+    return await create_subprocess_exec(
+        sys.executable, "-m", "tests.gateway_worker", cwd=ROOT, env=environ | {
+            ENV_SHARD_IDS: ",".join(map(str, shard_ids)), ENV_SHARD_COUNT: str(shard_count),
+            ENV_CLUSTER_ID: str(cluster_id), "FAKE_DISCORD": url
+        }, stdin=DEVNULL
+    )
+
+
+def test_clusters_identify_their_shards():
+    async def main():
+        url = await (gateway := FakeGateway()).start()
+        processes = [
+            await start_cluster(url, cluster_id, shard_ids, 4)
+            for cluster_id, shard_ids in enumerate(partition(4, 2))
+        ]
+        try:
+            await wait_for(gateway.wait_identified(4), 60)
+            # 余計に`IDENTIFY`が送られてこないか少し待つ。
+            await sleep(0.5)
+        finally:
+            for process in processes:
+                if process.returncode is None:
+                    process.terminate()
+                await process.wait()
+            await gateway.runner.cleanup()
+        return gateway.identified
+    assert sorted(run(main())) == [(0, 4), (1, 4), (2, 4), (3, 4)]
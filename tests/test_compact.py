@@ -0,0 +1,77 @@
+# RT - Tests - Compact
+
+from random import Random
+
+from rtutil.compact import IdSet, IdMap
+
+
+def test_id_set_matches_set():
+    random, expected = Random(0), set()
+    ids = IdSet()
+    for _ in range(2000):
+        id_ = random.randrange(1 << 63)
+        if expected and random.random() < 0.3:
+            id_ = random.choice(sorted(expected))
+            ids.discard(id_)
+            expected.discard(id_)
+        else:
+            ids.add(id_)
+            expected.add(id_)
+    assert list(ids) == sorted(expected)
+    assert len(ids) == len(expected)
+    assert all(id_ in ids for id_ in expected)
+
+
+def test_id_set_checksum_follows_contents():
+    ids = IdSet((1, 2, 3))
+    ids.add(4)
+    ids.discard(2)
+    ids.add(4)
+    ids.discard(100)
+    assert ids.checksum == IdSet((1, 3, 4)).checksum == 1 ^ 3 ^ 4
+
+
+class SmallIdMap(IdMap):
+    "マージが何度も起きるように閾値を小さくした`IdMap`です。"
+
+    MERGE_THRESHOLD = 16
+
+
+def test_id_map_matches_dict():
+    random, expected = Random(1), {}
+    ids = SmallIdMap()
+    for _ in range(5000):
+        id_ = random.randrange(1000)
+        action = random.random()
+        if action < 0.2:
+            assert ids.pop(id_, None) == expected.pop(id_, None)
+        elif action < 0.3:
+            assert ids.get(id_) == expected.get(id_)
+        else:
+            ids[id_] = expected[id_] = random.choice(("ja", "en", "zh-CN", "ko"))
+    assert dict(ids.items()) == expected
+    assert len(ids) == len(expected)
+    assert list(ids) == sorted(expected)
+
+
+def test_id_map_update_and_delete():
+    ids = IdMap([(3, "ja"), (1, "en"), (3, "ko")])
+    assert ids[3] == "ko" and ids[1] == "en"
+    ids.update([(2, "ja"), (1, "ko")])
+    assert dict(ids.items()) == {1: "ko", 2: "ja", 3: "ko"}
+    del ids[2]
+    assert 2 not in ids
+    try:
+        del ids[2]
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("KeyError was not raised.")
+    assert dict(ids.items()) == {1: "ko", 3: "ko"}
+
+
+def test_id_map_iteration_while_deleting():
+    ids = IdMap((id_, "ja") for id_ in range(100))
+    for id_ in ids:
+        del ids[id_]
+    assert len(ids) == 0
@@ -0,0 +1,65 @@
+# RT - Tests - Expander
+
+from types import SimpleNamespace
+from datetime import datetime
+from asyncio import run
+
+import discord
+
+from core.cacher import CacherPool
+
+from tests.fakes import FakePool, import_cog
+
+
+class FakeChannel(discord.TextChannel):
+    "`fetch_message`の呼び出しを数えるチャンネルです。"
+
+    def __init__(self, id_: int, stored: dict[int, SimpleNamespace]):
+        self.id, self.stored, self.fetched = id_, stored, []
+
+    async def fetch_message(self, id_: int, /) -> SimpleNamespace: # type: ignore
+        self.fetched.append(id_)
+        return self.stored[id_]
+
+
+def message(channel_id: int, id_: int, edited_at: datetime | None = None) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=id_, channel=SimpleNamespace(id=channel_id), content=f"message {id_}",
+        edited_at=edited_at, attachments=[], embeds=[], author=SimpleNamespace(
+            color=None, display_name="user", display_avatar=SimpleNamespace(url="")
+        )
+    )
+
+
+def test_render_all_fetches_only_misses():
+    # メッセージ1から3はゲートウェイのキャッシュにあり、4から6はない。
+    stored = {id_: message(10, id_) for id_ in range(1, 7)}
+    channel = FakeChannel(10, stored)
+    gateway = {id_: stored[id_] for id_ in (1, 2, 3)}
+    guild = SimpleNamespace(get_channel_or_thread={10: channel}.get)
+    other_guild = SimpleNamespace(get_channel_or_thread={}.get)
+    bot = SimpleNamespace(
+        pool=FakePool(), cachers=CacherPool(),
+        _connection=SimpleNamespace(_get_message=gateway.get)
+    )
+    expander = import_cog("server-management.expander").Expander(bot)
+    targets = [(10, id_) for id_ in range(1, 7)]
+
+    async def main():
+        # 最初はゲートウェイのキャッシュにないものだけ取得する。
+        assert len(await expander.render_all(guild, targets)) == 6
+        assert sorted(channel.fetched) == [4, 5, 6]
+        # 二回目は展開済みのキャッシュを使うので、取得しない。
+        assert len(await expander.render_all(guild, targets)) == 6
+        assert len(channel.fetched) == 3
+        # 他のサーバーからは、キャッシュにあっても展開せず、取得もしない。
+        assert await expander.render_all(other_guild, targets) == []
+        assert len(channel.fetched) == 3
+        # 編集されたメッセージは取得し直す。ゲートウェイのキャッシュにあるものは取得しない。
+        await expander.on_raw_message_edit(SimpleNamespace(channel_id=10, message_id=5))
+        gateway[1] = stored[1] = message(10, 1, datetime(2022, 1, 1))
+        stored[5] = message(10, 5, datetime(2022, 1, 1))
+        rendered = await expander.render_all(guild, targets)
+        assert sorted(channel.fetched) == [4, 5, 5, 6]
+        assert expander.rendered[(10, 1)] == (datetime(2022, 1, 1), rendered[0])
+    run(main())
@@ -0,0 +1,69 @@
+# RT - Tests - GBan
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from functools import reduce
+from operator import xor
+from asyncio import run
+
+from tests.fakes import FakePool, import_cog
+
+
+class Database:
+    "`GlobalBan`と`GlobalBanSetting`のテーブルの代わりです。"
+
+    def __init__(self, users: dict[int, str], disabled: set[int]):
+        self.users, self.disabled = users, disabled
+        self.pool = FakePool(self.handle)
+
+    def handle(self, sql: str, args: tuple) -> list[tuple]:
+        table = self.disabled if "GlobalBanSetting" in sql else self.users
+        if sql.startswith("SELECT COUNT(*)"):
+            return [(len(table), reduce(xor, table, 0) or None)]
+        if sql.startswith("DELETE"):
+            for id_ in args:
+                if table is self.users:
+                    self.users.pop(id_, None)
+                else:
+                    self.disabled.discard(id_)
+            return []
+        if "IN (" in sql:
+            return [(id_, self.users[id_]) for id_ in args if id_ in self.users]
+        return [(id_,) for id_ in table]
+
+
+def make(database: Database, exists=lambda mode, id_: True):
+    async def exists_(mode: str, id_: int) -> bool:
+        return exists(mode, id_)
+    bot = SimpleNamespace(pool=database.pool, exists=exists_)
+    return import_cog("rt.gban").DataManager(SimpleNamespace(bot=bot))
+
+
+def test_sync_reloads_disabled_guilds():
+    database = Database({1: "spam"}, {10})
+    data = make(database)
+
+    async def main():
+        await data.load()
+        assert not await data.sync()
+        # 他のプロセスでサーバーが機能を無効化した。
+        database.disabled.add(11)
+        assert data.is_target(1, 11)
+        assert await data.sync()
+        assert not data.is_target(1, 11) and data.is_target(1, 12)
+    run(main())
+
+
+def test_clean_deletes_from_the_tables_and_memory():
+    database = Database({1: "spam", 2: "raid"}, {10, 11})
+    data = make(database, lambda mode, id_: id_ not in (2, 11))
+
+    async def main():
+        await data.load()
+        await data.clean()
+    run(main())
+    assert database.users == {1: "spam"} and database.disabled == {10}
+    assert list(data.users) == [1] and list(data.disabled) == [10]
+    assert [sql.split(" WHERE")[0] for sql, _ in database.pool.queries if "DELETE" in sql] \
+        == ["DELETE FROM GlobalBanSetting", "DELETE FROM GlobalBan"]
@@ -0,0 +1,91 @@
+# RT - Tests - Invalidation
+
+from types import SimpleNamespace
+from asyncio import get_running_loop, run, sleep, wait_for
+from logging import getLogger
+from socket import socket
+
+from ipcs import Client, Server
+
+from core.invalidation import InvalidationBus
+from core.cacher import CacherPool
+
+from tests.fakes import FakePool, import_cog
+
+
+class FakeBot:
+    "rtws (ipcs) とキャッシュの無効化だけができるBotの代わりです。"
+
+    def __init__(self, id_: str):
+        self.loop, self.logger = get_running_loop(), getLogger("tests")
+        self.rtws_id, self.rtws = id_, Client(id_)
+        self.pool, self.cachers = FakePool(), CacherPool()
+        self.joins = SimpleNamespace(register=lambda *_: None, unregister=lambda *_: None)
+        self.cluster = SimpleNamespace(broadcast=lambda *_: None)
+        self.invalidations = InvalidationBus(self) # type: ignore
+
+    def add_listener(self, *_) -> None:
+        ...
+
+    def dispatch(self, *_) -> None:
+        ...
+
+
+async def wait_until(check, timeout: float = 5.0) -> None:
+    async def wait():
+        while not check():
+            await sleep(0.01)
+    await wait_for(wait(), timeout)
+
+
+def test_invalidation_reaches_the_other_bot():
+    with socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def main():
+        server = Server("__IPCS_SERVER__")
+        tasks = [get_running_loop().create_task(server.start("127.0.0.1", port))]
+        await sleep(0.1)
+        bots = [FakeBot("a"), FakeBot("b")]
+        for bot in bots:
+            tasks.append(get_running_loop().create_task(bot.rtws.start(
+                uri=f"ws://127.0.0.1:{port}", reconnect=False
+            )))
+        await wait_until(lambda: all(
+            {"a", "b"} <= set(bot.rtws.connections) for bot in bots
+        ))
+        expander = import_cog("server-management.expander")
+        Expander, Method = expander.Expander, expander.Method
+        WelcomeMessage = import_cog("server-management.welcome_message").WelcomeMessage
+        expanders = [Expander(bot) for bot in bots]
+        welcomes = [WelcomeMessage(bot) for bot in bots]
+        try:
+            for cog in expanders + welcomes:
+                await cog.cog_load()
+            for expander, welcome in zip(expanders, welcomes):
+                await expander.data.read(1)
+                await welcome.data.read(1, "join")
+
+            # 書き込んだ方のキャッシュは新しい値になり、もう片方のキャッシュは消える。
+            await expanders[0].data.write(1, Method.NONE)
+            await wait_until(lambda: 1 not in expanders[1].data.caches)
+            assert expanders[0].data.caches[1] is Method.NONE
+            # タプルのキーはリストとして送られるが、タプルに戻して消される。
+            await welcomes[0].data.write(1, 2, "join", {"content": "hello"}) # type: ignore
+            await wait_until(lambda: (1, "join") not in welcomes[1].data.caches)
+            assert welcomes[0].data.caches[(1, "join")].channel_id == 2
+
+            # アンロードした後は購読しない。
+            await expanders[1].data.read(1)
+            await expanders[1].cog_unload()
+            await expanders[0].data.write(1, Method.WEBHOOK)
+            await sleep(0.2)
+            assert 1 in expanders[1].data.caches
+        finally:
+            for bot in bots:
+                await bot.rtws.close()
+            await server.close()
+            for task in tasks:
+                task.cancel()
+    run(main())
@@ -0,0 +1,134 @@
+# RT - Tests - Join Pipeline
+
+from asyncio import get_running_loop, sleep, run
+from types import SimpleNamespace
+from logging import getLogger
+
+from core.join_pipeline import ActionQueue, JoinPipeline
+from core.cacher import CacherPool
+
+from tests.fakes import FakePool, import_cog
+
+
+class FakeBot:
+    logger = getLogger("tests")
+
+    def __init__(self):
+        self.loop = get_running_loop()
+
+
+class Recorder:
+    "実行された処理を記録する`ActionQueue`です。"
+
+    def __init__(self, **kwargs):
+        self.queue = ActionQueue(FakeBot(), **kwargs) # type: ignore
+        self.done: list[tuple[int, int]] = []
+
+    def put(self, guild_id: int, number: int, priority: bool = False) -> None:
+        async def action():
+            self.done.append((guild_id, number))
+        self.queue.put(guild_id, action, priority)
+
+
+def test_other_guilds_are_not_delayed_by_a_raid():
+    async def main():
+        recorder = Recorder(rate=1000.0, guild_rate=1000.0)
+        for number in range(100):
+            recorder.put(1, number)
+        recorder.put(2, 0)
+        await sleep(0.05)
+        recorder.queue.close()
+        # 順番に一つずつ実行されるので、二つ目のサーバーはすぐに実行される。
+        assert recorder.done.index((2, 0)) <= 2
+    run(main())
+
+
+def test_priority_actions_run_first():
+    async def main():
+        recorder = Recorder(rate=1000.0, guild_rate=1000.0)
+        for number in range(10):
+            recorder.put(1, number)
+        recorder.put(3, 0, True)
+        await sleep(0.05)
+        recorder.queue.close()
+        assert recorder.done[0] == (3, 0)
+    run(main())
+
+
+def test_pending_actions_are_bounded_per_guild():
+    async def main():
+        recorder = Recorder(rate=1000.0, guild_rate=1000.0, max_pending=5)
+        for number in range(20):
+            recorder.put(1, number)
+        await sleep(0.05)
+        assert recorder.done == [(1, number) for number in range(15, 20)]
+        assert recorder.queue.dropped == 15
+        assert not recorder.queue.running
+    run(main())
+
+
+def test_guild_rate_is_respected():
+    async def main():
+        recorder = Recorder(rate=1000.0, guild_rate=20.0)
+        for number in range(10):
+            recorder.put(1, number)
+        await sleep(0.12)
+        recorder.queue.close()
+        assert 2 <= len(recorder.done) <= 4
+    run(main())
+
+
+GUILDS, JOINS = 50, 5000
+
+
+def handle(sql: str, args: tuple) -> list[tuple]:
+    # 半分のサーバーでウェルカムメッセージとロールキーパーが設定されている。
+    if sql.startswith("SELECT * FROM WelcomeMessage"):
+        return [(guild_id, 1, "join", b"{}") for guild_id in args[1:] if guild_id % 2]
+    if sql.startswith("SELECT GuildId FROM RoleKeeper"):
+        return [(guild_id,) for guild_id in args if guild_id % 2]
+    if sql.startswith("SELECT ChannelId") or sql.startswith("SELECT * FROM RequireSent"):
+        return [(guild_id, 10, 60.0) for guild_id in args if guild_id % 2]
+    if sql.startswith("SELECT UserId, Reason FROM GlobalBan"):
+        return [(user_id, "spam") for user_id in args]
+    return []
+
+
+def test_join_burst_queries_per_batch():
+    async def main():
+        bot = SimpleNamespace(
+            loop=get_running_loop(), logger=getLogger("tests"),
+            pool=(pool := FakePool(handle)), cachers=CacherPool()
+        )
+        bot.joins = JoinPipeline(bot) # type: ignore
+        bot.joins.actions = SimpleNamespace(put=lambda *args, **_: puts.append(args))
+        puts = []
+        gban = import_cog("rt.gban").GBan(bot)
+        gban.data.users.replace(range(0, JOINS, 100))
+        for name, cog in (
+            ("GBan", gban),
+            ("RequireSent", import_cog("server-management.requiresend").RequireSent(bot)),
+            ("WelcomeMessage", import_cog("server-management.welcome_message").WelcomeMessage(bot)),
+            ("RoleKeeper", import_cog("server-management.role_keeper").RoleKeeper(bot))
+        ):
+            bot.joins.register(name, cog.on_joins)
+        for user_id in range(JOINS):
+            bot.joins.put(SimpleNamespace(
+                id=user_id, bot=False, guild=SimpleNamespace(id=user_id % GUILDS)
+            ))
+        bot.joins.flush()
+        await sleep(0.1)
+        return pool, puts
+    pool, puts = run(main())
+
+    batches = JOINS // JoinPipeline.MAX_BATCH
+    # 設定はキャッシュされるので、最初のまとまりでだけ読み込まれる。
+    for table in ("WelcomeMessage", "RoleKeeper ", "RequireSent "):
+        assert pool.count(f"FROM {table}") == 1
+    # 残りはまとまり毎に一回ずつになる。
+    assert pool.count("FROM GlobalBan ") == batches
+    assert pool.count("INSERT INTO RequireSentQueue") == batches
+    assert pool.count("FROM RoleKeeperCache") == batches
+    assert len(pool.queries) == 3 + 3 * batches
+    # ウェルカムメッセージとGBANは、設定されているサーバーの参加者の分だけ処理が追加される。
+    assert len(puts) == JOINS // 2 + JOINS // 100
@@ -0,0 +1,57 @@
+# RT - Tests - Lazy
+
+from subprocess import run
+from pathlib import Path
+from os import environ
+import sys
+
+from orjson import loads
+
+
+ROOT = Path(__file__).parent.parent
+HEAVY = ("bs4", "PIL.Image", "deep_translator.exceptions")
+COGS = ("server-management.translator", "individual", "music")
+PROBE = """
+from importlib import import_module
+from time import perf_counter
+import sys
+
+from orjson import dumps
+import psutil
+
+from tests import conftest # noqa: F401
+from tests.fakes import import_cog
+
+import_module("core.rtevent"), import_module("core.help")
+process = psutil.Process()
+rss, start = process.memory_info().rss, perf_counter()
+for name in sys.argv[1:]:
+    import_module(name)
+for name in {cogs!r}:
+    import_cog(name)
+elapsed, grown = perf_counter() - start, process.memory_info().rss - rss
+loaded = [name for name in {heavy!r} if name in sys.modules]
+bs4 = import_module("cogs.individual").bs4
+print(dumps([elapsed, grown, loaded, repr(bs4), hasattr(bs4, "BeautifulSoup"), repr(bs4)]).decode())
+"""
+
+
+def probe(*eager: str) -> tuple[float, int, list[str], str, bool, str]:
+    "新しいプロセスで、`eager`を先に読み込んでから`COGS`を読み込みます。"
+    result = run(
+        [sys.executable, "-c", PROBE.format(cogs=COGS, heavy=HEAVY), *eager],
+        cwd=ROOT, env=environ | {"PYTHONPATH": str(ROOT)}, capture_output=True, check=True
+    )
+    return loads(result.stdout.splitlines()[-1])
+
+
+def test_heavy_libraries_are_not_imported_with_cogs():
+    lazy = min((probe() for _ in range(2)), key=lambda result: result[0])
+    eager = min((probe(*HEAVY) for _ in range(2)), key=lambda result: result[0])
+    # 読み込んだだけでは重たいライブラリはインポートされず、使った時にインポートされる。
+    assert lazy[2] == [] and eager[2] == list(HEAVY)
+    assert lazy[3] == "<LazyModule name='bs4' loaded=False>"
+    assert lazy[4] and lazy[5] == "<LazyModule name='bs4' loaded=True>"
+    # 重たいライブラリの分だけ、起動にかかる時間とメモリが減る。
+    assert lazy[0] < eager[0]
+    assert lazy[1] + (4 << 20) < eager[1]
@@ -0,0 +1,45 @@
+# RT - Tests - Link Graph
+
+from random import Random
+
+from rtutil.link_graph import LinkGraph
+
+
+def reachable(edges: set[tuple[int, int]], start: int, goal: int) -> bool:
+    "総当たりで`start`から`goal`に辿り着けるかを調べます。"
+    seen, stack = {start}, [start]
+    while stack:
+        node = stack.pop()
+        if node == goal:
+            return True
+        for before, after in edges:
+            if before == node and after not in seen:
+                seen.add(after)
+                stack.append(after)
+    return False
+
+
+def test_matches_brute_force():
+    random = Random(0)
+    for _ in range(50):
+        graph, edges = LinkGraph(), set()
+        for _ in range(60):
+            before, after = random.randrange(12), random.randrange(12)
+            if edges and random.random() < 0.2:
+                before, after = random.choice(sorted(edges))
+                graph.remove(before, after)
+                edges.discard((before, after))
+                continue
+            expected = before != after and not reachable(edges, after, before)
+            assert graph.add(before, after) is expected
+            if expected:
+                edges.add((before, after))
+            # 辺は常にトポロジカル順序に沿っている。
+            assert all(graph.order[b] < graph.order[a] for b, a in edges)
+
+
+def test_initial_edges():
+    graph = LinkGraph(((1, 2), (2, 3)))
+    assert not graph.add(3, 1)
+    graph.remove(2, 3)
+    assert graph.add(3, 1)
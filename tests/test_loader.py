@@ -0,0 +1,79 @@
+# RT - Tests - Loader
+
+from pathlib import Path
+from time import perf_counter
+from asyncio import run
+
+from pytest import MonkeyPatch, raises
+from discord.ext import commands
+import discord
+
+from core.loader import ExtensionLoader, StartupProfiler
+from core.bot import RT
+
+
+SLEEP = 0.2
+STUB = """
+from asyncio import sleep
+from time import perf_counter
+
+__depends__ = {depends!r}
+
+async def setup(bot):
+    start = perf_counter()
+    await sleep({sleep})
+    bot.spans[__name__] = (start, perf_counter())
+"""
+
+
+class LoaderBot(commands.Bot):
+    "エクステンションの読み込みだけをするBotです。"
+
+    _load = RT._load
+
+    def __init__(self):
+        super().__init__(command_prefix="!", intents=discord.Intents.none())
+        self.profiler = StartupProfiler()
+        self.spans: dict[str, tuple[float, float]] = {}
+
+
+def write_stubs(root: Path, depends: dict[str, tuple[str, ...]]) -> list[str]:
+    "`setup`で`SLEEP`秒待つだけのエクステンションを作ります。"
+    (root / "stubcogs").mkdir()
+    for name, value in depends.items():
+        (root / "stubcogs" / f"{name}.py").write_text(STUB.format(
+            depends=tuple(f"stubcogs.{depend}" for depend in value), sleep=SLEEP
+        ))
+    return [f"stubcogs/{name}.py" for name in depends]
+
+
+def test_extensions_load_concurrently_in_dependency_order(
+    monkeypatch: MonkeyPatch, tmp_path: Path
+):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    # `a -> b -> c`の順番に依存していて、`d`から`f`は何にも依存していない。
+    paths = write_stubs(tmp_path, {
+        "c": ("b",), "b": ("a",), "a": (), "d": (), "e": (), "f": ()
+    })
+
+    async def main():
+        bot = LoaderBot()
+        start = perf_counter()
+        await ExtensionLoader(bot).load(paths) # type: ignore
+        return bot, perf_counter() - start
+    bot, elapsed = run(main())
+
+    assert set(bot.extensions) == {f"stubcogs.{name}" for name in "abcdef"}
+    spans = {name.split(".")[1]: span for name, span in bot.spans.items()}
+    # 依存しているものは、依存先の読み込みが終わってから読み込まれる。
+    assert spans["a"][1] <= spans["b"][0] and spans["b"][1] <= spans["c"][0]
+    # 依存していないものは同時に読み込まれるので、一番長い依存の列の分しかかからない。
+    assert 3 * SLEEP <= elapsed < 4 * SLEEP
+    assert all(spans[name][0] < spans["a"][1] for name in "def")
+    assert bot.profiler.total("extensions") >= 6 * SLEEP
+
+
+def test_circular_dependency_is_rejected():
+    with raises(ValueError, match="Circular"):
+        ExtensionLoader.check_cycle({"a": ("b",), "b": ("c",), "c": ("a",)})
@@ -0,0 +1,121 @@
+# RT - Tests - Relay
+
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from asyncio import gather, get_running_loop, run, sleep
+from hashlib import sha256
+from logging import getLogger
+
+from aiohttp import ClientSession, web
+import psutil
+
+from core.relay import AttachmentRelay
+
+
+SIZE, ATTACHMENTS, MESSAGES, CHANNELS = 8 << 20, 2, 8, 5
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+class FakeCDN:
+    "添付ファイルの代わりに`SIZE`バイトのデータを返して、ダウンロードされた回数を数えます。"
+
+    def __init__(self):
+        self.downloads = 0
+        self.app = web.Application()
+        self.app.router.add_get("/{name}", self.handle)
+
+    @staticmethod
+    def block(name: str) -> bytes:
+        "ファイルの中身はこれを繰り返したものです。"
+        return name.encode().ljust(1 << 16, b"\0")
+
+    @classmethod
+    def digest(cls, name: str) -> bytes:
+        hashed, block = sha256(), cls.block(name)
+        for _ in range(SIZE >> 16):
+            hashed.update(block)
+        return hashed.digest()
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        self.downloads += 1
+        await (response := web.StreamResponse()).prepare(request)
+        block = self.block(request.match_info["name"])
+        for _ in range(SIZE >> 16):
+            await response.write(block)
+        return response
+
+    async def start(self) -> str:
+        await (runner := web.AppRunner(self.app)).setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        self.runner = runner
+        return f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+def attachment(url: str, name: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        url=f"{url}/{name}", size=SIZE, filename=name,
+        description=None, is_spoiler=lambda: False
+    )
+
+
+def test_relay_downloads_once_with_bounded_memory():
+    process = psutil.Process()
+
+    async def main():
+        url = await (cdn := FakeCDN()).start()
+        bot = SimpleNamespace(
+            loop=get_running_loop(), executors=SimpleNamespace(normal=CountingExecutor()),
+            session=ClientSession(), logger=getLogger("tests")
+        )
+        relay = AttachmentRelay(bot, ATTACHMENTS * SIZE) # type: ignore
+        baseline = peak = process.memory_info().rss
+        running, received = True, []
+
+        async def watch():
+            nonlocal peak
+            while running:
+                peak = max(peak, process.memory_info().rss)
+                await sleep(0.005)
+
+        async def relay_message(index: int):
+            attachments = [attachment(url, f"{index}-{number}") for number in range(ATTACHMENTS)]
+            async with relay.download(attachments) as relayed: # type: ignore
+                assert relayed.complete
+                # 一回のダウンロードで、全てのチャンネルに送る。
+                for _ in range(CHANNELS):
+                    for file in relayed.to_files():
+                        hashed = sha256()
+                        while chunk := file.fp.read(1 << 16):
+                            hashed.update(chunk)
+                        received.append((file.filename, hashed.digest()))
+
+        watcher = bot.loop.create_task(watch())
+        try:
+            await gather(*(relay_message(index) for index in range(MESSAGES)))
+        finally:
+            running = False
+            await watcher
+            await bot.session.close()
+            await cdn.runner.cleanup()
+            bot.executors.normal.shutdown()
+        return cdn, bot.executors.normal, peak - baseline, received
+    cdn, executor, grown, received = run(main())
+
+    assert cdn.downloads == MESSAGES * ATTACHMENTS
+    assert len(received) == MESSAGES * ATTACHMENTS * CHANNELS
+    assert all(digest == FakeCDN.digest(name) for name, digest in received)
+    # `SPOOL_SIZE`を超えた分は一時ファイルに、エグゼキューターで書き込まれる。
+    assert executor.submitted >= MESSAGES * ATTACHMENTS * (
+        (SIZE - AttachmentRelay.SPOOL_SIZE) // AttachmentRelay.CHUNK_SIZE
+    )
+    # 一時ファイルに書き込まれるので、添付ファイル一つ分もメモリは増えない。
+    assert grown < SIZE
@@ -0,0 +1,53 @@
+# RT - Tests - Require Sent
+
+from types import SimpleNamespace
+from random import Random
+from asyncio import run
+
+import discord
+
+from core.cacher import CacherPool
+
+from tests.fakes import FakePool, import_cog
+
+
+GUILDS, MESSAGES = 100, 10_000
+
+
+def required_channel(guild_id: int) -> int:
+    return guild_id * 10
+
+
+def handle(sql: str, args: tuple) -> list[tuple]:
+    # 全てのサーバーで、`required_channel`のチャンネルが設定されている。
+    if sql.startswith("SELECT ChannelId, Deadline FROM RequireSent"):
+        return [(required_channel(args[0]), 60.0)]
+    return []
+
+
+def test_messages_do_not_query_per_message():
+    pool, random = FakePool(handle), Random(0)
+    bot = SimpleNamespace(pool=pool, cachers=CacherPool())
+    cog = import_cog("server-management.requiresend").RequireSent(bot)
+    # 一部のメンバーはまだ設定されたチャンネルに送信していない。
+    queued = {(guild_id, user_id) for guild_id in range(1, GUILDS + 1) for user_id in range(5)}
+    for key in queued:
+        cog.data.caches.queues[key] = []
+
+    async def main():
+        for _ in range(MESSAGES):
+            guild_id = random.randrange(1, GUILDS + 1)
+            await cog.on_message(SimpleNamespace(
+                author=SimpleNamespace(bot=False, id=random.randrange(50)),
+                guild=SimpleNamespace(id=guild_id), type=discord.MessageType.default,
+                channel=SimpleNamespace(id=random.choice((
+                    required_channel(guild_id), required_channel(guild_id) + 1
+                )))
+            ))
+    run(main())
+
+    # 設定の読み込みはサーバー毎に一回だけで、書き込みはキューが終わったメンバーの削除だけになる。
+    assert pool.count("SELECT") == GUILDS
+    assert pool.count("DELETE FROM RequireSentQueue") == len(queued) - len(cog.data.caches.queues)
+    assert len(pool.queries) == GUILDS + pool.count("DELETE")
+    assert len(cog.data.caches.queues) < len(queued)
@@ -0,0 +1,135 @@
+# RT - Tests - Role Editor
+
+from asyncio import CancelledError, create_task, gather, get_running_loop, run, sleep
+from array import array
+
+from pytest import raises
+
+from core.cacher import BoundedCacher
+from core.role_editor import RoleEditor
+
+
+class FakeCachers:
+    def acquire_bounded(self, *args, **kwargs):
+        return BoundedCacher(*args, **kwargs)
+
+
+class FakeBot:
+    "`RoleEditor`が使うところだけを持つBotです。"
+
+    def __init__(self):
+        self.loop = get_running_loop()
+        self.cachers = FakeCachers()
+        self.listeners = {}
+
+    def add_listener(self, function, name):
+        self.listeners[name] = function
+
+
+class FakeGuild:
+    def __init__(self):
+        self.id, self.members = 1, {}
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+
+class FakeMember:
+    "HTTPのリクエストの代わりに、呼ばれたものを記録するメンバーです。"
+
+    def __init__(self, guild, *role_ids, id_=2):
+        self.guild, self.id = guild, id_
+        self._roles = array("Q", sorted(role_ids))
+        self.calls = []
+
+    async def edit(self, *, roles, reason=None):
+        self.calls.append(("edit", sorted(role.id for role in roles)))
+
+    async def add_roles(self, role, reason=None):
+        self.calls.append(("add", role.id))
+
+    async def remove_roles(self, role, reason=None):
+        self.calls.append(("remove", role.id))
+
+
+class Role:
+    def __init__(self, id_):
+        self.id = id_
+
+
+def make_editor() -> RoleEditor:
+    editor = RoleEditor(FakeBot()) # type: ignore
+    editor.DELAY = 0.01
+    return editor
+
+
+def test_edits_are_merged_into_one_request():
+    async def main():
+        editor, guild = make_editor(), FakeGuild()
+        guild.members[2] = member = FakeMember(guild, 10, 11)
+        await gather(
+            editor.edit(member, (Role(12),)), editor.edit(member, (Role(13),), (Role(10),)),
+            editor.edit(member, remove=(Role(13),))
+        )
+        assert member.calls == [("edit", [11, 12])]
+        assert editor.requests == 1
+    run(main())
+
+
+def test_recent_state_is_used_until_member_update():
+    async def main():
+        editor, guild = make_editor(), FakeGuild()
+        guild.members[2] = member = FakeMember(guild, 10)
+        await editor.edit(member, (Role(11),))
+        # ゲートウェイの更新が届く前は、キャッシュのメンバーは古いままなので前回の結果を使う。
+        await editor.edit(member, (Role(12),))
+        assert member.calls[-1] == ("edit", [10, 11, 12])
+        # 更新が届いたら、キャッシュにあるメンバーのロールを使う。
+        updated = FakeMember(guild, 10, 11, 12, 20)
+        guild.members[2] = updated
+        await editor.bot.listeners["on_member_update"](member, updated)
+        await editor.edit(updated, remove=(Role(10),))
+        assert updated.calls == [("edit", [11, 12, 20])]
+    run(main())
+
+
+def test_uncached_member_falls_back_to_deltas():
+    async def main():
+        editor, guild = make_editor(), FakeGuild()
+        member = FakeMember(guild, 10)
+        await editor.edit(member, (Role(11),), (Role(10),))
+        assert member.calls == [("add", 11), ("remove", 10)]
+        assert editor.requests == 2
+    run(main())
+
+
+def test_error_is_raised_to_the_caller():
+    async def main():
+        editor, guild = make_editor(), FakeGuild()
+        guild.members[2] = member = FakeMember(guild)
+
+        async def edit(**_):
+            raise RuntimeError("forbidden")
+        member.edit = edit
+        with raises(RuntimeError):
+            await editor.edit(member, (Role(1),))
+        # 失敗しても次の実行はできる。
+        del member.edit
+        await editor.edit(member, (Role(1),))
+        assert member.calls == [("edit", [1])]
+    run(main())
+
+
+def test_cancelled_caller_does_not_cancel_merged_edit():
+    async def main():
+        editor, guild = make_editor(), FakeGuild()
+        guild.members[2] = member = FakeMember(guild, 10)
+        first = create_task(editor.edit(member, (Role(11),)))
+        second = create_task(editor.edit(member, (Role(12),)))
+        await sleep(0)
+        first.cancel()
+        with raises(CancelledError):
+            await first
+        await second
+        assert member.calls == [("edit", [10, 11, 12])]
+    run(main())
@@ -0,0 +1,56 @@
+# RT - Tests - Role Index
+
+from array import array
+from random import Random
+
+from core.role_index import RoleIndex
+
+
+class FakeMember:
+    "`RoleIndex`が使う`_roles`だけを持つメンバーです。"
+
+    def __init__(self, *role_ids: int):
+        self._roles = array("Q", sorted(role_ids))
+
+
+def test_mask_round_trip():
+    index, random = RoleIndex(), Random(0)
+    role_ids = {random.randrange(1, 1 << 63) for _ in range(100)}
+    assert set(index.role_ids(index.mask(role_ids))) == role_ids
+
+
+def test_has_any_and_diff():
+    index = RoleIndex()
+    assert index.has_any(FakeMember(1, 2), (2, 3))
+    assert not index.has_any(FakeMember(1, 2), (3, 4))
+    added, removed = index.diff(FakeMember(1, 2), FakeMember(2, 3))
+    assert list(index.role_ids(added)) == [3]
+    assert list(index.role_ids(removed)) == [1]
+
+
+def test_config_mask_is_cached_until_forgotten():
+    index, calls = RoleIndex(), []
+
+    def role_ids(*ids: int):
+        calls.append(ids)
+        return ids
+
+    member = FakeMember(2)
+    assert not index.has_any(member, role_ids(1), "key")
+    # キャッシュがあるので、新しい設定は`.forget`するまで使われない。
+    assert not index.has_any(member, role_ids(2), "key")
+    index.forget("key")
+    assert index.has_any(member, role_ids(2), "key")
+    assert index.configs == {"key": 1 << index.bits[2]}
+
+
+def test_removed_role_frees_bit_and_clears_caches():
+    index = RoleIndex()
+    assert index.has_any(FakeMember(1), (1,), "key")
+    bit = index.bits[1]
+    index.remove(1)
+    assert not index.configs and not index.combinations
+    # 空いたビットは別のロールに使われ、古いロールを持っていたメンバーとは一致しない。
+    assert index.bit(5) == bit
+    assert not index.has_any(FakeMember(5), (), "key")
+    assert index.has_any(FakeMember(5), (5,))
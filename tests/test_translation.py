@@ -0,0 +1,105 @@
+# RT - Tests - Translation
+
+from asyncio import CancelledError, create_task, gather, run, sleep
+from threading import Event
+
+from pytest import raises
+
+from rtutil.translation import Backend, Coalescer, EchoBackend
+
+
+class FailingBackend(EchoBackend):
+    "特定の文章の翻訳だけ失敗するバックエンドです。"
+
+    def translate(self, target: str, content: str) -> str:
+        if content == "bad":
+            raise ValueError(content)
+        return super().translate(target, content)
+
+
+class BlockingBackend(EchoBackend):
+    "`slow`の翻訳を、`fast`の翻訳が終わるまで待たせるバックエンドです。"
+
+    def __init__(self):
+        super().__init__()
+        self.fast_done = Event()
+
+    def translate(self, target: str, content: str) -> str:
+        if content == "slow":
+            assert self.fast_done.wait(5)
+        result = super().translate(target, content)
+        if content == "fast":
+            self.fast_done.set()
+        return result
+
+
+class GatedBackend(EchoBackend):
+    "`release`が呼ばれるまで翻訳を終わらせないバックエンドです。"
+
+    def __init__(self):
+        super().__init__()
+        self.gate = Event()
+
+    def translate(self, target: str, content: str) -> str:
+        assert self.gate.wait(5)
+        return super().translate(target, content)
+
+
+def make(backend: Backend) -> Coalescer:
+    return Coalescer(backend, {})
+
+
+def test_backend_is_abstract():
+    with raises(TypeError):
+        Backend() # type: ignore
+
+
+def test_same_content_is_translated_once_and_cached():
+    coalescer = make(backend := EchoBackend())
+
+    async def main():
+        results = await gather(*(coalescer.translate("ja", "hello") for _ in range(5)))
+        assert results == ["[ja] hello"] * 5
+        assert await coalescer.translate("ja", "hello") == "[ja] hello"
+    run(main())
+    assert backend.calls == coalescer.upstream_calls == 1
+
+
+def test_failure_only_fails_its_item():
+    coalescer = make(FailingBackend())
+
+    async def main():
+        return await gather(
+            coalescer.translate("en", "good"), coalescer.translate("en", "bad"),
+            return_exceptions=True
+        )
+    good, bad = run(main())
+    assert good == "[en] good"
+    assert isinstance(bad, ValueError)
+
+
+def test_items_are_translated_concurrently():
+    # `slow`は`fast`が終わるまで終わらないので、順番に翻訳していたら時間切れになる。
+    coalescer = make(BlockingBackend())
+
+    async def main():
+        return await gather(coalescer.translate("en", "slow"), coalescer.translate("en", "fast"))
+    assert run(main()) == ["[en] slow", "[en] fast"]
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    coalescer = make(backend := GatedBackend())
+
+    async def main():
+        first = create_task(coalescer.translate("ja", "hello"))
+        second = create_task(coalescer.translate("ja", "hello"))
+        await sleep(0.01)
+        # 一人目だけをキャンセルする。二人目は同じ翻訳を待っているので、翻訳は続けなければいけない。
+        first.cancel()
+        with raises(CancelledError):
+            await first
+        backend.gate.set()
+        return await second
+    assert run(main()) == "[ja] hello"
+    assert backend.calls == coalescer.upstream_calls == 1
+    assert not coalescer.pending
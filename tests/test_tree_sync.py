@@ -0,0 +1,46 @@
+# RT - Tests - Tree Sync
+
+from asyncio import create_subprocess_exec, run
+from asyncio.subprocess import PIPE
+from pathlib import Path
+from os import environ
+import sys
+
+from orjson import loads
+
+from tests.fakes import FakeGateway
+
+
+ROOT = Path(__file__).parent.parent
+
+
+async def sync_tree(url: str, directory: Path, *args: str) -> list[bool]:
+    "`tests/gateway_worker.py`で同期を二回行い、それぞれ同期したかを返します。ハッシュは`directory`に保存されます。"
+    process = await create_subprocess_exec(
+        sys.executable, "-m", "tests.gateway_worker", "sync_tree", *args, cwd=directory,
+        env=environ | {"FAKE_DISCORD": url, "PYTHONPATH": str(ROOT)}, stdout=PIPE
+    )
+    stdout, _ = await process.communicate()
+    assert process.returncode == 0
+    return loads(stdout.splitlines()[-1])
+
+
+def test_unchanged_tree_is_not_synced(tmp_path: Path):
+    async def main():
+        url = await (gateway := FakeGateway()).start()
+        try:
+            # 最初の起動では同期して、同じプロセスでの二回目は同期しない。
+            assert await sync_tree(url, tmp_path) == [True, False]
+            assert len(gateway.synced) == 1
+            # 再起動しても、コマンドが同じなら同期しない。
+            assert await sync_tree(url, tmp_path) == [False, False]
+            assert len(gateway.synced) == 1
+            # コマンドが変わったら一回だけ同期する。
+            assert await sync_tree(url, tmp_path, "extra") == [True, False]
+            assert len(gateway.synced) == 2
+            assert {command["name"] for command in gateway.synced[1]} \
+                - {command["name"] for command in gateway.synced[0]} == {"extra"}
+        finally:
+            await gateway.runner.cleanup()
+        assert [path.name for path in tmp_path.iterdir()] == ["tree_hash.1.txt"]
+    run(main())